@@ -29,15 +29,9 @@ if __name__ == "__main__":
         programs, node_names = init_verification_programs(num_nodes, ntest, state)
 
         # Load network configuration
-        network_cfg = configure_network(node_names, use_highfid, use_optimistic)
-
-        # If needed, we can modify the configuration to increase num_qubits
-        """ for stack in network_cfg.stacks:
-            stack.qdevice_cfg.num_qubits = 100 """
-
-        # Modify the link configuration
-        for link in network_cfg.links:
-            link.cfg.fidelity = fidelity
+        # with the modified link fidelity
+        network_cfg = configure_network(node_names, use_highfid, use_optimistic,
+                                        overrides={'link.fidelity': fidelity})
 
         # Handle logging
         LogManager.set_log_level("WARNING")
@@ -1,5 +1,8 @@
 from pprint import pprint
 from typing import List
+from functools import lru_cache
+import copy
+import os
 from application import *
 from verification_programs import *
 from verification_programs_v2 import *
@@ -10,8 +13,11 @@ from netsquid_netbuilder.modules.clinks import DefaultCLinkConfig
 from netsquid_netbuilder.modules.qlinks import DepolariseQLinkConfig
 from netsquid_netbuilder.modules.qdevices import GenericQDeviceConfig
 from netsquid_netbuilder.modules.qlinks.perfect import PerfectQLinkConfig
+from netsquid_netbuilder.modules.scheduler import FIFOScheduleConfig
+from netsquid_netbuilder.util.network_generation import create_metro_hub_network
 
 from squidasm.util.util import create_complete_graph_network # type: ignore
+from squidasm.run.stack.config import StackNetworkConfig, StackConfig, LinkConfig, CLinkConfig # type: ignore
 
 ###
 #   Function to initialize GHZ distribution programs on all nodes in a network.
@@ -70,22 +76,140 @@ def init_verification_programs(num_nodes: int, n_test: int, state: str="ghz", ve
 
     return programs, node_names
 
+###
+#   Function to parse a YAML configuration file once per process.
+#   The parsed object is shared between calls and must not be modified, so
+#   _load_config hands out private copies of it instead.
+###
+@lru_cache(maxsize=None)
+def _parse_config(config_class, filename: str):
+    return config_class.from_file(filename)
+
+def _load_config(config_class, filename: str):
+    return copy.deepcopy(_parse_config(config_class, os.path.abspath(filename)))
+
+###
+#   Function to set fields of a (private) configuration object, e.g. {'fidelity': 0.95}.
+###
+def _apply_overrides(cfg, overrides: dict=None):
+    for field, value in (overrides or {}).items():
+        if not hasattr(cfg, field):
+            raise ValueError(f"{type(cfg).__name__} has no field '{field}'")
+        setattr(cfg, field, value)
+    return cfg
+
+###
+#   Function to split network overrides such as {'link.fidelity': 0.95, 'qdevice.T1': 1e9}
+#   into one dictionary of fields per configuration ('qdevice', 'link' or 'clink').
+###
+def _split_overrides(overrides: dict=None):
+    split = {"qdevice": {}, "link": {}, "clink": {}}
+    for key, value in (overrides or {}).items():
+        prefix, _, field = key.partition('.')
+        if prefix not in split or not field:
+            raise ValueError(f"Override '{key}' must have the form 'qdevice.<field>', 'link.<field>' or 'clink.<field>'")
+        split[prefix][field] = value
+    return split
+
+###
+#   Function to list the links a protocol needs, given the programs it runs.
+#   GHZ states are distributed with create_ghz along the chain node_names[0] - ... - node_names[-1],
+#   which only uses EPR pairs and correction messages between neighbours. Verification and
+#   sensing protocols also exchange classical messages between the verifier (node_names[0])
+#   and every member, so their classical links form the chain plus a star around the verifier.
+#   Without programs the verification topology is assumed, since it covers every protocol.
+#   Returns the lists of quantum and classical links as (node1, node2) pairs.
+###
+def protocol_links(node_names: List[str], programs: dict=None):
+    quantum_links = [(node_names[i], node_names[i+1]) for i in range(len(node_names)-1)]
+    classical_links = list(quantum_links)
+    if programs is None or any("verifier" in type(program).__name__.lower() for program in programs.values()):
+        classical_links += [(node_names[0], name) for name in node_names[2:]]
+    return quantum_links, classical_links
+
+###
+#   Function to generate a network configuration with only the given links.
+#   Sparse counterpart of create_complete_graph_network: with the links of protocol_links,
+#   the network has O(n) instead of n(n-1)/2 quantum and classical links.
+###
+def create_protocol_network(node_names: List[str], quantum_links: list, classical_links: list,
+                            link_typ: str, link_cfg, clink_typ: str, clink_cfg, qdevice_typ: str, qdevice_cfg):
+    network_cfg = StackNetworkConfig(stacks=[], links=[], clinks=[])
+    for name in node_names:
+        network_cfg.stacks.append(StackConfig(name=name, qdevice_typ=qdevice_typ, qdevice_cfg=qdevice_cfg))
+    for node1, node2 in quantum_links:
+        network_cfg.links.append(LinkConfig(stack1=node1, stack2=node2, typ=link_typ, cfg=link_cfg))
+    for node1, node2 in classical_links:
+        network_cfg.clinks.append(CLinkConfig(stack1=node1, stack2=node2, typ=clink_typ, cfg=clink_cfg))
+    return network_cfg
+
+###
+#   Function to generate a metro-hub network configuration (see qia_network_params/create_metro_hub.py).
+#   Every node is connected to a central hub at hub_distance km, which schedules entanglement
+#   generation between pairs of nodes: max_multiplexing pairs can generate entanglement in parallel,
+#   and switching to a new pair takes switch_time ns.
+#   The link parameters assume 50 km between nodes, so the hub is placed halfway by default.
+###
+def create_hub_network(node_names: List[str], link_typ: str, link_cfg, clink_typ: str, clink_cfg, qdevice_typ: str,
+                       qdevice_cfg, max_multiplexing: int=1, switch_time: float=1000, hub_distance: float=25):
+    link_cfg = copy.deepcopy(link_cfg)
+    clink_cfg = copy.deepcopy(clink_cfg)
+    if getattr(link_cfg, "t_cycle", None) is not None:
+        # The hub sets the distances, so the cycle time of the link parameters is kept by
+        # changing the speed of light used by the entanglement generation model instead
+        link_cfg.speed_of_light = 2 * hub_distance / (link_cfg.t_cycle * 1e-9)
+        link_cfg.t_cycle = None
+    if getattr(clink_cfg, "length", None) is not None:
+        clink_cfg.length = None
+    schedule_cfg = FIFOScheduleConfig(max_multiplexing=max_multiplexing, switch_time=switch_time)
+
+    network_cfg = create_metro_hub_network(
+            node_names,
+            [hub_distance for _ in node_names],
+            qlink_typ=link_typ,
+            qlink_cfg=link_cfg,
+            clink_typ=clink_typ,
+            clink_cfg=clink_cfg,
+            qdevice_typ=qdevice_typ,
+            qdevice_cfg=qdevice_cfg,
+            schedule_typ="fifo",
+            schedule_cfg=schedule_cfg
+        )
+    return network_cfg
+
+###
+#   Function to generate a network configuration with the requested topology:
+#   'protocol' for the links used by the programs (see protocol_links), 'complete',
+#   or 'hub' for a metro hub configured by hub_params (see create_hub_network).
+###
+def _build_network(node_names: List[str], topology: str, programs: dict, hub_params: dict=None, **network_params):
+    if topology == "protocol":
+        quantum_links, classical_links = protocol_links(node_names, programs)
+        return create_protocol_network(node_names, quantum_links, classical_links, **network_params)
+    elif topology == "complete":
+        return create_complete_graph_network(node_names, **network_params)
+    elif topology == "hub":
+        return create_hub_network(node_names, **network_params, **(hub_params or {}))
+    else:
+        raise ValueError("Topology must be 'protocol', 'complete' or 'hub'.")
+
 ###
 #   Function to load configuration for a generic qdevice from YAML file.
 #   Files should be in folder named 'qia_params' in the working directory.
 #   Files must be named qdevice_params{_current, _optimistic}.yaml
+#   Each file is parsed once; every call returns a fresh copy with the given field overrides.
 ###
-def configure_qdevice(use_optimistic: bool=False, is_perfect: bool=False, num_qubits: int=100):
+def configure_qdevice(use_optimistic: bool=False, is_perfect: bool=False, num_qubits: int=100, overrides: dict=None):
     if is_perfect:
         # Generate generic qdevice configuration with no noise
         qdevice_cfg = GenericQDeviceConfig.perfect_config(num_qubits)
     else:
         postfix = "_optimistic" if use_optimistic else "_current"
         # Load generic qdevice configuration from YAML file
-        qdevice_cfg = GenericQDeviceConfig.from_file(f"qia_params/qdevice_params{postfix}.yaml")
+        qdevice_cfg = _load_config(GenericQDeviceConfig, f"qia_params/qdevice_params{postfix}.yaml")
         qdevice_cfg.num_qubits = num_qubits
 
-    return qdevice_cfg
+    return _apply_overrides(qdevice_cfg, overrides)
 
 ###
 #   Function to load configuration for a quantum link from YAML file.
@@ -93,22 +217,23 @@ def configure_qdevice(use_optimistic: bool=False, is_perfect: bool=False, num_qu
 #   If not specified, 'depolarise' configuration will be created by default.
 #   Files should be in folder named 'qia_params' in the working directory.
 #   Files must be named link_params{_current, _optimistic}{_high_fid}.yaml
+#   Each file is parsed once; every call returns a fresh copy with the given field overrides.
 ###
-def configure_link(use_high_fidelity: bool=False, use_optimistic: bool=False, link_typ: str="depolarise"):
+def configure_link(use_high_fidelity: bool=False, use_optimistic: bool=False, link_typ: str="depolarise", overrides: dict=None):
     if link_typ == "perfect":
         # Generate perfect link configuration
-        link_cfg = DepolariseQLinkConfig.from_file(f"qia_params/link_params_perfect.yaml")
+        link_cfg = _load_config(DepolariseQLinkConfig, f"qia_params/link_params_perfect.yaml")
     else:
         postfix = "_optimistic" if use_optimistic else "_current"
         if use_high_fidelity:
             postfix += "_high_fid" 
         # Load link configuration based on link type requested
         if link_typ == "depolarise":
-            link_cfg = DepolariseQLinkConfig.from_file(f"qia_params/link_params{postfix}.yaml")
+            link_cfg = _load_config(DepolariseQLinkConfig, f"qia_params/link_params{postfix}.yaml")
         else:
             raise ValueError("Unsupported link type")
     
-    return link_cfg
+    return _apply_overrides(link_cfg, overrides)
 
 
 ### 
@@ -116,19 +241,30 @@ def configure_link(use_high_fidelity: bool=False, use_optimistic: bool=False, li
 #   Uses configure_device and configure_link to generate stack and link configurations.
 #   Link type is 'depolarise' by default
 #   Generates a clink configuration based on 50 km separation and speed of light of 200,000 km/s.
-#   Returns StackNetworkConfig object generated by create_complete_graph_network function
+#   Fields of the qdevice, link and clink configurations can be replaced with overrides,
+#   e.g. overrides={'link.fidelity': 0.95, 'qdevice.T1': 1e9}, without touching shared objects.
+#   Only the links used by the programs are created (see protocol_links), unless topology='complete'.
+#   With topology='hub', all nodes are connected through a metro hub that runs up to max_multiplexing
+#   entanglement generations in parallel and takes switch_time ns to switch between node pairs.
+#   Returns StackNetworkConfig object
 ###
-def configure_network(node_names: List[str], use_high_fidelity: bool, use_optimistic: bool, link_typ: str='depolarise'):
+def configure_network(node_names: List[str], use_high_fidelity: bool, use_optimistic: bool, link_typ: str='depolarise',
+                      overrides: dict=None, programs: dict=None, topology: str='protocol',
+                      max_multiplexing: int=1, switch_time: float=1000):
+    overrides = _split_overrides(overrides)
     # Load generic qdevice configuration from YAML file
-    qdevice_cfg = configure_qdevice(use_optimistic)
+    qdevice_cfg = configure_qdevice(use_optimistic, overrides=overrides["qdevice"])
     # Create clink configuration 
-    clink_cfg = DefaultCLinkConfig(speed_of_light=200_000, length=50)
+    clink_cfg = _apply_overrides(DefaultCLinkConfig(speed_of_light=200_000, length=50), overrides["clink"])
     # Load link configuration based on link type requested
-    link_cfg = configure_link(use_high_fidelity, use_optimistic, link_typ)
+    link_cfg = configure_link(use_high_fidelity, use_optimistic, link_typ, overrides=overrides["link"])
     
     # Create network configuration based on given parameters
-    network_cfg = create_complete_graph_network(
+    network_cfg = _build_network(
             node_names,
+            topology,
+            programs,
+            hub_params={"max_multiplexing": max_multiplexing, "switch_time": switch_time},
             link_typ=link_typ,
             link_cfg=link_cfg,
             clink_typ="default",
@@ -143,8 +279,10 @@ def configure_network(node_names: List[str], use_high_fidelity: bool, use_optimi
 #   Function to generate configuration for a noiseless network.
 #   Uses configure_qdevice to generate generic qdevice config with no noise.
 #   Generates default link and clink config with 100 ns delay
+#   Only the links used by the programs are created, unless topology='complete' or 'hub'.
 ###
-def configure_perfect_network(node_names: List[str]):
+def configure_perfect_network(node_names: List[str], programs: dict=None, topology: str='protocol',
+                              max_multiplexing: int=1, switch_time: float=1000):
     # Generate generic qdevice config with no noise
     qdevice_cfg = configure_qdevice(is_perfect=True)
     # Create clink configuration 
@@ -153,8 +291,11 @@ def configure_perfect_network(node_names: List[str]):
     link_cfg = PerfectQLinkConfig(state_delay=100)
 
     # Create network configuration based on given parameters
-    network_cfg = create_complete_graph_network(
+    network_cfg = _build_network(
             node_names,
+            topology,
+            programs,
+            hub_params={"max_multiplexing": max_multiplexing, "switch_time": switch_time},
             link_typ="perfect",
             link_cfg=link_cfg,
             clink_typ="default",
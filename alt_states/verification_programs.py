@@ -8,6 +8,7 @@ from squidasm.sim.stack.program import Program, ProgramContext, ProgramMeta # ty
 from squidasm.util.routines import create_ghz # type: ignore
 
 from squidasm.util.util import get_qubit_state # type: ignore
+from phase_timer import phase_timer
 
 ###
 #   This class defines the program run by the Verifier node of the quantum network.
@@ -33,13 +34,15 @@ from squidasm.util.util import get_qubit_state # type: ignore
 #       5.  It outputs the average failure rate over all stabilizers and its target qubit.
 ###
 class GHZProgram_verifier(Program):
-    def __init__(self, name: str, node_names: List[str], ntest: int):
+    def __init__(self, name: str, node_names: List[str], ntest: int, timings: bool=False):
         self.name = name
         self.node_names = node_names
         self.peer_names = [peer for peer in self.node_names if peer != self.name]
         self.num_nodes = len(self.node_names)
         self.ntest = ntest
         self.ntotal = 2 * self.num_nodes * self.ntest
+        # If True, time spent per protocol phase is returned under the 'timings' key
+        self.timings = timings
 
     @property
     def meta(self) -> ProgramMeta:
@@ -52,6 +55,7 @@ class GHZProgram_verifier(Program):
     
     def run(self, context: ProgramContext):
         connection = context.connection
+        timer = phase_timer(self.timings)
 
         ### 
         # Protocol to distribute GHZ states with peer nodes 
@@ -79,6 +83,7 @@ class GHZProgram_verifier(Program):
 
         qubits = []
         # Get the appropriate qubit from each of the ntotal GHZ copies
+        timer.start("distribution")
         for c in copies:
             qubit, _ = yield from create_ghz(
                 connection,
@@ -157,6 +162,7 @@ class GHZProgram_verifier(Program):
             #print(f"{self.name} will measure in {basis} basis")
 
             # Send all the other nodes the relevant info to make their measurements
+            timer.start("classical")
             for node_index in range(1, self.num_nodes):
                 peer_index = node_index - 1
                 csocket = csockets[peer_index]
@@ -167,6 +173,7 @@ class GHZProgram_verifier(Program):
                 #print(f"{self.peer_names[peer_index]} will measure in {measure_bases[node_index]} basis")
                 
             # Make measurement
+            timer.start("measurement")
             local_results = []
             for c in measure_Ks:
                 qubits[c].K() if basis == 'Y' else qubits[c].H()
@@ -178,12 +185,14 @@ class GHZProgram_verifier(Program):
                 qubits[c] = None
 
             # Combine measurement results with those received from peer nodes
+            timer.start("classical")
             measurements = np.array([(-1)**int(r) for r in local_results])
             for csocket in csockets:
                 peer_x_results = yield from csocket.recv()
                 measurements = np.vstack((measurements, peer_x_results))
 
             # Calculate failure rate
+            timer.start("evaluation")
             measurements = measurements.transpose()
             num_failures = 0
             #print("Measurement results:")
@@ -206,6 +215,7 @@ class GHZProgram_verifier(Program):
         target_id = random.choice(copies)
         #print(f"Copies remaining: {copies} \n")
         #print(f"Verifier selected copy {target_id} as target\n")
+        timer.start("classical")
         for csocket in csockets:
             csocket.send(target_id)
         
@@ -214,8 +224,9 @@ class GHZProgram_verifier(Program):
         del qubits
         collected = gc.collect()
         
+        timer.start("evaluation")
         avg_failure_rate = np.average(failure_rates)
-        return {"name": self.name, "average failure rate": avg_failure_rate, "target qubit": target}
+        return timer.report({"name": self.name, "average failure rate": avg_failure_rate, "target qubit": target})
 
 ###
 #   This class defines the program run by all nodes of the network except the Verifier.
@@ -239,13 +250,15 @@ class GHZProgram_verifier(Program):
 #       5.  It outputs the target qubit.
 ###
 class GHZProgram_member(Program):
-    def __init__(self, name: str, node_names: List[str], ntest: int):
+    def __init__(self, name: str, node_names: List[str], ntest: int, timings: bool=False):
         self.name = name
         self.node_names = node_names
         self.peer_names = [peer for peer in self.node_names if peer != self.name]
         self.num_nodes = len(self.node_names)
         self.ntest = ntest
         self.ntotal = 2 * self.num_nodes * self.ntest
+        # If True, time spent per protocol phase is returned under the 'timings' key
+        self.timings = timings
 
     @property
     def meta(self) -> ProgramMeta:
@@ -258,6 +271,7 @@ class GHZProgram_member(Program):
     
     def run(self, context: ProgramContext):
         connection = context.connection
+        timer = phase_timer(self.timings)
         ### 
         # Protocol to distribute GHZ states with peer nodes 
         ###
@@ -282,6 +296,7 @@ class GHZProgram_member(Program):
         copies = list(range(self.ntotal))
         qubits = []
         # Get the appropriate qubit from each of the ntotal GHZ states
+        timer.start("distribution")
         for c in copies:
             qubit, _ = yield from create_ghz(
                 connection,
@@ -310,12 +325,14 @@ class GHZProgram_member(Program):
 
         for s in stabilizers:
             # Receive indices for the copies to be measured
+            timer.start("classical")
             measure_Ks = yield from csocket.recv()
             # Receive measurement basis from Verifier
             basis = yield from csocket.recv()
             #print(f"{self.name} will measure in {basis} basis")
 
             # Make measurement
+            timer.start("measurement")
             local_results = []
             for c in measure_Ks:
                 qubits[c].K() if basis == 'Y' else qubits[c].H()
@@ -328,6 +345,7 @@ class GHZProgram_member(Program):
                 qubits[c] = None
             
             # Send results to Verifier
+            timer.start("classical")
             local_results = [(-1)**int(r) for r in local_results]
             csocket.send(local_results)
 
@@ -339,4 +357,4 @@ class GHZProgram_member(Program):
         del qubits
         collected = gc.collect()
 
-        return {"name": self.name, "target qubit": target}
\ No newline at end of file
+        return timer.report({"name": self.name, "target qubit": target})
\ No newline at end of file
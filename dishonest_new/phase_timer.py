@@ -0,0 +1,90 @@
+import time
+import netsquid as ns
+
+###
+#   Optional per-phase timing of the protocol programs.
+#
+#   A PhaseTimer accumulates the wall-clock time (s) and the NetSquid simulated time (ns) spent
+#   in each phase, from start(phase) until the next start() or stop(). Programs are generators
+#   that yield to the simulator, so the wall-clock time of a phase also counts the time the
+#   simulator spends on other nodes while this node waits, e.g. in a recv or a flush.
+#
+#   Programs add the totals to their result dict with report(result). When timing is disabled,
+#   programs hold NO_TIMINGS instead, whose methods do nothing, and their results have no
+#   'timings' key.
+###
+PHASES = ("distribution", "measurement", "classical", "evaluation")
+
+class PhaseTimer:
+    def __init__(self):
+        self.wall_time = {phase: 0.0 for phase in PHASES}
+        self.sim_time = {phase: 0.0 for phase in PHASES}
+        self._phase = None
+        self._wall_start = 0.0
+        self._sim_start = 0.0
+
+    def start(self, phase: str):
+        self.stop()
+        self._phase = phase
+        self._wall_start = time.perf_counter()
+        self._sim_start = ns.sim_time()
+
+    def stop(self):
+        if self._phase is not None:
+            self.wall_time[self._phase] += time.perf_counter() - self._wall_start
+            self.sim_time[self._phase] += ns.sim_time() - self._sim_start
+            self._phase = None
+
+    # Totals per phase, as stored under the 'timings' key of a result dict
+    def totals(self):
+        self.stop()
+        return {phase: {"wall_s": self.wall_time[phase], "sim_ns": self.sim_time[phase]}
+                for phase in PHASES}
+
+    def report(self, result: dict):
+        result["timings"] = self.totals()
+        return result
+
+
+class _NoTimings:
+    def start(self, phase: str):
+        pass
+
+    def stop(self):
+        pass
+
+    def report(self, result: dict):
+        return result
+
+NO_TIMINGS = _NoTimings()
+
+def phase_timer(enabled: bool):
+    return PhaseTimer() if enabled else NO_TIMINGS
+
+###
+#   Function to add the timings of all result dicts returned by one call of run()
+#   to running totals {program name: {phase: {'wall_s', 'sim_ns'}}}.
+#   Results without timings are skipped. Returns the updated totals.
+###
+def accumulate_timings(totals: dict, results: list):
+    for program_results in results:
+        for result in program_results:
+            if "timings" not in result:
+                continue
+            node_totals = totals.setdefault(result["name"], {phase: {"wall_s": 0.0, "sim_ns": 0.0}
+                                                             for phase in PHASES})
+            for phase, timing in result["timings"].items():
+                node_totals[phase]["wall_s"] += timing["wall_s"]
+                node_totals[phase]["sim_ns"] += timing["sim_ns"]
+    return totals
+
+###
+#   Function to format accumulated timings as a table, one row per program and phase.
+###
+def format_timings(totals: dict):
+    lines = [f"{'node':<10} {'phase':<14} {'wall (s)':>10} {'simulated (ms)':>15}"]
+    for name, node_totals in totals.items():
+        for phase in PHASES:
+            lines.append(f"{name:<10} {phase:<14} {node_totals[phase]['wall_s']:>10.3f} "
+                         f"{node_totals[phase]['sim_ns'] * 1e-6:>15.3f}")
+    return "\n".join(lines)
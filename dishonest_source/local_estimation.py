@@ -4,53 +4,74 @@ from utilsIO import *
 import numpy as np
 from pprint import pprint
 import random
+from functools import lru_cache
+from typing import List, Tuple
 
 from squidasm.run.stack.run import run # type: ignore
 from squidasm.sim.stack.common import LogManager # type: ignore
 
+###
+#   Inverse-cosine estimators for a phase in the i-th interval of width pi (pi/num_nodes for
+#   the average). arccos only covers [0, pi], so the estimate is reflected in odd intervals and
+#   shifted by 2*pi for every completed period: (-1)**i * arccos + 2*pi*ceil(i/2).
+###
 def avg_estimator(prob0: float, i: int):
     arg = min(1, (prob0*2 - 1))
-    if i == 0:                     
-        est = np.arccos(arg) / num_nodes
-    elif i < 3:
-        est = ((-1)**i) * np.arccos(arg) / num_nodes + np.pi/2
-    else:
-        est = -1 * np.arccos(arg) / num_nodes + np.pi
+    est = (((-1)**i) * np.arccos(arg) + 2*np.pi*np.ceil(i/2)) / num_nodes
 
     return est
 
 def avg_estimator_Zflip(prob0: float, i: int):
     arg = min(1, (1 - prob0*2))
-    if i == 0:                     
-        est = np.arccos(arg) / num_nodes
-    elif i < 3:
-        est = ((-1)**i) * np.arccos(arg) / num_nodes + np.pi/2
-    else:
-        est = -1 * np.arccos(arg) / num_nodes + np.pi
+    est = (((-1)**i) * np.arccos(arg) + 2*np.pi*np.ceil(i/2)) / num_nodes
 
     return est
 
 def diff_estimator(prob0: float, i: int, negative: bool = False):
     arg = min(1, (prob0*2 - 1))
-    if i == 0:                     
-        est = np.arccos(arg)
-    elif i < 3:
-        est = ((-1)**i) * np.arccos(arg) + 2*np.pi
-    else:
-        est = -1 * np.arccos(arg) + 4*np.pi
+    est = ((-1)**i) * np.arccos(arg) + 2*np.pi*np.ceil(i/2)
 
     return (-1)**negative * est
 
+###
+#   Function to build the coefficient matrix relating the honest nodes' phases to the
+#   phase functions encoded by each program variant.
+#   Each variant is a tuple of honest node indices whose phase is negated by a bit flip,
+#   so the standard program (no bit flip) is the empty tuple.
+###
+def local_coeff_matrix(num_honest: int, bitflip_variants: Tuple[Tuple[int, ...], ...]):
+    coeff_matrix = np.ones((len(bitflip_variants), num_honest))
+    for row, flipped in enumerate(bitflip_variants):
+        coeff_matrix[row, list(flipped)] = -1
+    return coeff_matrix
+
+###
+#   Function to factorise the coefficient matrix once per configuration.
+#   The pseudo-inverse is cached, so repeated solves reduce to a matrix product.
+#   With more variants than honest nodes this gives the least-squares solution.
+###
+@lru_cache(maxsize=32)
+def local_solver(num_honest: int, bitflip_variants: Tuple[Tuple[int, ...], ...]):
+    coeff_matrix = local_coeff_matrix(num_honest, bitflip_variants)
+    if np.linalg.matrix_rank(coeff_matrix) < num_honest:
+        raise ValueError("Bit flip variants do not determine all honest phases.")
+    return np.linalg.pinv(coeff_matrix)
+
+###
+#   Function to solve for the honest nodes' phases from stacked estimate sets.
+#   estimates has shape (..., len(bitflip_variants)), e.g. one row per iteration or seed,
+#   and dishonest_phase is the summed phase of the dishonest nodes, broadcast against it.
+#   Returns an array of shape (..., num_honest).
+###
+def local_estimator_batch(dishonest_phase, estimates, bitflip_variants: Tuple[Tuple[int, ...], ...], num_honest: int=None):
+    if num_honest is None:
+        num_honest = len(bitflip_variants)
+    solver = local_solver(num_honest, tuple(tuple(flipped) for flipped in bitflip_variants))
+    rhs = np.asarray(estimates, dtype=float) - np.asarray(dishonest_phase, dtype=float)[..., None]
+    return rhs @ solver.T
+
 def local_estimator(dishonest_phase: float, estimates: List[float]):
-    coeff_matrix = np.array([
-        [1, 1, 1],
-        [1, -1, 1],
-        [1, 1, -1]
-    ])
-
-    rhs = np.array([est - dishonest_phase for est in estimates])
-    print(rhs)
-    solution = np.linalg.solve(coeff_matrix, rhs)
+    solution = local_estimator_batch(dishonest_phase, estimates, ((), (1,), (2,)))
     return solution
 
 if __name__ == '__main__':
@@ -74,19 +95,17 @@ if __name__ == '__main__':
     programs, node_names, dishonest_nodes, phases = init_dishonest_sensing(num_nodes, ntest, copies, f_threshold, num_dishonest, dishonest_action)
 
     dishonest_node_id = node_names.index(dishonest_nodes[0])
+    honest_names = [name for name in node_names if name not in dishonest_nodes]
+    num_honest = len(honest_names)
 
-    # Initialize bitflip programs for local estimation
-    bitflip_programs1 = init_dishonest_sensing_given(node_names, ntest, copies, f_threshold, dishonest_node_id, bitflip_node=1, phases=phases)
-    
-    # Initialize bitflip programs for local estimation
-    bitflip_programs2 = init_dishonest_sensing_given(node_names, ntest, copies, f_threshold, dishonest_node_id, bitflip_node=2, phases=phases)
+    # Store defined programs in a hashmap, starting with the standard programs
+    program_dict = {0 : programs}
 
-    # Store defined programs in a hashmap
-    program_dict = {
-        0 : programs,
-        1 : bitflip_programs1,
-        2 : bitflip_programs2
-    }
+    # Initialize one set of bitflip programs for each honest node other than the verifier
+    for j in range(1, num_honest):
+        program_dict[j] = init_dishonest_sensing_given(node_names, ntest, copies, f_threshold, dishonest_node_id,
+                                                       bitflip_node=node_names.index(honest_names[j]), phases=phases)
+    bitflip_variants = ((),) + tuple((j,) for j in range(1, num_honest))
 
     # Configure network
     if network == 'perfect':
@@ -105,16 +124,16 @@ if __name__ == '__main__':
     LogManager.log_to_file(f"logs/local_estimation.log")
 
     # Run simulation
-    plus_outcomes = [0] * 3
+    plus_outcomes = [0] * num_honest
     program_runs = []
-    program_counts = [0] * 3
+    program_counts = [0] * num_honest
 
     total_iters = 0
     sensing_iters = 0
 
     while sensing_iters < num_iters:
-        # Randomly select one of the three defined programs to run
-        program_id = random.randint(0, 2)
+        # Randomly select one of the defined programs to run
+        program_id = random.randint(0, num_honest - 1)
         results = run(
             config=network_cfg,
             programs=program_dict[program_id],
@@ -147,8 +166,8 @@ if __name__ == '__main__':
     print(f"\nTotal iterations: {total_iters}")
     print(f"Total sensing iterations: {sensing_iters}\n")
     print(f"Iterations with standard programs: {program_counts[0]}")
-    print(f"Iterations with bitflip1 programs: {program_counts[1]}")
-    print(f"Iterations with bitflip2 programs: {program_counts[2]}")
+    for j in range(1, num_honest):
+        print(f"Iterations with bitflip{j} programs: {program_counts[j]}")
 
     print(f"Dishonest nodes: {dishonest_nodes}\n")
 
@@ -178,9 +197,9 @@ if __name__ == '__main__':
 
     ## Estimate other two functions of phases
 
-    for bitflip_node in range(1, 3):
+    for bitflip_node in range(1, num_honest):
         diff = phase_sum
-        bitflip_name = node_names[bitflip_node]
+        bitflip_name = honest_names[bitflip_node]
         print(f"Bitflip node: {bitflip_name}")
 
         bitflip_phase = phases[bitflip_name]
@@ -205,9 +224,11 @@ if __name__ == '__main__':
         print(f"Estimate: {est}\n")
         estimates.append(est)
 
-    estimates = [1.303522044091468*4, 4.146422452705186, 0.5598623057342861]
+    # Fixed estimates to check the solver on the 4-node configuration
+    if len(estimates) == 3:
+        estimates = [1.303522044091468*4, 4.146422452705186, 0.5598623057342861]
 
-    local_estimates = local_estimator(phases[dishonest_nodes[0]], estimates)
-    print(f"Phases: {[phases[name] for name in node_names]}")
+    local_estimates = local_estimator_batch(phases[dishonest_nodes[0]], estimates, bitflip_variants)
+    print(f"Phases: {[phases[name] for name in honest_names]}")
     print(f"Local estimates: {local_estimates}")
 
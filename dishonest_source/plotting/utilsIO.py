@@ -1,3 +1,7 @@
+import os
+import re
+import ast
+import json
 import numpy as np
 
 #   Writes two arrays x and y to a text file.
@@ -27,47 +31,205 @@ def write_to_file_multiy(filename, x, y1, y2, y3=None, y4=None, y5=None):
 
 #   Reads two arrays from a text file.
 def read_from_file(filename):
-    x, y = [], []
-    with open(filename, 'r') as f:
-        for line in f:
-            if line.startswith('#'):
-                continue
-            values = line.split()
-            x.append(float(values[0]))
-            y.append(float(values[1]))
-    return np.array(x), np.array(y)
+    columns, _ = read_text_columns(filename)
+    return _text_column(columns, 0), _text_column(columns, 1)
 
 #   Reads three arrays from a text file.
 def read_from_file2x(filename):
-    x1, x2, y = [], [], []
-    with open(filename, 'r') as f:
-        for line in f:
-            if line.startswith('#'):
-                continue
-            values = line.split()
-            x1.append(float(values[0]))
-            x2.append(float(values[1]))
-            y.append(float(values[2]))
-    return np.array(x1), np.array(x2), np.array(y)
+    columns, _ = read_text_columns(filename)
+    return _text_column(columns, 0), _text_column(columns, 1), _text_column(columns, 2)
 
 #   Reads 3 to 5 arrays from a text file
 def read_from_file_multiy(filename, num_y=2):
-    x, y1, y2, y3, y4, y5 = [], [], [], [], [], []
+    columns, _ = read_text_columns(filename)
+    arrays = [_text_column(columns, i) if i <= max(num_y, 2) else np.array([]) for i in range(6)]
+    return tuple(arrays)
+
+###
+#   Columnar binary result files (.npcol).
+#
+#   Layout: a 6-byte magic string, a little-endian uint32 header length and a JSON header
+#   {"columns": [...], "rows": n, "dtype": "<f8", "parameters": {...}}, padded so that the
+#   data starts on a 64-byte boundary. The data follows as one contiguous block per column,
+#   so every column can be returned as a zero-copy view of a read-only memory map.
+###
+COLUMN_FILE_MAGIC = b'\x93NPCOL'
+COLUMN_FILE_EXTENSION = '.npcol'
+
+def _json_value(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return str(value)
+
+#   Writes named columns and a parameter dictionary to a columnar binary file.
+#   An optional source dictionary is stored in the header, e.g. to validate caches.
+def write_columns(filename, columns, parameters=None, source=None):
+    names = list(columns.keys())
+    data = np.array([np.asarray(columns[name], dtype='<f8') for name in names])
+    header = {"columns": names,
+              "rows": int(data.shape[1]) if len(names) else 0,
+              "dtype": '<f8',
+              "parameters": parameters if parameters is not None else {}}
+    if source is not None:
+        header["source"] = source
+    header = json.dumps(header, default=_json_value).encode('utf-8')
+    prefix = len(COLUMN_FILE_MAGIC) + 4
+    header += b' ' * (-(prefix + len(header)) % 64)
+    tmp_filename = f"{filename}.{os.getpid()}.tmp"
+    with open(tmp_filename, 'wb') as f:
+        f.write(COLUMN_FILE_MAGIC)
+        f.write(np.uint32(len(header)).astype('<u4').tobytes())
+        f.write(header)
+        f.write(np.ascontiguousarray(data).tobytes())
+    # Readers never see a partially written file
+    os.replace(tmp_filename, filename)
+
+#   Reads the header of a columnar binary file. Returns (header dictionary, data offset).
+def read_columns_header(filename):
+    with open(filename, 'rb') as f:
+        magic = f.read(len(COLUMN_FILE_MAGIC))
+        if magic != COLUMN_FILE_MAGIC:
+            raise ValueError(f"{filename} is not a columnar result file")
+        header_len = int(np.frombuffer(f.read(4), dtype='<u4')[0])
+        header = json.loads(f.read(header_len).decode('utf-8'))
+    return header, len(COLUMN_FILE_MAGIC) + 4 + header_len
+
+#   Reads a columnar binary file. Returns ({column name: array}, parameters).
+#   With mmap=True the columns are zero-copy views of a read-only memory map.
+def read_columns(filename, mmap=True):
+    header, offset = read_columns_header(filename)
+    names = header["columns"]
+    shape = (len(names), header["rows"])
+    if mmap and header["rows"] > 0:
+        data = np.memmap(filename, dtype=header["dtype"], mode='r', offset=offset, shape=shape)
+    else:
+        with open(filename, 'rb') as f:
+            f.seek(offset)
+            data = np.fromfile(f, dtype=header["dtype"]).reshape(shape)
+    return {name: data[i] for i, name in enumerate(names)}, header["parameters"]
+
+#   Parses a "key=value, key=value" parameter line. Values are read as Python literals when possible.
+def _parse_parameter_line(line):
+    parameters = {}
+    for token in re.split(r',\s*(?=[A-Za-z_][\w\s]*=)', line.strip()):
+        if '=' not in token:
+            continue
+        key, value = token.split('=', 1)
+        try:
+            parameters[key.strip()] = ast.literal_eval(value.strip())
+        except (ValueError, SyntaxError):
+            parameters[key.strip()] = value.strip()
+    return parameters
+
+#   Parses the "# parameters:" and "# columns:" comment header of a text result file.
+#   Returns (parameters, column names); column names are empty if the file has no header.
+def read_text_header(filename):
+    parameters, names = {}, []
+    section = None
     with open(filename, 'r') as f:
         for line in f:
-            if line.startswith('#'):
+            if not line.startswith('#'):
+                break
+            content = line[1:].strip()
+            if content.lower().startswith('parameters:'):
+                section = 'parameters'
+            elif content.lower().startswith('columns:'):
+                section = 'columns'
+            elif section == 'parameters':
+                parameters.update(_parse_parameter_line(content))
+            elif section == 'columns':
+                names.extend(content.split())
+    return parameters, names
+
+#   Converts one text result file to a columnar binary file next to it.
+#   Columns without a name in the header are called x, y1, y2, ...
+def convert_text_file(filename, out_filename=None):
+    if out_filename is None:
+        out_filename = os.path.splitext(filename)[0] + COLUMN_FILE_EXTENSION
+    columns, parameters = read_text_columns(filename, use_cache=False)
+    write_columns(out_filename, columns, parameters)
+    return out_filename
+
+#   Converts every .txt file under a data directory. Files that cannot be parsed as
+#   numeric columns are skipped and reported. Returns the list of written files.
+def convert_data_directory(directory="data"):
+    converted = []
+    for root, _, files in os.walk(directory):
+        for name in sorted(files):
+            if not name.endswith('.txt'):
                 continue
-            values = line.split()
-            x.append(float(values[0]))
-            y1.append(float(values[1]))
-            y2.append(float(values[2]))
-            if num_y > 2:
-                y3.append(float(values[3]))
-                if num_y > 3:
-                    y4.append(float(values[4]))
-                    if num_y > 4:
-                        y5.append(float(values[5]))
-    return np.array(x), np.array(y1), np.array(y2), np.array(y3), np.array(y4), np.array(y5)
+            filename = os.path.join(root, name)
+            try:
+                converted.append(convert_text_file(filename))
+            except ValueError as e:
+                print(f"Skipping {filename}: {e}")
+    return converted
+
+###
+#   Fast reader for text result files.
+#
+#   The whole file is parsed in one np.loadtxt call and the "# parameters:" / "# columns:"
+#   header gives the column names. The parsed columns are cached next to the file in a hidden
+#   columnar binary sidecar (.<name>.npcol) holding the size and modification time of the
+#   text file, so repeated reads of an unchanged file only map the cached columns.
+###
+def _text_cache_filename(filename):
+    directory, name = os.path.split(filename)
+    return os.path.join(directory, f".{name}{COLUMN_FILE_EXTENSION}")
+
+#   Parses all numeric rows of a text file. Rows of different lengths are padded with nan.
+def _load_text_data(filename):
+    try:
+        data = np.loadtxt(filename, comments='#', ndmin=2)
+    except ValueError:
+        with open(filename, 'r') as f:
+            rows = [line.split() for line in f if not line.startswith('#') and line.strip()]
+        width = max(len(row) for row in rows)
+        data = np.full((len(rows), width), np.nan)
+        for i, row in enumerate(rows):
+            data[i, :len(row)] = [float(v) for v in row]
+    if data.size == 0:
+        data = np.empty((0, 0))
+    return data
+
+#   Column i of a parsed text file, or an empty array for an empty file.
+def _text_column(columns, i):
+    values = list(columns.values())
+    if i < len(values):
+        return np.array(values[i])
+    if len(values) == 0 or len(values[0]) == 0:
+        return np.array([])
+    raise IndexError(f"File has only {len(values)} columns")
+
+#   Reads a text result file. Returns ({column name: array}, parameters).
+#   Columns without a name in the header are called x, y1, y2, ...
+def read_text_columns(filename, use_cache=True):
+    stat = os.stat(filename)
+    source = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+    cache_filename = _text_cache_filename(filename)
+    if use_cache and os.path.exists(cache_filename):
+        try:
+            header, _ = read_columns_header(cache_filename)
+            if header.get("source") == source:
+                return read_columns(cache_filename)
+        except (ValueError, OSError):
+            pass
+
+    parameters, names = read_text_header(filename)
+    data = _load_text_data(filename)
+    num_cols = data.shape[1]
+    if len(names) != num_cols:
+        names = ['x'] + [f"y{i}" for i in range(1, num_cols)]
+    columns = {name: data[:, i] for i, name in enumerate(names)}
+    if use_cache:
+        try:
+            write_columns(cache_filename, columns, parameters, source=source)
+        except OSError:
+            # Read-only data directories are parsed every time
+            pass
+    return columns, parameters
 
 if __name__ == "__main__":
     # Example usage:
@@ -0,0 +1,33 @@
+import numpy as np
+from local_estimation import diff_estimator, local_estimator_batch
+
+###
+#   Check of the local estimation on a 5-node network (4 honest nodes, 1 dishonest),
+#   where the encoded phase sums exceed 4*pi.
+#   Run with: python -m pytest test_local_estimation.py
+###
+def pi_interval(diff: float):
+    i = 0
+    while abs(diff) % ((i+1)*np.pi) != abs(diff):
+        i += 1
+    return i
+
+def test_five_nodes():
+    honest_phases = np.array([2.6, 2.9, 2.4, 2.8])
+    dishonest_phase = 2.2
+    num_honest = len(honest_phases)
+    bitflip_variants = ((),) + tuple((j,) for j in range(1, num_honest))
+
+    estimates = []
+    for flipped in bitflip_variants:
+        signs = np.ones(num_honest)
+        signs[list(flipped)] = -1
+        diff = signs @ honest_phases + dishonest_phase
+        prob0 = (1 + np.cos(diff)) / 2
+        estimates.append(diff_estimator(prob0, pi_interval(diff), diff < 0))
+
+    # The sum of all phases lies in the fifth pi-interval
+    assert pi_interval(np.sum(honest_phases) + dishonest_phase) == 4
+    assert np.isclose(estimates[0], np.sum(honest_phases) + dishonest_phase)
+    local_estimates = local_estimator_batch(dishonest_phase, estimates, bitflip_variants)
+    assert np.allclose(local_estimates, honest_phases)
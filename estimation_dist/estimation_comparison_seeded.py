@@ -1,54 +1,21 @@
 from sensing_sans_verif import GHZSensingProgram
 from utils import *
 from utilsIO import *
+from estimation_tables import load_estimator_table, lookup_estimates
+from sharded_writer import ShardWriter
 import numpy as np
 import random
+import sys
 
 from squidasm.run.stack.run import run # type: ignore
 from squidasm.sim.stack.common import LogManager # type: ignore
 
-def prob_plus(theta: float, d: int):
-    p = (1 + np.cos(d*theta)) / 2
-    return p
-
-def likelihood(theta: int, d: int, n: int, k: int):
-    p = prob_plus(theta, d)
-    return (p**k)*(1-p)**(n-k)
-
-def log_likelihood(theta: int, d: int,  n: int, k: int):
-    p = prob_plus(theta, d)
-    return k*np.log2(p) + (n-k)*np.log2(1-p)
-
-def max_likelihood_estimate(d: int, n: int, k: int, start: float, stop: float, grid_size: int=1000):
-    theta_range = np.linspace(start, stop, grid_size, endpoint=False)
-    likelihood_dict = {likelihood(theta, d, n, k): theta 
-                       for theta in theta_range}
-    
-    maximum = max(likelihood_dict.keys())
-    #print(f"Max value of likelihood function: {maximum}")
-    est = likelihood_dict[maximum]
-    return est
-
-def inverse_cos_estimate(d: int, n: int, k: int, start: float):
-    prob0 = k / n
-    i = start / (np.pi/d)
-    # Estimate average phase from oberserved +1 parity frequency
-    arg = min(1, (prob0*2 - 1))
-    if i == 0:                     
-        est = np.arccos(arg) / d
-    elif i < 3:
-        est = ((-1)**i) * np.arccos(arg) / d + np.pi/2
-    else:
-        est = -1 * np.arccos(arg) / d + np.pi
-    
-    return est
-
-
 
 if __name__ == '__main__':
     num_nodes = 4
     num_iters = 1000
     state = "ghz"
+    pwd = "/home/pgnair/stage/estimation_dist/"
 
     # Initialize programs
     random.seed(6400)
@@ -57,7 +24,7 @@ if __name__ == '__main__':
                 for name in node_names}
 
     # Configure network
-    network_cfg = configure_perfect_network(node_names)
+    network_cfg = configure_perfect_network(node_names, programs)
     """ network_cfg = configure_network(node_names,
                                     use_high_fidelity=True,
                                     use_optimistic=True) """
@@ -116,20 +83,14 @@ if __name__ == '__main__':
     #print(f"Observed frequency of overall +1 parity: {plus_outcomes/num_iters}")
     #print(f"Average phase: {phase_average}")
 
-    est = inverse_cos_estimate(d=num_nodes,
-                               n=num_iters,
-                               k=plus_outcomes,
-                               start=interval_start)
-    #print(f"Cosine inversion estimate: {est}")
-    
-    mle = max_likelihood_estimate(d=num_nodes,
-                         n=num_iters,
-                         k=plus_outcomes,
-                         start=interval_start,
-                         stop=interval_stop)
+    # Look up both estimates in the precomputed (d, n) table
+    table = load_estimator_table(d=num_nodes, n=num_iters, cache_dir=f"{pwd}data/tables")
+    est, mle = lookup_estimates(table, k=plus_outcomes, i=i)
     #print(f"Maximum likelihood estimate: {mle}")
 
-    # Write output to existing file
+    # Write output to a shard of the existing file
     filename = "data/estimation_seeded_x1000_perfect.txt"
-    with open(filename, 'a') as f:
-        f.write(f"{phase_average} {est} {mle}\n")
+    task = sys.argv[1] if len(sys.argv) > 1 else None # job id, keep it when rerunning a job
+    # Each job writes its own shard, combined in seed order by merge_shards(filename)
+    with ShardWriter(filename, seed=6400, task=task) as writer:
+        writer.write(f"{phase_average} {est} {mle}")
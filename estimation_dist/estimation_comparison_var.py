@@ -1,48 +1,13 @@
 from sensing_sans_verif import GHZSensingProgram
 from utils import *
 from utilsIO import *
+from estimation_tables import load_estimator_table, lookup_estimates
 import numpy as np
 import sys
 
 from squidasm.run.stack.run import run # type: ignore
 from squidasm.sim.stack.common import LogManager # type: ignore
 
-def prob_plus(theta: float, d: int):
-    p = (1 + np.cos(d*theta)) / 2
-    return p
-
-def likelihood(theta: int, d: int, n: int, k: int):
-    p = prob_plus(theta, d)
-    return (p**k)*(1-p)**(n-k)
-
-def log_likelihood(theta: int, d: int,  n: int, k: int):
-    p = prob_plus(theta, d)
-    return k*np.log2(p) + (n-k)*np.log2(1-p)
-
-def max_likelihood_estimate(d: int, n: int, k: int, start: float, stop: float, grid_size: int=1000):
-    theta_range = np.linspace(start, stop, grid_size, endpoint=False)
-    likelihood_dict = {likelihood(theta, d, n, k): theta 
-                       for theta in theta_range}
-    
-    maximum = max(likelihood_dict.keys())
-    #print(f"Max value of likelihood function: {maximum}")
-    est = likelihood_dict[maximum]
-    return est
-
-def inverse_cos_estimate(d: int, n: int, k: int, start: float):
-    prob0 = k / n
-    i = start / (np.pi/d)
-    # Estimate average phase from oberserved +1 parity frequency
-    arg = min(1, (prob0*2 - 1))
-    if i == 0:                     
-        est = np.arccos(arg) / d
-    elif i < 3:
-        est = ((-1)**i) * np.arccos(arg) / d + np.pi/2
-    else:
-        est = -1 * np.arccos(arg) / d + np.pi
-    
-    return est
-
 
 if __name__ == '__main__':
     num_nodes = 4
@@ -59,9 +24,9 @@ if __name__ == '__main__':
     # Configure network
     # Load network configuration
     if params == "perfect":
-        network_cfg = configure_perfect_network(node_names)
+        network_cfg = configure_perfect_network(node_names, programs)
     elif params == "optimhf":
-        network_cfg = configure_network(node_names, use_high_fidelity=True, use_optimistic=True)
+        network_cfg = configure_network(node_names, use_high_fidelity=True, use_optimistic=True, programs=programs)
     else:
         raise ValueError("Network argument must be \'perfect\' or \'optimhf\'")
     
@@ -111,16 +76,11 @@ if __name__ == '__main__':
     # Calculate expected probability of overall +1 outcome
     exp_prob0 = (1 + np.cos(num_nodes*phase_average)) / 2
 
-    est = inverse_cos_estimate(d=num_nodes,
-                               n=num_iters,
-                               k=plus_outcomes,
-                               start=interval_start)
-    
-    mle = max_likelihood_estimate(d=num_nodes,
-                         n=num_iters,
-                         k=plus_outcomes,
-                         start=interval_start,
-                         stop=interval_stop)
+    # Look up both estimates in the precomputed (d, n) table
+    table = load_estimator_table(d=num_nodes,
+                                 n=num_iters,
+                                 cache_dir=f"{pwd}data/tables")
+    est, mle = lookup_estimates(table, k=plus_outcomes, i=i)
 
     # Write output to existing file
     filename = f"{pwd}data/estimation_x1000_{params}.txt"
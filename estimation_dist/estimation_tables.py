@@ -0,0 +1,121 @@
+import os
+import numpy as np
+from scipy.special import xlogy
+from scipy.stats import binom
+
+###
+#   Precomputed estimator tables for a fixed number of nodes d and sample count n.
+#   For d nodes the phase average lies in one of d intervals of width pi/d on [0, pi),
+#   and both the inverse cosine and maximum likelihood estimates depend only on the
+#   interval index i and the number k of overall +1 parity outcomes.
+#   A table has shape (d, n+1, 6), indexed as table[i, k, column].
+###
+INV_EST, MLE_EST, INV_BIAS, INV_VAR, MLE_BIAS, MLE_VAR = range(6)
+NUM_COLUMNS = 6
+
+def prob_plus(theta, d: int):
+    p = (1 + np.cos(d*theta)) / 2
+    return p
+
+###
+#   Function to find the index of the pi/d interval containing the phase average.
+#   Mirrors the interval search used in the estimation scripts.
+###
+def phase_interval(phase_average: float, d: int):
+    i = 0
+    while phase_average % ((i+1)*np.pi/d) != phase_average:
+        i += 1
+    return i
+
+###
+#   Vectorised inverse cosine estimate for an array of observed +1 parity frequencies.
+#   Estimates are folded back into the i-th interval [i*pi/d, (i+1)*pi/d).
+###
+def inverse_cos_from_freq(freq, d: int, i: int):
+    arg = np.minimum(1, np.asarray(freq, dtype=float)*2 - 1)
+    est = ((-1)**i * np.arccos(arg) + 2*np.pi*np.ceil(i/2)) / d
+    return est
+
+###
+#   Vectorised maximum likelihood estimate for every k in 0..n over one interval.
+#   Searches a grid of grid_size points over the interval and maximises the log-likelihood,
+#   so that large n does not underflow. Ties resolve to the last grid point.
+###
+def max_likelihood_from_counts(d: int, n: int, i: int, grid_size: int=1000):
+    start = i*np.pi/d
+    stop = start + np.pi/d
+    theta_range = np.linspace(start, stop, grid_size, endpoint=False)
+    p = prob_plus(theta_range, d)
+    k = np.arange(n+1)[:, None]
+    log_l = xlogy(k, p[None, :]) + xlogy(n - k, 1 - p[None, :])
+    last_max = grid_size - 1 - np.argmax(log_l[:, ::-1], axis=1)
+    return theta_range[last_max]
+
+###
+#   Plug-in bias and variance of an estimator given its estimate for every k in 0..n.
+#   For each k the true phase is taken to be the estimate itself, and the moments are
+#   taken over the binomial distribution of k at that phase.
+#   Bias follows the repo convention of (true - estimate).
+###
+def plugin_moments(estimates, d: int, n: int):
+    p = prob_plus(estimates, d)
+    pmf = binom.pmf(np.arange(n+1)[None, :], n, p[:, None])
+    mean = pmf @ estimates
+    var = pmf @ estimates**2 - mean**2
+    bias = estimates - mean
+    return bias, np.maximum(var, 0)
+
+###
+#   Function to build the full estimator table for d nodes and n samples.
+###
+def build_estimator_table(d: int, n: int, grid_size: int=1000):
+    table = np.empty((d, n+1, NUM_COLUMNS))
+    freq = np.arange(n+1) / n
+    for i in range(d):
+        inv_est = inverse_cos_from_freq(freq, d, i)
+        mle_est = max_likelihood_from_counts(d, n, i, grid_size)
+        table[i, :, INV_EST] = inv_est
+        table[i, :, MLE_EST] = mle_est
+        table[i, :, INV_BIAS], table[i, :, INV_VAR] = plugin_moments(inv_est, d, n)
+        table[i, :, MLE_BIAS], table[i, :, MLE_VAR] = plugin_moments(mle_est, d, n)
+    return table
+
+###
+#   Function to load the estimator table for (d, n) as a read-only memory map.
+#   On a cache miss the table is built and written to a temporary file first, then
+#   renamed into place so that concurrently launched jobs never read a partial table.
+###
+def load_estimator_table(d: int, n: int, grid_size: int=1000, cache_dir: str="data/tables"):
+    filename = f"{cache_dir}/estimator_table_d{d}_n{n}_g{grid_size}.npy"
+    if not os.path.exists(filename):
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_filename = f"{filename}.{os.getpid()}.tmp"
+        table = np.lib.format.open_memmap(tmp_filename, mode='w+',
+                                          shape=(d, n+1, NUM_COLUMNS))
+        table[:] = build_estimator_table(d, n, grid_size)
+        table.flush()
+        del table
+        os.replace(tmp_filename, filename)
+    return np.load(filename, mmap_mode='r')
+
+###
+#   Function to look up both estimates for k observed +1 outcomes in interval i.
+#   Returns (inverse cosine estimate, maximum likelihood estimate).
+###
+def lookup_estimates(table, k: int, i: int):
+    row = table[i, k]
+    return float(row[INV_EST]), float(row[MLE_EST])
+
+###
+#   Function to compute the expected bias of both estimators at a known true phase.
+#   Only needs the estimate columns of the table, so each call is a single O(n) dot product.
+#   Returns (inverse cosine bias, maximum likelihood bias) as (true - expected estimate).
+###
+def expected_bias(table, theta: float):
+    d = table.shape[0]
+    n = table.shape[1] - 1
+    i = phase_interval(theta, d)
+    pmf = binom.pmf(np.arange(n+1), n, prob_plus(theta, d))
+    inv_bias = theta - pmf @ table[i, :, INV_EST]
+    mle_bias = theta - pmf @ table[i, :, MLE_EST]
+    return float(inv_bias), float(mle_bias)
@@ -1,6 +1,7 @@
 #!/bin/bash
+# Usage: $0 [task id]. Resubmit a failed job with the same task id, so that its rows are not merged twice
 source /home/pgnair/envs/squid_env2.0/bin/activate
 
-/home/pgnair/envs/squid_env2.0/bin/python -W ignore /home/pgnair/stage/estimation_dist/estimation_comparison_seeded_var.py optimhf 10000
+/home/pgnair/envs/squid_env2.0/bin/python -W ignore /home/pgnair/stage/estimation_dist/estimation_comparison_seeded_var.py optimhf 10000 ${1:+"$1"}
 
 echo optimhf_seeded_job executed on $(date) >> /home/pgnair/stage/estimation_dist/logs/seeded_jobs.log
\ No newline at end of file
@@ -0,0 +1,96 @@
+import numpy as np
+
+###
+#   Classical Fisher information and Cramer-Rao bounds for the overall parity measurement.
+#
+#   With d nodes sharing a GHZ state, the probability of an overall +1 parity is
+#       p(theta) = (1 + V*cos(d*theta - phi)) / 2
+#   where V is the visibility of the |0..0><1..1| coherence (V = 1 for a perfect GHZ state)
+#   and phi is any phase offset carried by the noisy state. For one sample the Fisher
+#   information is p'(theta)^2 / (p(1-p)) and n samples give the bound Var >= 1 / (n*F).
+#
+#   All functions broadcast over their array arguments, so grids of theta, link fidelity
+#   and d are evaluated in one call.
+###
+
+###
+#   Function to compute the overall +1 parity probability under noise.
+###
+def prob_plus(theta, d, visibility=1.0, offset=0.0):
+    p = (1 + visibility*np.cos(d*theta - offset)) / 2
+    return p
+
+###
+#   Function to compute the visibility of a GHZ state built from d-1 depolarised links.
+#   Each link with fidelity F is a Werner state with parameter w = (4F - 1) / 3, and
+#   fusing d-1 of them scales the GHZ coherence by w^(d-1). Local memory noise is not included.
+###
+def visibility_from_link_fidelity(link_fidelity, d):
+    w = (4*np.asarray(link_fidelity, dtype=float) - 1) / 3
+    return w**(np.asarray(d) - 1)
+
+###
+#   Function to compute the visibility of a dephased GHZ state.
+#   Dephasing each qubit with parameter eta (probability of a Z error) scales the
+#   GHZ coherence by (1 - 2*eta)^d.
+###
+def visibility_from_dephasing(eta, d):
+    return (1 - 2*np.asarray(eta, dtype=float))**np.asarray(d)
+
+###
+#   Function to read the visibility and phase offset from a noisy GHZ density matrix.
+#   Only the |0..0><1..1| coherence contributes to the overall parity as a function of
+#   the summed phase; other coherences vanish for GHZ-diagonal noise.
+#   Returns (visibility, offset).
+###
+def visibility_from_density_matrix(rho):
+    rho = np.asarray(rho)
+    coherence = rho[..., -1, 0]
+    return 2*np.abs(coherence), np.angle(coherence)
+
+###
+#   Function to compute the classical Fisher information of one overall parity sample.
+#   Returns 0 where the likelihood is flat, and d^2 everywhere for a perfect GHZ state.
+###
+def fisher_information(theta, d, visibility=1.0, offset=0.0):
+    theta = np.asarray(theta, dtype=float)
+    d = np.asarray(d)
+    visibility = np.asarray(visibility, dtype=float)
+    sin2 = np.sin(d*theta - offset)**2
+    cos2 = 1 - sin2
+    num = visibility**2 * d**2 * sin2
+    den = 1 - visibility**2 * cos2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        info = np.where(den > 0, num / np.where(den > 0, den, 1), d**2 * (visibility >= 1))
+    return info
+
+###
+#   Function to compute the Cramer-Rao bound on the variance of any unbiased estimator
+#   of theta from n overall parity samples.
+###
+def cramer_rao_bound(theta, d, n, visibility=1.0, offset=0.0):
+    info = fisher_information(theta, d, visibility, offset)
+    with np.errstate(divide='ignore'):
+        return 1 / (n * info)
+
+###
+#   Function to evaluate Cramer-Rao bounds over a grid of theta x link fidelity x d.
+#   Returns an array of shape (len(thetas), len(link_fidelities), len(node_counts)).
+###
+def crb_grid(thetas, link_fidelities, node_counts, n):
+    theta, fid, d = np.meshgrid(np.asarray(thetas, dtype=float),
+                                np.asarray(link_fidelities, dtype=float),
+                                np.asarray(node_counts),
+                                indexing='ij')
+    visibility = visibility_from_link_fidelity(fid, d)
+    return cramer_rao_bound(theta, d, n, visibility)
+
+###
+#   Function to compute the Cramer-Rao bound from a noisy GHZ density matrix.
+#   Accepts a single matrix or a stack of matrices along the leading axis.
+###
+def cramer_rao_bound_from_density_matrix(theta, rho, n):
+    rho = np.asarray(rho)
+    d = int(np.log2(rho.shape[-1]))
+    visibility, offset = visibility_from_density_matrix(rho)
+    return cramer_rao_bound(theta, d, n, visibility, offset)
@@ -1,6 +1,7 @@
 import numpy as np
 import matplotlib.pyplot as plt
 from utilsIO import *
+from fisher_information import cramer_rao_bound, visibility_from_link_fidelity
 
 optim_highfid = False
 
@@ -31,6 +32,14 @@ for (x, y1, y2) in zip(true_avg, inv_est, mle_est):
 print("")
 print(mle_bias) """
 
+# Cramer-Rao reference for the root mean square error, averaged over the true phases
+link_fidelity = 0.95 if optim_highfid else 1.0
+crb = cramer_rao_bound(np.array(true_avg), d=4, n=1000,
+                       visibility=visibility_from_link_fidelity(link_fidelity, 4))
+print(f"Cramer-Rao bound on RMS error: {np.sqrt(np.mean(crb))}")
+print(f"Observed RMS error: {np.sqrt(np.mean(np.square(inv_bias)))} (inverse cosine), "
+      f"{np.sqrt(np.mean(np.square(mle_bias)))} (MLE)")
+
 data_max = max(max(inv_bias), max(mle_bias))
 data_min = min(min(inv_bias), min(mle_bias))
 data_range = data_max - data_min
@@ -1,6 +1,7 @@
 import numpy as np
 import matplotlib.pyplot as plt
 from utilsIO import *
+from sharded_writer import merge_shards
 
 optim_highfid = False
 
@@ -10,6 +11,8 @@ else:
     postfix = "_perfect"
 
 filename = f"data/estimation_seeded_x1000{postfix}.txt"
+# Combine the shards written by the seeded jobs
+merge_shards(filename)
 true_avg, inv_est, mle_est, _, _, _ = read_from_file_multiy(filename, num_y=2)
 
 inv_bias = []
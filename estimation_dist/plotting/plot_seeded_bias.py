@@ -1,6 +1,9 @@
 import numpy as np
 import matplotlib.pyplot as plt
 from utilsIO import *
+from sharded_writer import merge_shards
+from estimation_tables import load_estimator_table, expected_bias
+from fisher_information import cramer_rao_bound, visibility_from_link_fidelity
 
 optim_highfid = False
 version = 1
@@ -15,6 +18,8 @@ if version < 2:
 else:
     filename = f"data/estimation_seeded_x1000{postfix}_{version}.txt"
 
+# Combine the shards written by the seeded jobs
+merge_shards(filename)
 true_avg, inv_est, mle_est, _, _, _ = read_from_file_multiy(filename, num_y=2)
 
 inv_bias = []
@@ -24,6 +29,19 @@ for (x, y1, y2) in zip(true_avg, inv_est, mle_est):
         inv_bias.append((x - y1))
         mle_bias.append((x - y2))
 
+# Expected bias at the seeded phase average, from the precomputed (d, n) table
+table = load_estimator_table(d=4, n=1000)
+inv_exp_bias, mle_exp_bias = expected_bias(table, true_avg[0])
+print(f"Expected bias (inverse cosine): {inv_exp_bias}, observed mean: {np.mean(inv_bias)}")
+print(f"Expected bias (MLE): {mle_exp_bias}, observed mean: {np.mean(mle_bias)}")
+
+# Cramer-Rao reference for the spread of the estimates at the seeded phase average
+link_fidelity = 0.95 if optim_highfid else 1.0
+crb = cramer_rao_bound(true_avg[0], d=4, n=1000,
+                       visibility=visibility_from_link_fidelity(link_fidelity, 4))
+print(f"Cramer-Rao bound on standard deviation: {np.sqrt(crb)}")
+print(f"Observed standard deviation: {np.std(inv_bias)} (inverse cosine), {np.std(mle_bias)} (MLE)")
+
 data_max = max(max(inv_bias), max(mle_bias))
 data_min = min(min(inv_bias), min(mle_bias))
 num_bins = 32
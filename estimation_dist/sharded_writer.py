@@ -0,0 +1,167 @@
+import os
+import re
+import json
+import socket
+import hashlib
+import tempfile
+
+###
+#   Sharded output for results written by many concurrently launched jobs.
+#
+#   Instead of appending to one shared file, each job writes its rows to a private
+#   temporary file in <filename>.shards/ and renames it to seed<seed>_task<task>.txt when
+#   it finishes. The rename is atomic, so a shard is either complete or absent, and no
+#   two jobs ever write to the same file. A job relaunched with the same seed and task
+#   replaces its earlier shard, so each (seed, task) contributes its rows once.
+#   Jobs sharing a seed legitimately produce different rows (only the phases are seeded),
+#   so duplicates can only be recognised by the task id: it must stay the same when a job
+#   is retried, i.e. come from the scheduler or from the launching script.
+#
+#   merge_shards() then rebuilds <filename> from the shards in seed order. Rows that were
+#   appended to <filename> by unsharded code, before the first merge or since the last one,
+#   are moved to 'legacy' shards and merged first.
+###
+LEGACY_SHARD = "legacy.txt"
+MERGE_RECORD = "merged.json"
+_SHARD_PATTERN = re.compile(r"seed(-?\d+)_task(.+)\.txt$")
+_LEGACY_PATTERN = re.compile(r"legacy(?:_(\d+))?\.txt$")
+
+def shard_dir(filename: str):
+    return f"{filename}.shards"
+
+###
+#   Function to give a task id that is unique across concurrently running jobs.
+#   Uses the array index or job id of a batch scheduler when there is one, which is kept
+#   when the scheduler requeues the job. Outside a scheduler the host and pid are used,
+#   so a rerun of the same job then adds a second shard: pass a task id to avoid that.
+###
+def default_task_id():
+    for var in ("SLURM_ARRAY_TASK_ID", "PBS_ARRAYID", "SGE_TASK_ID"):
+        if os.environ.get(var):
+            job = os.environ.get("SLURM_ARRAY_JOB_ID", os.environ.get("PBS_JOBID", ""))
+            return f"{job}-{os.environ[var]}" if job else os.environ[var]
+    for var in ("SLURM_JOB_ID", "PBS_JOBID", "JOB_ID"):
+        if os.environ.get(var):
+            return os.environ[var]
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class ShardWriter:
+    def __init__(self, filename: str, seed: int, task=None):
+        self.directory = shard_dir(filename)
+        self.seed = int(seed)
+        self.task = str(task) if task is not None else default_task_id()
+        self.shard_filename = os.path.join(self.directory, f"seed{self.seed}_task{self.task}.txt")
+        self.rows = []
+
+    # Buffer one row, given as a preformatted line or as a sequence of values
+    def write(self, row):
+        if not isinstance(row, str):
+            row = " ".join(str(value) for value in row)
+        self.rows.append(row.rstrip("\n") + "\n")
+
+    # Write the buffered rows to a temporary file and atomically rename it into place
+    def commit(self):
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_filename = tempfile.mkstemp(dir=self.directory, prefix=".tmp_", suffix=".txt")
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.writelines(self.rows)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_filename, self.shard_filename)
+        except BaseException:
+            if os.path.exists(tmp_filename):
+                os.remove(tmp_filename)
+            raise
+        return self.shard_filename
+
+    def __enter__(self):
+        return self
+
+    # Only commit if the job finished without an exception
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        return False
+
+###
+#   Function to sort shard file names by (seed, task), with the legacy shards first.
+###
+def _shard_key(name: str):
+    match = _LEGACY_PATTERN.match(name)
+    if match:
+        return (0, int(match.group(1) or 0), "")
+    match = _SHARD_PATTERN.match(name)
+    seed, task = int(match.group(1)), match.group(2)
+    return (1, seed, task.zfill(32) if task.isdigit() else task)
+
+def _digest(rows: list):
+    return hashlib.sha256("".join(rows).encode('utf-8')).hexdigest()
+
+def _write_atomic(filename: str, lines: list):
+    tmp_filename = f"{filename}.{os.getpid()}.tmp"
+    with open(tmp_filename, 'w') as f:
+        f.writelines(lines)
+    os.replace(tmp_filename, filename)
+
+###
+#   Function to move the rows that are in filename but not in its shards to a new legacy shard.
+#   The rows of the last merge are recorded by count and digest; rows appended after them are
+#   moved. Raises a ValueError if the merged rows themselves were changed.
+###
+def _collect_legacy_rows(filename: str, directory: str, existing_rows: list):
+    record_filename = os.path.join(directory, MERGE_RECORD)
+    legacy_names = [name for name in os.listdir(directory) if _LEGACY_PATTERN.match(name)]
+    if not legacy_names:
+        new_rows, name = existing_rows, LEGACY_SHARD
+    elif os.path.exists(record_filename):
+        with open(record_filename, 'r') as f:
+            record = json.load(f)
+        merged = record["rows"]
+        if len(existing_rows) < merged or _digest(existing_rows[:merged]) != record["digest"]:
+            raise ValueError(f"{filename} was modified since its last merge; "
+                             f"move the changed rows to a shard in {directory} and merge again.")
+        new_rows = existing_rows[merged:]
+        name = f"legacy_{max(_shard_key(name)[1] for name in legacy_names) + 1}.txt"
+    else:
+        # Merged before merges were recorded: nothing to compare with
+        new_rows = []
+    if new_rows:
+        _write_atomic(os.path.join(directory, name), new_rows)
+
+###
+#   Function to rebuild filename from its shards, in seed order.
+#   The comment header of the existing file is kept, unless header_lines are given.
+#   Does nothing if no job has written a shard yet. Returns the number of rows written.
+###
+def merge_shards(filename: str, header_lines=None):
+    directory = shard_dir(filename)
+    if not os.path.isdir(directory):
+        return 0
+
+    existing_header, existing_rows = [], []
+    if os.path.exists(filename):
+        with open(filename, 'r') as f:
+            for line in f:
+                (existing_header if line.startswith('#') else existing_rows).append(line)
+    if header_lines is None:
+        header_lines = existing_header
+    else:
+        header_lines = [line.rstrip("\n") + "\n" for line in header_lines]
+
+    # Rows appended without a shard, before the first merge or after the last one
+    existing_rows = [line.rstrip("\n") + "\n" for line in existing_rows if line.strip()]
+    _collect_legacy_rows(filename, directory, existing_rows)
+
+    names = [name for name in os.listdir(directory)
+             if _LEGACY_PATTERN.match(name) or _SHARD_PATTERN.match(name)]
+    rows = []
+    for name in sorted(names, key=_shard_key):
+        with open(os.path.join(directory, name), 'r') as f:
+            rows.extend(line.rstrip("\n") + "\n" for line in f if line.strip())
+
+    _write_atomic(filename, header_lines + rows)
+    _write_atomic(os.path.join(directory, MERGE_RECORD),
+                  [json.dumps({"rows": len(rows), "digest": _digest(rows)})])
+    return len(rows)
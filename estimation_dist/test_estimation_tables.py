@@ -0,0 +1,21 @@
+import numpy as np
+from estimation_tables import INV_EST, load_estimator_table, phase_interval, prob_plus
+
+###
+#   Check of the cached inverse cosine column on a 5-node network, where the phase average
+#   can lie in any of the five pi/5 intervals.
+#   Run with: python -m pytest test_estimation_tables.py
+###
+def test_inverse_cos_five_nodes(tmp_path):
+    d, n = 5, 200
+    table = load_estimator_table(d, n, grid_size=100, cache_dir=str(tmp_path))
+    for theta in np.linspace(0.05, np.pi - 0.05, 11):
+        i = phase_interval(theta, d)
+        # Exact frequency, rounded to the nearest count, and its direct inversion
+        k = int(round(n * prob_plus(theta, d)))
+        direct = np.arccos(2*k/n - 1) / d
+        candidates = np.concatenate([direct + 2*np.pi*np.arange(d)/d, -direct + 2*np.pi*np.arange(1, d+1)/d])
+        expected = candidates[np.argmin(np.abs(candidates - theta))]
+        assert i*np.pi/d <= table[i, k, INV_EST] <= (i+1)*np.pi/d
+        assert np.isclose(table[i, k, INV_EST], expected)
+        assert abs(table[i, k, INV_EST] - theta) < 0.05
@@ -17,7 +17,7 @@ if __name__ == '__main__':
                 for name in node_names}
 
     # Configure network
-    network_cfg = configure_perfect_network(node_names)
+    network_cfg = configure_perfect_network(node_names, programs)
     """ network_cfg = configure_network(node_names,
                                     use_high_fidelity=True,
                                     use_optimistic=True) """
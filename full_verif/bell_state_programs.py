@@ -7,6 +7,7 @@ import gc
 from squidasm.sim.stack.program import Program, ProgramContext, ProgramMeta # type: ignore
 from squidasm.sim.stack.common import LogManager # type: ignore
 from squidasm.util.util import get_qubit_state # type: ignore
+from phase_timer import phase_timer
 from netqasm.sdk.qubit import Qubit
 
 ###
@@ -74,13 +75,15 @@ def get_stabilizers(num_nodes: int) -> Dict[str, List[str]]:
 #   from the Verifier's perspective
 ####
 class GHZVerifier_bell_states(Program):
-    def __init__(self, name:str, node_names:List[str], ntest:int):
+    def __init__(self, name:str, node_names:List[str], ntest:int, timings:bool=False):
         self.name = name
         self.node_names = node_names
         self.peer_names = [peer for peer in self.node_names if peer != self.name]
         self.num_nodes = len(self.node_names)
         self.ntest = ntest
         self.ntotal = 2 * self.num_nodes * self.ntest
+        # If True, time spent per protocol phase is returned under the 'timings' key
+        self.timings = timings
 
     @property
     def meta(self) -> ProgramMeta:
@@ -94,6 +97,7 @@ class GHZVerifier_bell_states(Program):
     def run(self, context: ProgramContext):
         connection = context.connection
         logger = LogManager.get_stack_logger(f"{self.name}_Verifier")
+        timer = phase_timer(self.timings)
 
         ###
         #   Preparation phase
@@ -146,6 +150,7 @@ class GHZVerifier_bell_states(Program):
 
         qubits = []
         # We will sequentially generate ntotal bell state copies
+        timer.start("distribution")
         for c in range(self.ntotal):
             ## Generate an EPR pair with the next node ##
             qubit = up_epr_socket.create_keep()[0]
@@ -184,6 +189,7 @@ class GHZVerifier_bell_states(Program):
                 basis = stab_bases[verifier_id]
                 logger.warning(f"{self.name} will measure in {basis} basis")
 
+                timer.start("measurement")
                 qubit.K() if basis == 'Y' else qubit.H()
                 m = qubit.measure()
                 yield from connection.flush()
@@ -193,6 +199,7 @@ class GHZVerifier_bell_states(Program):
                 results[stab_number][test_number][verifier_id] **= int(m)
 
                 # Send all the other nodes the relevant info to make their measurements
+                timer.start("classical")
                 for node_index in range(1, self.num_nodes):
                     peer_index = node_index - 1
                     csocket = csockets[peer_index]
@@ -211,22 +218,27 @@ class GHZVerifier_bell_states(Program):
                 # Keep qubit as target qubit
                 target_qubit = qubit
                 logger.warning(f"Copy {c} stored as target")
+                timer.start("measurement")
                 yield from connection.flush()
 
                 # Send all the other nodes the action to perform : 'keep'
+                timer.start("classical")
                 for node_index in range(1, self.num_nodes):
                     csockets[node_index - 1].send(qubit_action)
             
             else:   # Qubit will be deleted
+                timer.start("measurement")
                 qubit.free()
                 logger.warning(f"Copy {c} discarded")
                 yield from connection.flush()
 
                 # Send all the other nodes the action to perform : 'discard'
+                timer.start("classical")
                 for node_index in range(1, self.num_nodes):
                     csockets[node_index - 1].send(qubit_action)
             
             
+        timer.start("evaluation")
         failure_rates = []
         # Calculate failure rate for each stabilizer measurement
         for j in range(self.num_nodes):
@@ -251,11 +263,11 @@ class GHZVerifier_bell_states(Program):
         density_mat = get_qubit_state(target_qubit, self.name)
 
         #return {"name": self.name, "qubits": qubits}
-        return {"name": self.name,
-                "failure rates": failure_rates,
-                "average failure rate": avg_failure_rate,
-                "target qubit": target_qubit,
-                "target state": density_mat} 
+        return timer.report({"name": self.name,
+                             "failure rates": failure_rates,
+                             "average failure rate": avg_failure_rate,
+                             "target qubit": target_qubit,
+                             "target state": density_mat})
     
 ####
 #   Class that describes the GHZ verification protocol being performed 
@@ -263,13 +275,15 @@ class GHZVerifier_bell_states(Program):
 #   from the member nodes' perspective
 ####            
 class GHZMember_bell_states(Program):
-    def __init__(self, name:str, node_names:List[str], ntest:int):
+    def __init__(self, name:str, node_names:List[str], ntest:int, timings:bool=False):
         self.name = name
         self.node_names = node_names
         self.peer_names = [peer for peer in self.node_names if peer != self.name]
         self.num_nodes = len(self.node_names)
         self.ntest = ntest
         self.ntotal = 2 * self.num_nodes * self.ntest
+        # If True, time spent per protocol phase is returned under the 'timings' key
+        self.timings = timings
 
     @property
     def meta(self) -> ProgramMeta:
@@ -283,6 +297,7 @@ class GHZMember_bell_states(Program):
     def run(self, context: ProgramContext):
         connection = context.connection
         logger = LogManager.get_stack_logger(f"{self.name}_Member")
+        timer = phase_timer(self.timings)
 
         ### 
         # Preparation steps
@@ -312,6 +327,7 @@ class GHZMember_bell_states(Program):
         #measurements=[]
         qubits = []
         # We will sequentially generate ntotal bell state copies
+        timer.start("distribution")
         for c in range(self.ntotal):
             # If odd_numbered node, then generate EPR pair with next node
             if (node_id+1) % 2 != 0:
@@ -328,6 +344,7 @@ class GHZMember_bell_states(Program):
         for c in range(self.ntotal):
             qubit = qubits[c]
             ## Get action to be performed by the Verifier ##
+            timer.start("classical")
             qubit_action = yield from csocket.recv()
 
             logger.warning(f"Copy: {c}, Received qubit action: {qubit_action}")
@@ -337,31 +354,36 @@ class GHZMember_bell_states(Program):
                 basis = yield from csocket.recv()
                 logger.warning(f"{self.name} will measure in {basis} basis")
 
+                timer.start("measurement")
                 # Measure the the qubit in the received basis
                 qubit.K() if basis == 'Y' else qubit.H()
                 m = qubit.measure()
                 yield from connection.flush()
 
                 # Send the result back to Verifier
+                timer.start("classical")
                 csocket.send(int(m))
                 logger.debug(f"Result {int(m)} sent to Verifier")
 
             elif qubit_action == "keep":
                 target_qubit = qubit
                 logger.warning(f"Copy {c} stored as target")
+                timer.start("measurement")
                 yield from connection.flush()
 
             else:   # Qubit will be deleted
+                timer.start("measurement")
                 qubit.free()
                 logger.warning(f"Copy {c} discarded")
                 yield from connection.flush()
 
+        timer.start("evaluation")
         density_mat = get_qubit_state(target_qubit, self.name)
 
         #return {"name": self.name, "qubits": qubits}
-        return {"name": self.name, 
-                "target qubit": target_qubit,
-                "target state": density_mat}
+        return timer.report({"name": self.name, 
+                             "target qubit": target_qubit,
+                             "target state": density_mat})
 
 
         
@@ -0,0 +1,221 @@
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import resource
+import multiprocessing
+import numpy as np
+
+###
+#   Benchmark suite for the verification and sensing protocols.
+#
+#   Every case (protocol, network, num_nodes, ntest) runs in a fresh process, so its peak RSS is
+#   not inflated by earlier cases. A case is repeated a few times, repeat r seeded with seed + r so
+#   that the simulated time is reproducible on noisy networks, and records
+#       wall_time_s     wall-clock time of one protocol run (network construction included)
+#       sim_time_ns     NetSquid simulated time of one protocol run
+#       copies_per_s    GHZ copies distributed per wall-clock second
+#       peak_rss_mb     peak resident memory of the process
+#   The per-phase timings reported by the programs are summed over the repeats (see phase_timer).
+#   Results are written as JSON. When a baseline file exists, every metric is compared with it and
+#   cases that got slower or larger by more than the tolerance are reported as regressions. The
+#   simulated time is only compared when both runs used the same seed.
+#
+#       python benchmark.py                    # full grid, compare with data/benchmark_baseline.json
+#       python benchmark.py --quick            # smallest case of every protocol only
+#       python benchmark.py --save-baseline    # store the results as the new baseline
+###
+RESULTS_FILENAME = "data/benchmark_results.json"
+BASELINE_FILENAME = "data/benchmark_baseline.json"
+
+PROTOCOLS = ["sensing", "v2", "v3", "full", "select", "plus", "bell"]
+NETWORKS = ["perfect", "optimhf"]
+NUM_NODES_LIST = [4, 6]
+NTEST_LIST = [5, 10]
+REPEATS = 3
+SEED = 1234
+TOLERANCE = 0.2
+
+# Metrics for which a higher value is a regression
+METRICS = ["wall_time_s", "sim_time_ns", "peak_rss_mb"]
+
+###
+#   Function to initialize the programs of one protocol, with the utils initializers.
+###
+def init_protocol(protocol: str, num_nodes: int, ntest: int):
+    from utils import init_sensing_programs, init_verification_programs
+    if protocol == "sensing":
+        return init_sensing_programs(num_nodes, ntest, failure_threshold=0.1, timings=True)
+    elif protocol == "v2":
+        return init_verification_programs(num_nodes, ntest, version=2, timings=True)
+    elif protocol == "v3":
+        return init_verification_programs(num_nodes, ntest, version=3, timings=True)
+    elif protocol == "full":
+        return init_verification_programs(num_nodes, ntest, full=True, timings=True)
+    elif protocol == "select":
+        return init_verification_programs(num_nodes, ntest, select=num_nodes, timings=True)
+    elif protocol == "plus":
+        return init_verification_programs(num_nodes, ntest, state="plus", timings=True)
+    elif protocol == "bell":
+        return init_verification_programs(num_nodes, ntest, state="bell", timings=True)
+    else:
+        raise ValueError(f"Unknown protocol '{protocol}'. Must be one of {PROTOCOLS}.")
+
+def benchmark_cases(protocols=PROTOCOLS, networks=NETWORKS, num_nodes_list=NUM_NODES_LIST,
+                    ntest_list=NTEST_LIST, repeats: int=REPEATS, seed: int=SEED):
+    cases = []
+    for protocol in protocols:
+        for network in networks:
+            for num_nodes in num_nodes_list:
+                # Bell state programs pair up the nodes
+                if protocol == "bell" and num_nodes % 2 != 0:
+                    continue
+                for ntest in ntest_list:
+                    cases.append({"protocol": protocol, "network": network, "num_nodes": num_nodes,
+                                  "ntest": ntest, "repeats": repeats, "seed": seed})
+    return cases
+
+def _case_key(case: dict):
+    return (case["protocol"], case["network"], case["num_nodes"], case["ntest"])
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes on Linux
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+###
+#   Function to run one benchmark case. Runs in its own worker process.
+###
+def run_case(case: dict):
+    import netsquid as ns
+    from utils import configure_network, configure_perfect_network
+    from phase_timer import accumulate_timings
+    from result_cache import seed_simulation
+    from squidasm.run.stack.run import run # type: ignore
+    from squidasm.sim.stack.common import LogManager # type: ignore
+
+    LogManager.set_log_level("WARNING")
+    LogManager.get_stack_logger().handlers = []
+
+    wall_times = []
+    sim_times = []
+    phase_timings = {}
+    for r in range(case["repeats"]):
+        seed_simulation(case["seed"] + r)
+        start = time.perf_counter()
+        programs, node_names = init_protocol(case["protocol"], case["num_nodes"], case["ntest"])
+        if case["network"] == "perfect":
+            network_cfg = configure_perfect_network(node_names, programs)
+        elif case["network"] == "optimhf":
+            network_cfg = configure_network(node_names, use_high_fidelity=True, use_optimistic=True,
+                                            programs=programs)
+        else:
+            raise ValueError("Network must be 'perfect' or 'optimhf'.")
+        ns.sim_reset()
+        results = run(config=network_cfg, programs=programs, num_times=1)
+        sim_times.append(ns.sim_time())
+        wall_times.append(time.perf_counter() - start)
+        accumulate_timings(phase_timings, results)
+
+    copies = programs[node_names[0]].ntotal
+    wall_time = float(np.median(wall_times))
+    result = dict(case,
+                  copies=int(copies),
+                  wall_time_s=wall_time,
+                  sim_time_ns=float(np.median(sim_times)),
+                  copies_per_s=copies / wall_time,
+                  peak_rss_mb=_peak_rss_mb())
+    if phase_timings:
+        result["phase_timings"] = phase_timings
+    return result
+
+###
+#   Function to run all cases sequentially, each in a new process.
+###
+def run_benchmarks(cases: list):
+    context = multiprocessing.get_context("spawn")
+    results = []
+    with context.Pool(processes=1, maxtasksperchild=1) as pool:
+        for result in pool.imap(run_case, cases):
+            print(f"{result['protocol']:>8} {result['network']:>8}  num_nodes={result['num_nodes']:<3} "
+                  f"ntest={result['ntest']:<4} {result['wall_time_s']:8.3f} s  "
+                  f"{result['sim_time_ns']:.3e} ns  {result['copies_per_s']:8.1f} copies/s  "
+                  f"{result['peak_rss_mb']:7.1f} MB")
+            results.append(result)
+    return results
+
+def environment():
+    return {"python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "date": time.strftime("%Y-%m-%d %H:%M:%S")}
+
+def save_results(results: list, filename: str):
+    os.makedirs(os.path.dirname(filename) or '.', exist_ok=True)
+    tmp_filename = f"{filename}.tmp"
+    with open(tmp_filename, 'w') as f:
+        json.dump({"environment": environment(), "cases": results}, f, indent=4)
+    os.replace(tmp_filename, filename)
+
+def load_results(filename: str):
+    with open(filename, 'r') as f:
+        return json.load(f)["cases"]
+
+###
+#   Function to compare results with a baseline.
+#   Returns a list of (case key, metric, baseline value, new value) for every metric that
+#   increased by more than tolerance (relative).
+###
+def find_regressions(results: list, baseline: list, tolerance: float=TOLERANCE):
+    baseline = {_case_key(case): case for case in baseline}
+    regressions = []
+    for result in results:
+        reference = baseline.get(_case_key(result))
+        if reference is None:
+            continue
+        for metric in METRICS:
+            # Simulated times of differently seeded (or unseeded) runs are not comparable
+            if metric == "sim_time_ns" and reference.get("seed") != result.get("seed"):
+                continue
+            if reference[metric] > 0 and result[metric] > (1 + tolerance) * reference[metric]:
+                regressions.append((_case_key(result), metric, reference[metric], result[metric]))
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the verification and sensing protocols.")
+    parser.add_argument("--protocols", nargs="+", default=PROTOCOLS, choices=PROTOCOLS)
+    parser.add_argument("--networks", nargs="+", default=NETWORKS, choices=NETWORKS)
+    parser.add_argument("--num-nodes", nargs="+", type=int, default=NUM_NODES_LIST)
+    parser.add_argument("--ntest", nargs="+", type=int, default=NTEST_LIST)
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    parser.add_argument("--seed", type=int, default=SEED, help="seed of the first repeat of every case")
+    parser.add_argument("--quick", action="store_true", help="only run the smallest case of every protocol")
+    parser.add_argument("--output", default=RESULTS_FILENAME)
+    parser.add_argument("--baseline", default=BASELINE_FILENAME)
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--save-baseline", action="store_true", help="store the results as the new baseline")
+    args = parser.parse_args()
+
+    if args.quick:
+        args.num_nodes, args.ntest, args.repeats = [min(args.num_nodes)], [min(args.ntest)], 1
+    cases = benchmark_cases(args.protocols, args.networks, args.num_nodes, args.ntest, args.repeats, args.seed)
+    results = run_benchmarks(cases)
+    save_results(results, args.output)
+    print(f"Benchmark results stored in {args.output}")
+
+    if args.save_baseline:
+        save_results(results, args.baseline)
+        print(f"Baseline stored in {args.baseline}")
+    elif os.path.exists(args.baseline):
+        regressions = find_regressions(results, load_results(args.baseline), args.tolerance)
+        for key, metric, reference, value in regressions:
+            print(f"REGRESSION {key}: {metric} {reference:.4g} -> {value:.4g} "
+                  f"(+{100*(value/reference - 1):.0f}%)")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {100*args.tolerance:.0f}% against {args.baseline}")
+    else:
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one")
@@ -11,6 +11,7 @@ from squidasm.sim.stack.common import LogManager # type: ignore
 from squidasm.util.routines import create_ghz # type: ignore
 from netqasm.sdk.qubit import Qubit
 from squidasm.util.util import get_qubit_state # type: ignore
+from phase_timer import phase_timer
 
 ###
 #   Function to output a set of stabilizer generators for the GHZ state, given the number of nodes
@@ -123,7 +124,7 @@ def get_generators(num_nodes: int) -> Dict[str, List[str]]:
 #           the average of the failure rates, and its target qubit.
 ###
 class GHZVerifierNode_full(Program):
-    def __init__(self, name:str, node_names:List[str], ntest:int):
+    def __init__(self, name:str, node_names:List[str], ntest:int, timings:bool=False):
         self.name = name
         self.node_names = node_names
         self.peer_names = [peer for peer in self.node_names if peer != self.name]
@@ -131,6 +132,8 @@ class GHZVerifierNode_full(Program):
         self.ntest = ntest
         self.tests = 2**self.num_nodes
         self.ntotal = 2 * self.tests * self.ntest
+        # If True, time spent per protocol phase is returned under the 'timings' key
+        self.timings = timings
 
     @property
     def meta(self) -> ProgramMeta:
@@ -144,6 +147,7 @@ class GHZVerifierNode_full(Program):
     def run(self, context: ProgramContext):
         connection = context.connection
         logger = LogManager.get_stack_logger(f"{self.name}_Verifier")
+        timer = phase_timer(self.timings)
 
         ### 
         # Preparation phase
@@ -207,6 +211,7 @@ class GHZVerifierNode_full(Program):
         # We will sequentially generate ntotal GHZ state copies 
         for c in range(self.ntotal):
             ## Distribute GHZ state and get the qubit corresponding to this node ##
+            timer.start("distribution")
             qubit, _ = yield from create_ghz(
                 connection,
                 down_epr_socket,
@@ -244,6 +249,7 @@ class GHZVerifierNode_full(Program):
                 basis = stab_bases[verifier_id]
                 logger.warning(f"{self.name} will measure in {basis} basis")
 
+                timer.start("measurement")
                 if basis == 'Y':    # Y measurement
                     qubit.K()
                 elif basis == 'X':  # X measurement
@@ -258,6 +264,7 @@ class GHZVerifierNode_full(Program):
                 results[stab_number][test_number][verifier_id] **= int(m)
 
                 # Send all the other nodes the relevant info to make their measurements
+                timer.start("classical")
                 for node_index in range(1, self.num_nodes):
                     peer_index = node_index - 1
                     csocket = csockets[peer_index]
@@ -277,20 +284,25 @@ class GHZVerifierNode_full(Program):
                 target_qubit = qubit
                 logger.warning(f"Copy {c} stored as target")
 
+                timer.start("measurement")
                 yield from connection.flush()
                 # Send all the other nodes the action to perform : 'keep'
+                timer.start("classical")
                 for node_index in range(1, self.num_nodes):
                     csockets[node_index - 1].send(qubit_action)
 
             else:   # Qubit will be deleted
+                timer.start("measurement")
                 qubit.free()
                 logger.warning(f"Copy {c} discarded")
                 yield from connection.flush()
 
                 # Send all the other nodes the action to perform : 'discard'
+                timer.start("classical")
                 for node_index in range(1, self.num_nodes):
                     csockets[node_index - 1].send(qubit_action)
 
+        timer.start("evaluation")
         failure_rates = []
         # Calculate failure rate for each stabilizer measurement
         for j in range(self.tests):
@@ -322,11 +334,11 @@ class GHZVerifierNode_full(Program):
         avg_failure_rate = np.mean(failure_rates)
         logger.warning(f"Average failure rate: {avg_failure_rate}")
 
-        return {"name": self.name, 
-                "failure rates": failure_rates,
-                "average failure rate": avg_failure_rate,
-                "target qubit": target_qubit,
-                "target index": target}
+        return timer.report({"name": self.name, 
+                             "failure rates": failure_rates,
+                             "average failure rate": avg_failure_rate,
+                             "target qubit": target_qubit,
+                             "target index": target})
     
 
 ###
@@ -356,7 +368,7 @@ class GHZVerifierNode_full(Program):
 #       5.  The node outputs its target qubit.
 ###
 class GHZMemberNode_full(Program):
-    def __init__(self, name:str, node_names:List[str], ntest:int):
+    def __init__(self, name:str, node_names:List[str], ntest:int, timings:bool=False):
         self.name = name
         self.node_names = node_names
         self.peer_names = [peer for peer in self.node_names if peer != self.name]
@@ -364,6 +376,8 @@ class GHZMemberNode_full(Program):
         self.ntest = ntest
         self.tests = 2**self.num_nodes
         self.ntotal = 2 * self.tests * self.ntest
+        # If True, time spent per protocol phase is returned under the 'timings' key
+        self.timings = timings
 
     @property
     def meta(self) -> ProgramMeta:
@@ -377,6 +391,7 @@ class GHZMemberNode_full(Program):
     def run(self, context: ProgramContext):
         connection = context.connection
         logger = LogManager.get_stack_logger(f"{self.name}_Member")
+        timer = phase_timer(self.timings)
 
         ### 
         # Preparation phase
@@ -412,6 +427,7 @@ class GHZMemberNode_full(Program):
         # We will sequentially generate ntotal GHZ state copies 
         for c in range(self.ntotal):
             ## Distribute GHZ state and get the qubit corresponding to this node ##
+            timer.start("distribution")
             qubit, _ = yield from create_ghz(
                 connection,
                 down_epr_socket,
@@ -422,6 +438,7 @@ class GHZMemberNode_full(Program):
             )
             
             ## Get action to be performed by the Verifier ##
+            timer.start("classical")
             qubit_action = yield from csocket.recv()
 
             logger.warning(f"Copy: {c}, Received qubit action: {qubit_action}")
@@ -431,6 +448,7 @@ class GHZMemberNode_full(Program):
                 basis = yield from csocket.recv()
                 logger.warning(f"{self.name} will measure in {basis} basis")
 
+                timer.start("measurement")
                 if basis == 'Y':    # Y measurement
                     qubit.K()
                 elif basis == 'X':  # X measurement
@@ -440,33 +458,37 @@ class GHZMemberNode_full(Program):
                 yield from connection.flush()
 
                 # Send the result back to Verifier
+                timer.start("classical")
                 csocket.send(int(m))
                 logger.debug(f"Result {int(m)} sent to Verifier")
             
             elif qubit_action == "keep":
                 target_qubit = qubit
                 logger.warning(f"Copy {c} stored as target")
+                timer.start("measurement")
                 yield from connection.flush()
 
             else:   # Qubit will be deleted
+                timer.start("measurement")
                 qubit.free()
                 logger.warning(f"Copy {c} discarded")
                 yield from connection.flush()
             
         # Last node will output the density matrix of the shared target copy 
         if self.name == self.node_names[-1]:
+            timer.start("evaluation")
             full_state = get_qubit_state(target_qubit, self.name, full_state=True)
             logger.warning(f"Outputting density matrix of shared state")
-            return {"name": self.name, 
-                    "target qubit": target_qubit,
-                    "full state": full_state}
+            return timer.report({"name": self.name, 
+                                 "target qubit": target_qubit,
+                                 "full state": full_state})
         # Others will just return their qubit of the unmeasured target copy
         else:
-            return {"name": self.name, "target qubit": target_qubit}
+            return timer.report({"name": self.name, "target qubit": target_qubit})
 
 
 class GHZVerifierNode_new(Program):
-    def __init__(self, name:str, node_names:List[str], ntest:int, copies:int):
+    def __init__(self, name:str, node_names:List[str], ntest:int, copies:int, timings:bool=False):
         self.name = name
         self.node_names = node_names
         self.peer_names = [peer for peer in self.node_names if peer != self.name]
@@ -476,6 +498,8 @@ class GHZVerifierNode_new(Program):
             self.ntotal = copies
         else:
             raise ValueError("Number of copies must be greater than number of tests")
+        # If True, time spent per protocol phase is returned under the 'timings' key
+        self.timings = timings
 
     @property
     def meta(self) -> ProgramMeta:
@@ -489,6 +513,7 @@ class GHZVerifierNode_new(Program):
     def run(self, context: ProgramContext):
         connection = context.connection
         logger = LogManager.get_stack_logger(f"{self.name}_Verifier")
+        timer = phase_timer(self.timings)
 
         ### 
         # Preparation phase
@@ -555,6 +580,7 @@ class GHZVerifierNode_new(Program):
         # We will sequentially generate ntotal GHZ state copies 
         for c in range(self.ntotal):
             ## Distribute GHZ state and get the qubit corresponding to this node ##
+            timer.start("distribution")
             qubit, _ = yield from create_ghz(
                 connection,
                 down_epr_socket,
@@ -587,6 +613,7 @@ class GHZVerifierNode_new(Program):
                 basis = stab_bases[verifier_id]
                 logger.warning(f"{self.name} will measure in {basis} basis")
 
+                timer.start("measurement")
                 if basis == 'I':            # I measurement (always +1 outcome)
                     m = 0
                 else:
@@ -603,6 +630,7 @@ class GHZVerifierNode_new(Program):
                 results[test_count-1][verifier_id] **= int(m)
 
                 # Send all the other nodes the relevant info to make their measurements
+                timer.start("classical")
                 for node_index in range(1, self.num_nodes):
                     peer_index = node_index - 1
                     csocket = csockets[peer_index]
@@ -622,21 +650,26 @@ class GHZVerifierNode_new(Program):
                 target_qubit = qubit
                 logger.warning(f"Copy {c} stored as target")
 
+                timer.start("measurement")
                 yield from connection.flush()
                 # Send all the other nodes the action to perform : 'keep'
+                timer.start("classical")
                 for node_index in range(1, self.num_nodes):
                     csockets[node_index - 1].send(qubit_action)
 
             else:   # Qubit will be deleted
+                timer.start("measurement")
                 qubit.free()
                 logger.warning(f"Copy {c} discarded")
                 yield from connection.flush()
 
                 # Send all the other nodes the action to perform : 'discard'
+                timer.start("classical")
                 for node_index in range(1, self.num_nodes):
                     csockets[node_index - 1].send(qubit_action)
 
         num_failures = 0
+        timer.start("evaluation")
         # Calculate failure rate for each stabilizer measurement
         for j in range(self.tests):
             measurements = np.array(results[j])
@@ -663,17 +696,17 @@ class GHZVerifierNode_new(Program):
         failure_rate = num_failures / self.tests
         logger.warning(f"Average failure rate: {failure_rate}")
 
-        return {"name": self.name,
-                "average failure rate": failure_rate,
-                "target qubit": target_qubit,
-                "target index": target_idx}
+        return timer.report({"name": self.name,
+                             "average failure rate": failure_rate,
+                             "target qubit": target_qubit,
+                             "target index": target_idx})
     
 
 ###
 
 ###
 class GHZMemberNode_new(Program):
-    def __init__(self, name:str, node_names:List[str], ntest:int, copies:int):
+    def __init__(self, name:str, node_names:List[str], ntest:int, copies:int, timings:bool=False):
         self.name = name
         self.node_names = node_names
         self.peer_names = [peer for peer in self.node_names if peer != self.name]
@@ -683,6 +716,8 @@ class GHZMemberNode_new(Program):
             self.ntotal = copies
         else:
             raise ValueError("Number of copies must be greater than number of tests")
+        # If True, time spent per protocol phase is returned under the 'timings' key
+        self.timings = timings
 
     @property
     def meta(self) -> ProgramMeta:
@@ -696,6 +731,7 @@ class GHZMemberNode_new(Program):
     def run(self, context: ProgramContext):
         connection = context.connection
         logger = LogManager.get_stack_logger(f"{self.name}_Member")
+        timer = phase_timer(self.timings)
 
         ### 
         # Preparation phase
@@ -731,6 +767,7 @@ class GHZMemberNode_new(Program):
         # We will sequentially generate ntotal GHZ state copies 
         for c in range(self.ntotal):
             ## Distribute GHZ state and get the qubit corresponding to this node ##
+            timer.start("distribution")
             qubit, _ = yield from create_ghz(
                 connection,
                 down_epr_socket,
@@ -741,6 +778,7 @@ class GHZMemberNode_new(Program):
             )
             
             ## Get action to be performed by the Verifier ##
+            timer.start("classical")
             qubit_action = yield from csocket.recv()
 
             logger.warning(f"Copy: {c}, Received qubit action: {qubit_action}")
@@ -750,6 +788,7 @@ class GHZMemberNode_new(Program):
                 basis = yield from csocket.recv()
                 logger.warning(f"{self.name} will measure in {basis} basis")
 
+                timer.start("measurement")
                 if basis == 'I':            # I measurement (always +1 outcome)
                     m = 0
                 else:
@@ -762,29 +801,33 @@ class GHZMemberNode_new(Program):
                     yield from connection.flush()
 
                 # Send the result back to Verifier
+                timer.start("classical")
                 csocket.send(int(m))
                 logger.debug(f"Result {int(m)} sent to Verifier")
             
             elif qubit_action == "keep":
                 target_qubit = qubit
                 logger.warning(f"Copy {c} stored as target")
+                timer.start("measurement")
                 yield from connection.flush()
 
             else:   # Qubit will be deleted
+                timer.start("measurement")
                 qubit.free()
                 logger.warning(f"Copy {c} discarded")
                 yield from connection.flush()
             
         # Last node will output the density matrix of the shared target copy 
         if self.name == self.node_names[-1]:
+            timer.start("evaluation")
             full_state = get_qubit_state(target_qubit, self.name, full_state=True)
             logger.warning(f"Outputting density matrix of shared state")
-            return {"name": self.name, 
-                    "target qubit": target_qubit,
-                    "full state": full_state}
+            return timer.report({"name": self.name, 
+                                 "target qubit": target_qubit,
+                                 "full state": full_state})
         # Others will just return their qubit of the unmeasured target copy
         else:
-            return {"name": self.name, "target qubit": target_qubit}
+            return timer.report({"name": self.name, "target qubit": target_qubit})
 
 ###
 #   Generates the full set of stabilizers of a GHZ state
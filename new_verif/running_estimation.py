@@ -2,6 +2,7 @@ import os
 from utils import *
 from verification_programs_full import GHZVerifierNode_full, GHZMemberNode_full
 from utilsIO import *
+from phase_posterior import GridPhasePosterior
 import numpy as np
 from pprint import pprint
 import random
@@ -47,6 +48,17 @@ if __name__ == '__main__':
     sensing_iters = 0
     phase_average = np.nan
 
+    # Grid posterior over the pi/num_nodes interval containing the phase average
+    true_average = np.average([program.phase for program in programs.values()])
+    i = 0
+    while true_average % ((i+1)*np.pi/num_nodes) != true_average:
+        i += 1
+    posterior = GridPhasePosterior(d=num_nodes,
+                                   start=i*np.pi/num_nodes,
+                                   stop=(i+1)*np.pi/num_nodes)
+    posterior_means = []
+    posterior_stds = []
+
     while sensing_iters < num_iters:
         results = run(
             config=network_cfg,
@@ -76,6 +88,11 @@ if __name__ == '__main__':
         # Track running frequency of +^d outcome
         running_plus_freq.append(plus_outcomes / (sensing_iters))
 
+        # Update posterior with the overall parity
+        posterior.update(np.prod(parities))
+        posterior_means.append(posterior.mean())
+        posterior_stds.append(np.sqrt(posterior.variance()))
+
         # Get phase average
         if sensing_iters == num_iters:
             phases = []
@@ -98,21 +115,14 @@ if __name__ == '__main__':
 
     # Identify interval
     i = 0
-    while phase_average % ((i+1)*np.pi/4) != phase_average:
+    while phase_average % ((i+1)*np.pi/num_nodes) != phase_average:
          i += 1
 
-    # Estimate phase average
-    estimations = []
-    for p in running_plus_freq:
-        #arg = min(1, (p * (2**num_nodes) - 1))      # for +^d outcome
-        arg = min(1, (p*2 - 1))                      # for overall +1 outcome
-        if i == 0:                     
-            est = np.arccos(arg) / num_nodes
-        elif i < 3:
-            est = ((-1)**i) * np.arccos(arg) / num_nodes + np.pi/2
-        else:
-            est = -1 * np.arccos(arg) / num_nodes + np.pi
-        estimations.append(est)
+    # Estimate phase average for every running frequency at once, folded back into the
+    # i-th interval (same form as inverse_cos_from_freq in estimation_dist/estimation_tables.py)
+    #args = np.minimum(1, np.array(running_plus_freq) * (2**num_nodes) - 1)      # for +^d outcome
+    args = np.minimum(1, np.array(running_plus_freq)*2 - 1)                      # for overall +1 outcome
+    estimations = ((-1)**i * np.arccos(args) + 2*np.pi*np.ceil(i/2)) / num_nodes
 
     #print(f"Average phase: {phase_average}")
     #print(f"Final estimated average phase: {estimations[-1]}")
@@ -131,12 +141,14 @@ if __name__ == '__main__':
         f.write(f"#  num_nodes={num_nodes}, total_iters={total_iters}, ntest={ntest}, copies={copies}\n")
         f.write(f"#  phase_average={phase_average}, failure_threshold={f_threshold}\n")
         f.write("# columns:\n")
-        f.write("#  iteration   running_frequency   running_estimation\n")
+        f.write("#  iteration   running_frequency   running_estimation   posterior_mean   posterior_std\n")
 
     write_to_file_multiy(filename=filename,
                          x=x,
                          y1=running_plus_freq,
-                         y2=estimations)
+                         y2=estimations,
+                         y3=posterior_means,
+                         y4=posterior_stds)
     
     print(f"Finished job t{threshold_postfix}_{num_iters}_iters.sh")
     print(f"Results saved in: {filename}\n")
\ No newline at end of file
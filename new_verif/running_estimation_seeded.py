@@ -101,18 +101,15 @@ if __name__ == '__main__':
     while phase_average % ((i+1)*np.pi/4) != phase_average:
          i += 1
 
-    # Estimate phase average
-    estimations = []
-    for p in running_plus_freq:
-        #arg = min(1, (p * (2**num_nodes) - 1))      # for +^d outcome
-        arg = min(1, (p*2 - 1))                      # for overall +1 outcome
-        if i == 0:                     
-            est = np.arccos(arg) / num_nodes
-        elif i < 3:
-            est = ((-1)**i) * np.arccos(arg) / num_nodes + np.pi/2
-        else:
-            est = -1 * np.arccos(arg) / num_nodes + np.pi
-        estimations.append(est)
+    # Estimate phase average for every running frequency at once
+    #args = np.minimum(1, np.array(running_plus_freq) * (2**num_nodes) - 1)      # for +^d outcome
+    args = np.minimum(1, np.array(running_plus_freq)*2 - 1)                      # for overall +1 outcome
+    if i == 0:
+        estimations = np.arccos(args) / num_nodes
+    elif i < 3:
+        estimations = ((-1)**i) * np.arccos(args) / num_nodes + np.pi/2
+    else:
+        estimations = -1 * np.arccos(args) / num_nodes + np.pi
 
     print(f"Average phase: {phase_average}")
     print(f"Final estimated average phase: {estimations[-1]}")
@@ -11,6 +11,7 @@ from squidasm.util.routines import create_ghz # type: ignore
 from netqasm.sdk.qubit import Qubit
 from netqasm.sdk.connection import BaseNetQASMConnection
 from squidasm.util.util import get_qubit_state # type: ignore
+from phase_timer import phase_timer
 
 ###
 #   Function to output a set of stabilizer generators for the GHZ state, given the number of nodes
@@ -72,7 +73,7 @@ def get_stabilizers(num_nodes: int) -> Dict[str, List[str]]:
     return result
 
 class SensingProgram_verifier(Program):
-    def __init__(self, name:str, node_names:List[str], ntest:int, failure_threshold:float, send_state:bool=False):
+    def __init__(self, name:str, node_names:List[str], ntest:int, failure_threshold:float, send_state:bool=False, timings:bool=False):
         self.name = name
         self.node_names = node_names
         self.peer_names = [peer for peer in self.node_names if peer != self.name]
@@ -84,6 +85,8 @@ class SensingProgram_verifier(Program):
         self.failure_threshold = failure_threshold
         self.phase = random.uniform(0, np.pi)
         self.send_state = send_state
+        # If True, time spent per protocol phase is returned under the 'timings' key
+        self.timings = timings
 
     @property
     def meta(self) -> ProgramMeta:
@@ -156,6 +159,7 @@ class SensingProgram_verifier(Program):
         # We will sequentially generate ntotal GHZ state copies 
         for c in range(self.ntotal):
             ## Distribute GHZ state and get the qubit corresponding to this node ##
+            self._timer.start("distribution")
             qubit, _ = yield from create_ghz(
                 connection,
                 down_epr_socket,
@@ -193,6 +197,7 @@ class SensingProgram_verifier(Program):
                 basis = stab_bases[verifier_id]
                 logger.warning(f"{self.name} will measure in {basis} basis")
 
+                self._timer.start("measurement")
                 qubit.K() if basis == 'Y' else qubit.H()
                 m = qubit.measure()
                 yield from connection.flush()
@@ -202,6 +207,7 @@ class SensingProgram_verifier(Program):
                 results[stab_number][test_number][verifier_id] **= int(m)
 
                 # Send all the other nodes the relevant info to make their measurements
+                self._timer.start("classical")
                 for node_index in range(1, self.num_nodes):
                     peer_index = node_index - 1
                     csocket = csockets[peer_index]
@@ -221,20 +227,25 @@ class SensingProgram_verifier(Program):
                 self.target_qubit = qubit
                 logger.warning(f"Copy {c} stored as target")
 
+                self._timer.start("measurement")
                 yield from connection.flush()
                 # Send all the other nodes the action to perform : 'keep'
+                self._timer.start("classical")
                 for node_index in range(1, self.num_nodes):
                     csockets[node_index - 1].send(qubit_action)
 
             else:   # Qubit will be deleted
+                self._timer.start("measurement")
                 qubit.free()
                 logger.warning(f"Copy {c} discarded")
                 yield from connection.flush()
 
                 # Send all the other nodes the action to perform : 'discard'
+                self._timer.start("classical")
                 for node_index in range(1, self.num_nodes):
                     csockets[node_index - 1].send(qubit_action)
 
+        self._timer.start("evaluation")
         failure_rates = []
         # Calculate failure rate for each stabilizer measurement
         for j in range(self.num_nodes):
@@ -254,6 +265,7 @@ class SensingProgram_verifier(Program):
 
         self.avg_failure_rate = np.mean(failure_rates)
         logger.warning(f"Average failure rate: {self.avg_failure_rate}")
+        self._timer.stop()
 
         """ return {"name": self.name,
                 "average failure rate": self.avg_failure_rate,
@@ -263,6 +275,8 @@ class SensingProgram_verifier(Program):
         connection = context.connection
         logger = LogManager.get_stack_logger(f"{self.name}_Verifier")
 
+        self._timer = phase_timer(self.timings)
+
         # Establish classical connections to all member nodes
         csockets = [context.csockets[peer] for peer in self.peer_names]
 
@@ -276,11 +290,13 @@ class SensingProgram_verifier(Program):
         if self.avg_failure_rate < self.failure_threshold:
             logger.warning(f"Average failure rate below threshold. Continuing with sensing.")
             # Inform all other nodes to continue with sensing
+            self._timer.start("classical")
             for csocket in csockets:
                 csocket.send("continue")
             
             # Encode the phase onto target qubit
             #self.phase = 0         # to test applying no rotation
+            self._timer.start("measurement")
             self.target_qubit.rot_Z(angle=self.phase)
 
             if self.send_state is False:
@@ -292,31 +308,32 @@ class SensingProgram_verifier(Program):
                 logger.warning(f"{self.name} measured {int(m)}")
                 
                 # Return parity outcome
-                return {"name": self.name,
-                        "average failure rate": self.avg_failure_rate,
-                        "parity": (-1)**int(m),
-                        "local phase": self.phase,
-                        "status": 0}
+                return self._timer.report({"name": self.name,
+                                           "average failure rate": self.avg_failure_rate,
+                                           "parity": (-1)**int(m),
+                                           "local phase": self.phase,
+                                           "status": 0})
             
             else:
                 logger.warning(f"Outputting unmeasured qubit")
-                return {"name": self.name,
-                        "average failure rate": self.avg_failure_rate,
-                        "qubit": self.target_qubit,
-                        "local phase": self.phase,
-                        "status": 0}
+                return self._timer.report({"name": self.name,
+                                           "average failure rate": self.avg_failure_rate,
+                                           "qubit": self.target_qubit,
+                                           "local phase": self.phase,
+                                           "status": 0})
 
         else:   # Otherwise abort the protocol
             logger.warning(f"Average failure rate not below threshold. Aborting protocol.")
+            self._timer.start("classical")
             for csocket in csockets:
                 csocket.send("abort")
-            return {"name": self.name, 
-                    "average failure rate": self.avg_failure_rate,
-                    "status": 1}
+            return self._timer.report({"name": self.name, 
+                                       "average failure rate": self.avg_failure_rate,
+                                       "status": 1})
 
     
 class SensingProgram_member(Program):
-    def __init__(self, name:str, node_names:List[str], ntest:int, send_state:bool=False):
+    def __init__(self, name:str, node_names:List[str], ntest:int, send_state:bool=False, timings:bool=False):
         self.name = name
         self.node_names = node_names
         self.peer_names = [peer for peer in self.node_names if peer != self.name]
@@ -326,6 +343,8 @@ class SensingProgram_member(Program):
         self.target_qubit = None
         self.phase = random.uniform(0, np.pi)
         self.send_state = send_state
+        # If True, time spent per protocol phase is returned under the 'timings' key
+        self.timings = timings
 
     @property
     def meta(self) -> ProgramMeta:
@@ -368,6 +387,7 @@ class SensingProgram_member(Program):
         # We will sequentially generate ntotal GHZ state copies 
         for c in range(self.ntotal):
             ## Distribute GHZ state and get the qubit corresponding to this node ##
+            self._timer.start("distribution")
             qubit, _ = yield from create_ghz(
                 connection,
                 down_epr_socket,
@@ -378,6 +398,7 @@ class SensingProgram_member(Program):
             )
             
             ## Get action to be performed by the Verifier ##
+            self._timer.start("classical")
             qubit_action = yield from csocket.recv()
 
             logger.warning(f"Copy: {c}, Received qubit action: {qubit_action}")
@@ -387,42 +408,51 @@ class SensingProgram_member(Program):
                 basis = yield from csocket.recv()
                 logger.warning(f"{self.name} will measure in {basis} basis")
 
+                self._timer.start("measurement")
                 qubit.K() if basis == 'Y' else qubit.H()
                 m = qubit.measure()
                 yield from connection.flush()
 
                 # Send the result back to Verifier
+                self._timer.start("classical")
                 csocket.send(int(m))
                 logger.debug(f"Result {int(m)} sent to Verifier")
             
             elif qubit_action == "keep":
                 self.target_qubit = qubit
                 logger.warning(f"Copy {c} stored as target")
+                self._timer.start("measurement")
                 yield from connection.flush()
 
             else:   # Qubit will be deleted
+                self._timer.start("measurement")
                 qubit.free()
                 logger.warning(f"Copy {c} discarded")
                 yield from connection.flush()
 
+        self._timer.stop()
         return {"name": self.name, "target qubit": self.target_qubit}
     
     def run(self, context: ProgramContext):
         connection = context.connection
         logger = LogManager.get_stack_logger(f"{self.name}_Member")
 
+        self._timer = phase_timer(self.timings)
+
         # Establish classical connection with Verifier node
         csocket = context.csockets[self.node_names[0]]
 
         # Run verification protocol
         yield from self._run_verification(context, csocket)
 
+        self._timer.start("classical")
         action = yield from csocket.recv()
         logger.warning(f"Received message: {action} from Verifier")
 
         if action == "continue":
             # Encode the phase onto target qubit
             #self.phase = 0         # to test applying no rotation
+            self._timer.start("measurement")
             self.target_qubit.rot_Z(angle=self.phase)          
 
             if self.send_state is False:
@@ -433,27 +463,28 @@ class SensingProgram_member(Program):
                 yield from connection.flush()
                 logger.warning(f"{self.name} measured {int(m)}")
 
-                return {"name": self.name, 
-                        "parity": (-1)**int(m),
-                        "local phase": self.phase}
+                return self._timer.report({"name": self.name, 
+                                           "parity": (-1)**int(m),
+                                           "local phase": self.phase})
             
             else:
                 # Last node will output the density matrix of the shared state
                 if self.name == self.node_names[-1]:
+                    self._timer.start("evaluation")
                     full_state = get_qubit_state(self.target_qubit, self.name, full_state=True)
                     logger.warning(f"Outputting density matrix of shared state")
-                    return {"name": self.name,
-                            "qubit": self.target_qubit, 
-                            "full state": full_state,
-                            "local phase": self.phase}
+                    return self._timer.report({"name": self.name,
+                                               "qubit": self.target_qubit, 
+                                               "full state": full_state,
+                                               "local phase": self.phase})
 
                 else:
                     logger.warning(f"Outputting unmeasured qubit")
-                    return {"name": self.name, 
-                            "qubit": self.target_qubit,
-                            "local phase": self.phase}
+                    return self._timer.report({"name": self.name, 
+                                               "qubit": self.target_qubit,
+                                               "local phase": self.phase})
         
         else:
             logger.warning(f"Sensing protocol aborted")
-            return {"name": self.name}
+            return self._timer.report({"name": self.name})
 
@@ -29,12 +29,11 @@ if __name__ == '__main__':
         if network == 'perfect':
             network_cfg = configure_perfect_network(node_names)
         elif network == 'optimhf':
+            # Modify the link configuration
             network_cfg = configure_network(node_names,
                                             use_high_fidelity=True,
-                                            use_optimistic=True)
-            # Modify the link configuration
-            for link in network_cfg.links:
-                link.cfg.fidelity = link_fidelity
+                                            use_optimistic=True,
+                                            overrides={'link.fidelity': link_fidelity})
         else:
             raise ValueError("The network parameter must have value \'perfect\' or \'optimhf\'")
 
@@ -7,6 +7,8 @@ from matrix_animation import plot_3d_bar_animation
 import numpy as np
 import scipy.linalg as sci
 import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
 
 from squidasm.run.stack.run import run # type: ignore
 from squidasm.sim.stack.common import LogManager # type: ignore
@@ -56,8 +58,49 @@ def H_and_M(d, operator='sigma_z', print_matrices:bool=False):
     
     return H, M
 
-def calc_epsilon(rho: np.ndarray, num_nodes):
-    H, M = H_and_M(num_nodes)
+def H_and_M_diagonal(d, print_matrices:bool=False):
+    
+    # Diagonal of sigma_z/2 on each qubit, with qubit 0 as the most significant bit
+    basis = np.arange(2**d)
+    
+    # Operators, stored as the vectors of their diagonals:
+    H = {}
+    for i in range(d):
+        H[i] = 0.5 * (-1.0)**((basis >> (d-1-i)) & 1)
+    
+    
+    M = {}
+    
+    for i in range(d-1):
+        M[i] = {}
+    
+    for i in range(d):
+        for j in range(i+1, d):
+            M[i][j] = H[i] - H[j]
+            # Printing:
+            if print_matrices:
+                print(f"diag(H{i+1}-H{j+1}) = \n{M[i][j]}")
+    
+    return H, M
+
+def diagonal_commutator(m, rho):
+    # [M, rho] for diagonal M = diag(m) is the elementwise product (m_i - m_j) * rho_ij
+    return (m[:, None] - m[None, :]) * rho
+
+def commutator_trace_norm(C):
+    # The commutator of two Hermitian matrices is anti-Hermitian, so iC is Hermitian
+    # and its singular values are the absolute values of its eigenvalues
+    return np.sum(np.abs(np.linalg.eigvalsh(1j * C)))
+
+def calc_epsilon(rho: np.ndarray, num_nodes, operator='sigma_z'):
+    if operator == 'sigma_z':
+        # Diagonal generators: elementwise commutators and Hermitian eigenvalues
+        _, M = H_and_M_diagonal(num_nodes)
+        trace_norms = [commutator_trace_norm(diagonal_commutator(M[i][j], rho))
+                       for i in M.keys() for j in M[i].keys()]
+        return max(trace_norms)
+
+    H, M = H_and_M(num_nodes, operator)
     C = {}
     for i in range(num_nodes-1):
         C[i] = {}
@@ -65,13 +108,49 @@ def calc_epsilon(rho: np.ndarray, num_nodes):
     trace_norms = []
     for i in M.keys():
         for j in M[i].keys():
-            C[i][j] = np.matmul(M[i][j], noisy_rho) - np.matmul(noisy_rho, M[i][j])
+            C[i][j] = np.matmul(M[i][j], rho) - np.matmul(rho, M[i][j])
             trace_norms.append(sum(np.linalg.svd(C[i][j])[1]))
     
     epsilon = max(trace_norms)
     return epsilon
 
 
+def _trace_norms_chunk(noisy_rhos: np.ndarray, diffs: np.ndarray):
+    # Trace norms of every commutator for a chunk of noisy states, shape (chunk, pairs)
+    C = 1j * diffs[None] * noisy_rhos[:, None]
+    return np.sum(np.abs(np.linalg.eigvalsh(C)), axis=-1)
+
+###
+#   Function to compute the trace norm of [H_i - H_j, rho] for every noise type,
+#   every eta value and every node pair i < j in one batched computation.
+#   All commutators for a chunk of noisy states are stacked into one array and
+#   diagonalised with a single batched eigvalsh call. For large d the chunks are
+#   split across a process pool (processes=None uses all cores from d=7 upwards).
+#   Returns an array indexed by (noise, eta, pair) and the list of pairs (i, j).
+###
+def batch_trace_norms(rho: np.ndarray, num_nodes, noise_types, eta_list, processes=None, chunk_size=8):
+    _, M = H_and_M_diagonal(num_nodes)
+    pairs = [(i, j) for i in M.keys() for j in M[i].keys()]
+    m = np.array([M[i][j] for (i, j) in pairs])
+    diffs = m[:, :, None] - m[:, None, :]
+
+    noisy_rhos = np.array([LocalNoiseChannel(noise).apply(rho, num_nodes, eta_list)
+                           for noise in noise_types])
+    flat = noisy_rhos.reshape((-1,) + noisy_rhos.shape[-2:])
+    chunks = [flat[k:k+chunk_size] for k in range(0, len(flat), chunk_size)]
+
+    if processes is None:
+        processes = os.cpu_count() if num_nodes >= 7 else 1
+    if processes > 1:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            norms = list(pool.map(_trace_norms_chunk, chunks, [diffs]*len(chunks)))
+    else:
+        norms = [_trace_norms_chunk(chunk, diffs) for chunk in chunks]
+
+    trace_norms = np.concatenate(norms).reshape(len(noise_types), len(eta_list), len(pairs))
+    return trace_norms, pairs
+
+
 if __name__ == '__main__':
     num_nodes = 4
     ntest = 3
@@ -118,41 +197,16 @@ if __name__ == '__main__':
     max_eta = 1
     eta_list = np.linspace(min_eta, max_eta, datapoints)
 
-    amp_dam_eps = []
-    print('Amplitude damping:')
-    for eta in eta_list:
-        K_amp_dam = amplitude_damping_Kraus_operators(num_nodes, eta)
-        noisy_rho = apply_noise(rho, num_nodes, K_amp_dam)
-        e = calc_epsilon(noisy_rho, num_nodes)
-        print(f"eta: {eta}, epsilon: {e}")
-        amp_dam_eps.append(e)
-
-    phase_dam_eps = []
-    print('\nPhase damping:')
-    for eta in eta_list:
-        K_phase_dam = phase_damping_Kraus_operators(num_nodes, eta)
-        noisy_rho = apply_noise(rho, num_nodes, K_phase_dam)
-        e = calc_epsilon(noisy_rho, num_nodes)
-        print(f"eta: {eta}, epsilon: {e}")
-        phase_dam_eps.append(e)
-    
-    dep_noise_eps = []
-    print('\nDepolarising noise:') 
-    for eta in eta_list:
-        K_dep_noise = depolarising_Kraus_operators(num_nodes, eta)
-        noisy_rho = apply_noise(rho, num_nodes, K_dep_noise)
-        e = calc_epsilon(noisy_rho, num_nodes)
-        print(f"eta: {eta}, epsilon: {e}")
-        dep_noise_eps.append(e)
-    
-    deph_noise_eps = []
-    print('\nDephasing noise:')
-    for eta in eta_list:
-        K_deph_noise = dephasing_Kraus_operators(num_nodes, eta)
-        noisy_rho = apply_noise(rho, num_nodes, K_deph_noise)
-        e = calc_epsilon(noisy_rho, num_nodes)
-        print(f"eta: {eta}, epsilon: {e}")
-        deph_noise_eps.append(e)
+    noise_types = ['Amplitude Damping', 'Phase Damping', 'Depolarising Noise', 'Dephasing Noise']
+    trace_norms, pairs = batch_trace_norms(rho, num_nodes, noise_types, eta_list)
+    # epsilon is the largest trace norm over all node pairs, indexed by (noise, eta)
+    epsilons = np.max(trace_norms, axis=2)
+
+    for noise, noise_eps in zip(noise_types, epsilons):
+        print(f"\n{noise}:")
+        for eta, e in zip(eta_list, noise_eps):
+            print(f"eta: {eta}, epsilon: {e}")
+    amp_dam_eps, phase_dam_eps, dep_noise_eps, deph_noise_eps = epsilons
 
     ### Write data to file
 
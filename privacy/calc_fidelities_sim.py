@@ -4,15 +4,11 @@ from utilsIO import *
 from plot_bar3D import plot_3d_bar
 from kraus_operators import *
 import numpy as np
-import scipy.linalg as sci
+from fidelity import FidelityReference
 
 from squidasm.run.stack.run import run # type: ignore
 from squidasm.sim.stack.common import LogManager # type: ignore
 
-def calculate_fidelity(ideal_state: np.ndarray, noisy_state: np.ndarray):
-    fidelity = np.trace(np.abs(sci.sqrtm(ideal_state).dot(sci.sqrtm(noisy_state))))
-    return fidelity
-
 if __name__ == '__main__':
     num_nodes = 4
     ntest = 3
@@ -58,41 +54,20 @@ if __name__ == '__main__':
     max_eta = 1
     eta_list = np.linspace(min_eta, max_eta, datapoints)
 
-    amp_dam_fids = []
-    #print('Amplitude damping:')
-    for eta in eta_list:
-        K_amp_dam = amplitude_damping_Kraus_operators(num_nodes, eta)
-        noisy_rho = apply_noise(rho, num_nodes, K_amp_dam)
-        fid = calculate_fidelity(rho, noisy_rho)
-        #print(f"eta: {eta}, fidelity: {fid}")
-        amp_dam_fids.append(fid)
-
-    phase_dam_fids = []
-    #print('\nPhase damping:')
-    for eta in eta_list:
-        K_phase_dam = phase_damping_Kraus_operators(num_nodes, eta)
-        noisy_rho = apply_noise(rho, num_nodes, K_phase_dam)
-        fid = calculate_fidelity(rho, noisy_rho)
-        #print(f"eta: {eta}, fidelity: {fid}")
-        phase_dam_fids.append(fid)
-    
-    dep_noise_fids = []
-    #print('\nDepolarising noise:') 
-    for eta in eta_list:
-        K_dep_noise = depolarising_Kraus_operators(num_nodes, eta)
-        noisy_rho = apply_noise(rho, num_nodes, K_dep_noise)
-        fid = calculate_fidelity(rho, noisy_rho)
-        #print(f"eta: {eta}, fidelity: {fid}")
-        dep_noise_fids.append(fid)
-    
-    deph_noise_fids = []
-    #print('\nDephasing noise:')
-    for eta in eta_list:
-        K_deph_noise = dephasing_Kraus_operators(num_nodes, eta)
-        noisy_rho = apply_noise(rho, num_nodes, K_deph_noise)
-        fid = calculate_fidelity(rho, noisy_rho)
-        #print(f"eta: {eta}, fidelity: {fid}")
-        deph_noise_fids.append(fid)
+    # The ideal state is prepared once and compared against every eta at once
+    ideal_reference = FidelityReference(rho)
+
+    amp_dam_rhos = LocalNoiseChannel('Amplitude Damping').apply(rho, num_nodes, eta_list)
+    amp_dam_fids = list(ideal_reference.batch(amp_dam_rhos))
+
+    phase_dam_rhos = LocalNoiseChannel('Phase Damping').apply(rho, num_nodes, eta_list)
+    phase_dam_fids = list(ideal_reference.batch(phase_dam_rhos))
+
+    dep_noise_rhos = LocalNoiseChannel('Depolarising Noise').apply(rho, num_nodes, eta_list)
+    dep_noise_fids = list(ideal_reference.batch(dep_noise_rhos))
+
+    deph_noise_rhos = LocalNoiseChannel('Dephasing Noise').apply(rho, num_nodes, eta_list)
+    deph_noise_fids = list(ideal_reference.batch(deph_noise_rhos))
 
     ### Write data to file
 
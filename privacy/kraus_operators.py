@@ -8,6 +8,7 @@ Created on Fri Dec  1 10:57:34 2023
 
 import numpy as np
 import itertools
+from functools import lru_cache
 
 def depolarising_Kraus_operators(d, eta, verify:bool=False):
     # Nielsen & Chuang, page 378.
@@ -29,31 +30,7 @@ def depolarising_Kraus_operators(d, eta, verify:bool=False):
         List of amplitude damping Kraus operators.
     '''
     
-    a = np.sqrt(1-3*eta/4)
-    b = np.sqrt(eta/4)
-    
-    K_A = a * np.array([[1, 0], [0, 1]])
-    K_B = b * np.array([[0, 1], [1, 0]])
-    K_C = b * np.array([[0, -1j], [1j, 0]])
-    K_D = b * np.array([[1, 0], [0, -1]])
-    
-    lists = list(itertools.product([K_A, K_B, K_C, K_D], repeat=d))
-    
-    """ for x in lists:
-        for y in x:
-            print(y)
-            print("")
-        print("\n") """
-    
-
-    K = {}
-    for i in range(len(lists)):
-        k = np.array([1])
-        for j in range(len(lists[i])):
-            k = np.kron(k, lists[i][j])
-        """ print(k)
-        print("") """
-        K[i] = k
+    K = dict(enumerate(depolarising_Kraus_generator(d, eta)))
         
     if verify:
         verify_K(K)
@@ -64,25 +41,7 @@ def depolarising_Kraus_operators(d, eta, verify:bool=False):
 def dephasing_Kraus_operators(d, eta, verify:bool=False):
     # Majid
     
-    K_A = np.sqrt((1-eta)) * np.array([[1, 0], [0, 1]])
-    K_B = np.sqrt(eta) * np.array([[1, 0], [0, -1]])
-    
-    lists = list(itertools.product([K_A, K_B], repeat=d))
-
-    """ for x in lists:
-        for y in x:
-            print(y)
-            print("")
-        print("\n") """
-    
-    K = {}
-    for i in range(len(lists)):
-        k = np.array([1])
-        for j in range(len(lists[i])):
-            k = np.kron(k, lists[i][j])
-        """ print(k)
-        print("") """
-        K[i] = k
+    K = dict(enumerate(dephasing_Kraus_generator(d, eta)))
         
     if verify:
         verify_K(K)
@@ -110,19 +69,8 @@ def amplitude_damping_Kraus_operators(d:int, eta:float, verify:bool=False):
         List of amplitude damping Kraus operators.
     '''
     
-    K_A = np.array([[1, 0], [0, np.sqrt(1-eta)]])
-    K_B = np.array([[0, np.sqrt(eta)], [0, 0]])
-    
-    lists = list(itertools.product([K_A, K_B], repeat=d))
-    
-    K = {}
-    for i in range(len(lists)):
-        k = np.array([1])
-        for j in range(len(lists[i])):
-            k = np.kron(k, lists[i][j])
+    K = dict(enumerate(amplitude_damping_Kraus_generator(d, eta)))
         
-        K[i] = k
-    
     if verify:
         verify_K(K)
     
@@ -149,37 +97,28 @@ def phase_damping_Kraus_operators(d:int, eta:float, verify:bool=False):
         List of phase damping Kraus operators.
     '''
     
-    K_A = np.array([[1, 0], [0, np.sqrt(1-eta)]])
-    K_B = np.array([[0, 0], [0, np.sqrt(eta)]])
-    
-    lists = list(itertools.product([K_A, K_B], repeat=d))
-    
-    K = {}
-    for i in range(len(lists)):
-        k = np.array([1])
-        for j in range(len(lists[i])):
-            k = np.kron(k, lists[i][j])
+    K = dict(enumerate(phase_damping_Kraus_generator(d, eta)))
         
-        K[i] = k
-    
     if verify:
         verify_K(K)
     
     return K
 
 
-def verify_K(K:list, d:int, verbose:bool=True):
+def verify_K(K, d:int=None, verbose:bool=True):
     '''
     Parameters
     ----------
-    K : list
-        List of Kraus operators.
-    d : int
-        Dimension (i.e. number of parameters).
+    K : dict, list or generator
+        Kraus operators. A generator is consumed one operator at a time,
+        so the completeness check never holds the full set in memory.
+    d : int, optional
+        Dimension (i.e. number of parameters). Inferred from the operators
+        if not given.
     verbose : bool, optional
         If True, it prints the result of the matrix multiplication of (K^t)*K,
         which should be the dxd identity matrix.
-        The default is False.
+        The default is True.
 
     Returns
     -------
@@ -188,13 +127,63 @@ def verify_K(K:list, d:int, verbose:bool=True):
     False, otherwise.
     '''
     
-    s = np.zeros((2**d, 2**d))
-    print('')
-    for i in range(len(K)):
-        s = s + np.matmul(np.conjugate(np.transpose(K[i])), K[i])
-        #print(i, s) # to print step by step.
+    if isinstance(K, dict):
+        K = K.values()
+    s = None
+    for k in K:
+        if s is None:
+            s = np.zeros(k.shape, dtype=complex)
+        s = s + np.matmul(np.conjugate(np.transpose(k)), k)
+        #print(s) # to print step by step.
     if verbose:
         print('\nVerification:\n', s, '\n', 50*'-')
+    if s is None:
+        return False
+    if d is None:
+        d = int(np.log2(s.shape[0]))
+    return bool(np.allclose(s, np.eye(2**d)))
+
+
+def Kraus_generator(K:list, d:int):
+    '''
+    Parameters
+    ----------
+    K : list
+        List of single-qubit Kraus operators.
+    d : int
+        Number of qubits.
+
+    Yields
+    ------
+    k : Numpy 2d-array
+        Each tensor product of d single-qubit operators, built on demand.
+        Only one 2^d x 2^d operator is held in memory at a time.
+    '''
+    for ops in itertools.product(K, repeat=d):
+        k = np.array([1])
+        for op in ops:
+            k = np.kron(k, op)
+        yield k
+
+
+def depolarising_Kraus_generator(d:int, eta:float):
+    # Lazy version of depolarising_Kraus_operators.
+    return Kraus_generator(single_qubit_Kraus_operators('Depolarising Noise', eta), d)
+
+
+def dephasing_Kraus_generator(d:int, eta:float):
+    # Lazy version of dephasing_Kraus_operators.
+    return Kraus_generator(single_qubit_Kraus_operators('Dephasing Noise', eta), d)
+
+
+def amplitude_damping_Kraus_generator(d:int, eta:float):
+    # Lazy version of amplitude_damping_Kraus_operators.
+    return Kraus_generator(single_qubit_Kraus_operators('Amplitude Damping', eta), d)
+
+
+def phase_damping_Kraus_generator(d:int, eta:float):
+    # Lazy version of phase_damping_Kraus_operators.
+    return Kraus_generator(single_qubit_Kraus_operators('Phase Damping', eta), d)
 
 
 def apply_noise(rho, d:int, K:list):
@@ -205,21 +194,194 @@ def apply_noise(rho, d:int, K:list):
         Density matrix of the state to apply .
     d : int
         dimension.
-    K : list
-        List of Kraus operators.
+    K : dict, list or generator
+        Kraus operators. A generator (e.g. from depolarising_Kraus_generator)
+        is consumed one operator at a time.
 
     Returns
     -------
     s : Numpy 2d-array
         Density matrix after noise.
     '''
+    if isinstance(K, dict):
+        K = K.values()
     s = np.zeros((2**d, 2**d))
-    for i in range(len(K)):
-        s = s + np.matmul(np.matmul(K[i], rho), np.conjugate(np.transpose(K[i])))
-    s = s
+    for k in K:
+        s = s + np.matmul(np.matmul(k, rho), np.conjugate(np.transpose(k)))
     return s
 
 
+
+def single_qubit_Kraus_operators(noise:str, eta:float):
+    '''
+    Parameters
+    ----------
+    noise : str
+        Noise type: 'Amplitude Damping', 'Depolarising Noise', 'Phase Damping'
+        or 'Dephasing Noise'.
+    eta : float
+        Noise parameter, as in the corresponding d-qubit function.
+
+    Returns
+    -------
+    K : list
+        List of 2x2 Kraus operators acting on a single qubit.
+    '''
+    
+    if noise == 'Depolarising Noise':
+        a = np.sqrt(1-3*eta/4)
+        b = np.sqrt(eta/4)
+        K = [a * np.array([[1, 0], [0, 1]]),
+             b * np.array([[0, 1], [1, 0]]),
+             b * np.array([[0, -1j], [1j, 0]]),
+             b * np.array([[1, 0], [0, -1]])]
+    elif noise == 'Dephasing Noise':
+        K = [np.sqrt((1-eta)) * np.array([[1, 0], [0, 1]]),
+             np.sqrt(eta) * np.array([[1, 0], [0, -1]])]
+    elif noise == 'Amplitude Damping':
+        K = [np.array([[1, 0], [0, np.sqrt(1-eta)]]),
+             np.array([[0, np.sqrt(eta)], [0, 0]])]
+    elif noise == 'Phase Damping':
+        K = [np.array([[1, 0], [0, np.sqrt(1-eta)]]),
+             np.array([[0, 0], [0, np.sqrt(eta)]])]
+    else:
+        raise ValueError('Noise type "%s" not implemented.'%noise)
+    
+    return K
+
+
+def apply_local_noise(rho, d:int, K:list):
+    '''
+    Applies the same single-qubit channel independently to every qubit.
+    Equivalent to apply_noise with the 4^d (or 2^d) tensor-product Kraus operators,
+    but rho is reshaped into a (2,)*2d tensor and each qubit is contracted with
+    the 2x2 operators in turn, so the cost is O(d 4^d) instead of O(16^d).
+
+    Parameters
+    ----------
+    rho : Numpy 2d-array
+        Density matrix of the state to apply the noise to.
+    d : int
+        Number of qubits.
+    K : list
+        List of single-qubit Kraus operators, e.g. from single_qubit_Kraus_operators.
+
+    Returns
+    -------
+    s : Numpy 2d-array
+        Density matrix after noise.
+    '''
+    K = np.array(K, dtype=complex)
+    s = np.asarray(rho, dtype=complex).reshape((2,)*(2*d))
+    for q in range(d):
+        # Bring the row and column index of qubit q to the front
+        s = np.moveaxis(s, (q, d+q), (0, 1))
+        shape = s.shape
+        s = np.einsum('kab,bcr,kdc->adr', K, s.reshape(2, 2, -1), K.conj(),
+                      optimize=True).reshape(shape)
+        s = np.moveaxis(s, (0, 1), (q, d+q))
+    return s.reshape(2**d, 2**d)
+
+
+@lru_cache(maxsize=256)
+def single_qubit_superoperator(noise:str, eta:float):
+    '''
+    Superoperator of a single-qubit channel acting on the row-major vectorisation
+    of a 2x2 density matrix, S = sum_k K_k (x) conj(K_k).
+    Results are cached per (noise, eta) in a bounded LRU, so repeated sweeps over
+    the same eta values only build each superoperator once.
+
+    Parameters
+    ----------
+    noise : str
+        Noise type, as in single_qubit_Kraus_operators.
+    eta : float
+        Noise parameter.
+
+    Returns
+    -------
+    S : Numpy 2d-array
+        Read-only 4x4 superoperator.
+    '''
+    S = sum(np.kron(K, np.conjugate(K)) for K in single_qubit_Kraus_operators(noise, eta))
+    S = np.array(S, dtype=complex)
+    S.setflags(write=False)
+    return S
+
+
+def apply_superoperator(rho, d:int, S):
+    '''
+    Applies a single-qubit superoperator independently to every qubit of a batch
+    of density matrices. Leading axes of rho and S broadcast against each other,
+    e.g. rho of shape (n_alpha, 1, 2^d, 2^d) and S of shape (n_eta, 4, 4) give
+    an output of shape (n_alpha, n_eta, 2^d, 2^d).
+
+    Parameters
+    ----------
+    rho : Numpy array
+        Density matrices of shape (..., 2^d, 2^d).
+    d : int
+        Number of qubits.
+    S : Numpy array
+        Superoperators of shape (..., 4, 4).
+
+    Returns
+    -------
+    s : Numpy array
+        Density matrices after noise.
+    '''
+    rho = np.asarray(rho, dtype=complex)
+    S_T = np.swapaxes(np.asarray(S), -1, -2)
+    batch = np.broadcast_shapes(rho.shape[:-2], S_T.shape[:-2])
+    nb = len(batch)
+    s = np.broadcast_to(rho, batch + rho.shape[-2:]).reshape(batch + (2,)*(2*d))
+    for q in range(d):
+        # Bring the row and column index of qubit q to the back and contract
+        s = np.moveaxis(s, (nb+q, nb+d+q), (-2, -1))
+        shape = s.shape
+        s = np.matmul(s.reshape(shape[:nb] + (-1, 4)), S_T).reshape(shape)
+        s = np.moveaxis(s, (-2, -1), (nb+q, nb+d+q))
+    return s.reshape(batch + (2**d, 2**d))
+
+
+class LocalNoiseChannel:
+    '''
+    Single-qubit noise channel applied independently to every qubit.
+    Superoperators are built lazily and shared through single_qubit_superoperator,
+    so a whole eta sweep is applied to a state (or a stack of states) in one call.
+    '''
+    
+    def __init__(self, noise:str):
+        self.noise = noise
+    
+    def superoperators(self, eta_values):
+        '''
+        Returns the superoperators for each eta, stacked along a leading axis
+        with the same shape as eta_values.
+        '''
+        eta_values = np.asarray(eta_values, dtype=float)
+        S = [single_qubit_superoperator(self.noise, float(eta)) for eta in eta_values.ravel()]
+        return np.array(S).reshape(eta_values.shape + (4, 4))
+    
+    def apply(self, rho, d:int, eta_values):
+        '''
+        Parameters
+        ----------
+        rho : Numpy array
+            Density matrix, or stack of density matrices of shape (..., 2^d, 2^d).
+        d : int
+            Number of qubits.
+        eta_values : float or list
+            Noise parameter(s). A list of n values adds a trailing batch axis of
+            length n, broadcast against the leading axes of rho.
+
+        Returns
+        -------
+        s : Numpy array
+            Density matrices after noise.
+        '''
+        return apply_superoperator(rho, d, self.superoperators(eta_values))
+
 if __name__=='__main__':
     d = 5
     eta = 0.5
@@ -1,73 +1,149 @@
+import os
+import subprocess
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib import cm
+import matplotlib
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from matplotlib.colors import Normalize
-from matplotlib.animation import FuncAnimation, PillowWriter, FFMpegWriter
+from concurrent.futures import ProcessPoolExecutor
 
-def plot_3d_bar_animation(matrices, title="Test", filename="test_animation.mp4", fps=2, min_eta=0, max_eta=1):
-    matrices = [np.array(m) for m in matrices]
-    dim = matrices[0].shape[0]
+###
+#   Function to reduce a matrix to at most max_bars x max_bars bars.
+#   Each block keeps its entry of largest magnitude (with its sign), so isolated
+#   features such as the corner coherences of a GHZ state survive the decimation.
+###
+def decimate_matrix(matrix, max_bars=None):
+    matrix = np.asarray(matrix)
+    dim = matrix.shape[0]
+    if max_bars is None or dim <= max_bars:
+        return matrix
+    step = int(np.ceil(dim / max_bars))
+    size = int(np.ceil(dim / step))
+    padded = np.zeros((size*step, size*step), dtype=matrix.dtype)
+    padded[:dim, :dim] = matrix
+    blocks = padded.reshape(size, step, size, step).transpose(0, 2, 1, 3).reshape(size, size, -1)
+    peak = np.argmax(np.abs(blocks), axis=-1)
+    return np.take_along_axis(blocks, peak[..., None], axis=-1)[..., 0]
+
+###
+#   Function to draw one frame off-screen with the Agg canvas and return it as an
+#   (height, width, 3) uint8 RGB buffer. Does not touch pyplot, so it is safe to
+#   call from worker processes.
+###
+def render_3d_bar_frame(matrix, title, vmin, vmax, figsize=(8, 6), dpi=100):
+    dim = matrix.shape[0]
     x, y = np.meshgrid(np.arange(dim), np.arange(dim))
     x = x.flatten()
     y = y.flatten()
     dx = dy = 0.8
     z_base = np.zeros_like(x)
 
-    fig = plt.figure(figsize=(8, 6))
+    fig = Figure(figsize=figsize, dpi=dpi)
+    canvas = FigureCanvasAgg(fig)
     ax = fig.add_subplot(111, projection='3d')
 
-    norm = Normalize(vmin=min(np.min(m) for m in matrices),
-                     vmax=max(np.max(m) for m in matrices))
-    cmap = plt.get_cmap('viridis')
-
-    bars = None
-
-    def update(frame):
-        nonlocal bars
-        ax.clear()
-        dz = matrices[frame].flatten()
-        colors = cmap(norm(dz))
-        bars = ax.bar3d(x[::-1], y, z_base, dx, dy, dz, color=colors, shade=True)
-
-        ax.set_zlim(0, norm.vmax)
-
-        eta_range = max_eta - min_eta
-        eta_val = round(min_eta + frame*eta_range/len(matrices), 2)
-        ax.set_title(title + "\n" + r"$\eta$: " + f"{eta_val}")
-
-        labels_x, labels_y = [], []
-        for i in range(dim):
-            if i == 0:
-                labels_x.append(r"<$\overline{0}$|")
-                labels_y.append(r"|$\overline{0}$>")
-            elif i == dim-1:
-                labels_x.append(r"<$\overline{1}$|")
-                labels_y.append(r"|$\overline{1}$>")
-            else:
-                labels_x.append("")
-                labels_y.append("")
-
-        ax.set_xticks(np.arange(dim))
-        ax.set_yticks(np.arange(dim))
-        ax.set_xticklabels(labels_x[::-1])
-        ax.set_yticklabels(labels_y)
-
-        ax.view_init(elev=30, azim=60)
-
-    anim = FuncAnimation(fig, update, frames=len(matrices), interval=1000/fps)
-
-    # Save to file
-    if filename.endswith(".gif"):
-        anim.save(filename, writer=PillowWriter(fps=fps))
-    elif filename.endswith(".mp4"):
-        anim.save(filename, writer=FFMpegWriter(fps=fps))
-    else:
+    norm = Normalize(vmin=vmin, vmax=vmax)
+    cmap = matplotlib.colormaps['viridis']
+    dz = matrix.flatten()
+    colors = cmap(norm(dz))
+    ax.bar3d(x[::-1], y, z_base, dx, dy, dz, color=colors, shade=True)
+
+    ax.set_zlim(0, norm.vmax)
+    ax.set_title(title)
+
+    labels_x, labels_y = [], []
+    for i in range(dim):
+        if i == 0:
+            labels_x.append(r"<$\overline{0}$|")
+            labels_y.append(r"|$\overline{0}$>")
+        elif i == dim-1:
+            labels_x.append(r"<$\overline{1}$|")
+            labels_y.append(r"|$\overline{1}$>")
+        else:
+            labels_x.append("")
+            labels_y.append("")
+
+    ax.set_xticks(np.arange(dim))
+    ax.set_yticks(np.arange(dim))
+    ax.set_xticklabels(labels_x[::-1])
+    ax.set_yticklabels(labels_y)
+
+    ax.view_init(elev=30, azim=60)
+
+    canvas.draw()
+    return np.asarray(canvas.buffer_rgba())[..., :3].copy()
+
+def _render_frame_args(args):
+    return render_3d_bar_frame(*args)
+
+###
+#   Animated 3D bar plot of a sequence of matrices (e.g. a density matrix over an eta sweep).
+#
+#   Frames are drawn in a process pool (processes=None uses all cores) and streamed back
+#   in order: for .mp4 they are piped as raw RGB to ffmpeg, for .gif they are collected
+#   by Pillow. max_bars decimates large matrices before drawing, since the 3D bar count
+#   grows as 4^d. matrices may be any sequence of frames, including a lazy memory-mapped stack.
+###
+def plot_3d_bar_animation(matrices, title="Test", filename="test_animation.mp4", fps=2, min_eta=0, max_eta=1,
+                          processes=None, max_bars=None, figsize=(8, 6), dpi=100):
+    if not (filename.endswith(".gif") or filename.endswith(".mp4")):
         raise ValueError("Unsupported file type. Use '.gif' or '.mp4'")
 
-    plt.close(fig)
+    matrices = [decimate_matrix(m, max_bars) for m in matrices]
+    num_frames = len(matrices)
+    vmin = min(np.min(m) for m in matrices)
+    vmax = max(np.max(m) for m in matrices)
+
+    eta_range = max_eta - min_eta
+    tasks = []
+    for frame, matrix in enumerate(matrices):
+        eta_val = round(min_eta + frame*eta_range/num_frames, 2)
+        frame_title = title + "\n" + r"$\eta$: " + f"{eta_val}"
+        tasks.append((matrix, frame_title, vmin, vmax, figsize, dpi))
+
+    if processes is None:
+        processes = os.cpu_count()
+    if processes > 1:
+        pool = ProcessPoolExecutor(max_workers=processes)
+        frames = pool.map(_render_frame_args, tasks)
+    else:
+        pool = None
+        frames = map(_render_frame_args, tasks)
+
+    try:
+        if filename.endswith(".mp4"):
+            _encode_mp4(frames, filename, fps)
+        else:
+            _encode_gif(frames, filename, fps)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
     print(f"Animation saved to {filename}")
 
+def _encode_mp4(frames, filename, fps):
+    encoder = None
+    for frame in frames:
+        if encoder is None:
+            height, width, _ = frame.shape
+            command = [matplotlib.rcParams['animation.ffmpeg_path'], '-y',
+                       '-f', 'rawvideo', '-vcodec', 'rawvideo',
+                       '-s', f'{width}x{height}', '-pix_fmt', 'rgb24', '-r', str(fps),
+                       '-i', '-', '-vcodec', 'libx264', '-pix_fmt', 'yuv420p', filename]
+            encoder = subprocess.Popen(command, stdin=subprocess.PIPE,
+                                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        encoder.stdin.write(frame.tobytes())
+    if encoder is not None:
+        encoder.stdin.close()
+        if encoder.wait() != 0:
+            raise RuntimeError(f"ffmpeg failed to encode {filename}")
+
+def _encode_gif(frames, filename, fps):
+    from PIL import Image
+    images = [Image.fromarray(frame) for frame in frames]
+    images[0].save(filename, save_all=True, append_images=images[1:],
+                   duration=1000/fps, loop=0)
+
 if __name__ == '__main__':
     matrices = [np.random.rand(8, 8) * (i + 1) for i in range(30)]
     plot_3d_bar_animation(matrices, filename="animations/test_animation.gif", fps=10)
-
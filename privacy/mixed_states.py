@@ -16,6 +16,7 @@ import aux
 import plot_functions as pf
 import kraus_operators as ko
 import save_results as sr
+import rho_store as rs
 import animation
 
 # import plt_parameters
@@ -183,6 +184,41 @@ def H_and_M(d, operator='sigma_z', print_matrices:bool=False):
     return H, M
 
 
+def H_and_M_diagonal(d, print_matrices:bool=False):
+    
+    # Diagonal of sigma_z/2 on each qubit, with qubit 0 as the most significant bit
+    basis = np.arange(2**d)
+    
+    # Operators, stored as the vectors of their diagonals:
+    H = {}
+    for i in range(d):
+        H[i] = 0.5 * (-1.0)**((basis >> (d-1-i)) & 1)
+    
+    
+    M = {}
+    
+    for i in range(d-1):
+        M[i] = {}
+    
+    for i in range(d):
+        for j in range(i+1, d):
+            M[i][j] = H[i] - H[j]
+            # Printing:
+            if print_matrices:
+                print(f"diag(H{i+1}-H{j+1}) = \n{M[i][j]}")
+    
+    return H, M
+
+def diagonal_commutator(m, rho):
+    # [M, rho] for diagonal M = diag(m) is the elementwise product (m_i - m_j) * rho_ij
+    return (m[:, None] - m[None, :]) * rho
+
+def commutator_trace_norm(C):
+    # The commutator of two Hermitian matrices is anti-Hermitian, so iC is Hermitian
+    # and its singular values are the absolute values of its eigenvalues
+    return np.sum(np.abs(np.linalg.eigvalsh(1j * C)))
+
+
 def trace_norm(m):
     '''
     Parameters
@@ -235,7 +271,12 @@ def apply_noise(rho, d:int, K:list):
 
 def mixed_states(d:int, state:str, eta_values:list, alpha_values:list, plots_path:str, colours:dict, colourbar_limits:dict, flags:dict, noise_types:list, pause_between_plots:float=0.0, H_operator='sigma_z', dicke_n_ones=0):
     
-    H, M = H_and_M(d, operator=H_operator, print_matrices=False)
+    # sigma_z generators are diagonal, so they are kept as vectors for the commutators
+    diagonal = H_operator == 'sigma_z'
+    if diagonal:
+        h, m = H_and_M_diagonal(d)
+    if flags['plot_H_and_M'] or not diagonal:
+        H, M = H_and_M(d, operator=H_operator, print_matrices=False)
     
     if flags['plot_H_and_M']:
         for i in range(len(H)):
@@ -272,40 +313,33 @@ def mixed_states(d:int, state:str, eta_values:list, alpha_values:list, plots_pat
     for noise in noise_types:
         data[noise] = pd.DataFrame(columns = ['alpha', 'eta', 'epsilon'])
     
+    # Apply every requested noise type to the whole alpha x eta grid in one batched computation
+    rho_0_stack = np.array([density_matrix(state, d, alpha, dicke_n_ones=dicke_n_ones) for alpha in alpha_values])
+    noisy_rhos = {noise: ko.LocalNoiseChannel(noise).apply(rho_0_stack[:, None], d, eta_values)
+                  for noise in noise_types}
     
-    for alpha in alpha_values:
-        for eta in eta_values:
+    if flags['save_rho_store']:
+        # One binary stack for the whole grid, read back lazily by the animations
+        aux.check_dir(plots_path)
+        store = rs.DensityMatrixStore.create(plots_path + 'rho_store', d, [state], noise_types,
+                                             eta_values, alpha_values)
+        for noise in noise_types:
+            store.write_sweep(state, noise, noisy_rhos[noise])
+        store.flush()
+    
+    for alpha_idx, alpha in enumerate(alpha_values):
+        for eta_idx, eta in enumerate(eta_values):
             print('\ralpha:\t%.2f\t\teta:\t%.2f'%(alpha, eta), end='')
-            Kraus_operators = {'Amplitude Damping': ko.amplitude_damping_Kraus_operators(d, eta),
-                               'Depolarising Noise': ko.depolarising_Kraus_operators(d, eta),
-                               'Phase Damping': ko.phase_damping_Kraus_operators(d, eta),
-                               'Dephasing Noise': ko.dephasing_Kraus_operators(d, eta),
-                               }
             
             for noise in noise_types:
                 
                 path = plots_path + noise + os.sep
                 
-                K = Kraus_operators[noise]
-                
                 # rho_GHZ = density_matrix('GHZ', d)
                 # rho_plus = density_matrix('plus', d)
                 # rho_0 = (1-alpha) * rho_GHZ + alpha * rho_plus
                 
-                rho_0 = density_matrix(state, d, alpha, dicke_n_ones=dicke_n_ones)
-                
-                rho_with_noise = apply_noise(rho_0, d, K)
-                
-                if flags['save_rho_csv']:
-                    aux.check_dir(plots_path)
-                    sr.save_matrix(m = rho_with_noise,
-                                   d = d,
-                                   eta = eta,
-                                   alpha = alpha,
-                                   filename = 'rho_eta=%.2f_alpha=%.2f'%(eta, alpha),
-                                   path = path + 'rho_txt',
-                                   noise = noise)
-                
+                rho_with_noise = noisy_rhos[noise][alpha_idx, eta_idx]
                 
                 if flags['plot_rho']:
                     pf.plot_matrix(np.real(rho_with_noise),
@@ -336,11 +370,17 @@ def mixed_states(d:int, state:str, eta_values:list, alpha_values:list, plots_pat
                 
                 # norms = []
                 trace_norms = []
-                for i in M.keys():
-                    for j in M[i].keys():
-                        C[i][j] = np.matmul(M[i][j], rho_with_noise) - np.matmul(rho_with_noise, M[i][j])
-                        # norms.append(np.linalg.norm(C[i][j], 1))
-                        trace_norms.append(trace_norm(C[i][j]))
+                if diagonal:
+                    for i in m.keys():
+                        for j in m[i].keys():
+                            C[i][j] = diagonal_commutator(m[i][j], rho_with_noise)
+                            trace_norms.append(commutator_trace_norm(C[i][j]))
+                else:
+                    for i in M.keys():
+                        for j in M[i].keys():
+                            C[i][j] = np.matmul(M[i][j], rho_with_noise) - np.matmul(rho_with_noise, M[i][j])
+                            # norms.append(np.linalg.norm(C[i][j], 1))
+                            trace_norms.append(trace_norm(C[i][j]))
                 
                 print('\ntrace norms:', trace_norms)
                 # epsilon = max(norms)
@@ -457,7 +497,7 @@ if __name__=='__main__':
              
              'plot_rho': 0,
              'save_rho': 1,
-             'save_rho_csv': 0, # rho in TXT
+             'save_rho_store': 0, # rho stack in NPY
              
              'plot_C': 1,
              'save_C': 1,
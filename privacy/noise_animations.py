@@ -5,15 +5,12 @@ from plot_bar3D import plot_3d_bar
 from kraus_operators import *
 from matrix_animation import plot_3d_bar_animation
 import numpy as np
-import scipy.linalg as sci
+from fidelity import calculate_fidelity
+from rho_store import DensityMatrixStore
 
 from squidasm.run.stack.run import run # type: ignore
 from squidasm.sim.stack.common import LogManager # type: ignore
 
-def calculate_fidelity(ideal_state: np.ndarray, noisy_state: np.ndarray):
-    fidelity = np.trace(np.abs(sci.sqrtm(ideal_state).dot(sci.sqrtm(noisy_state))))
-    return fidelity
-
 if __name__ == '__main__':
     num_nodes = 4
     ntest = 3
@@ -21,73 +18,74 @@ if __name__ == '__main__':
     #print(f"Total copies: {ntotal}")
     num_iters = 1
     state = "ghz"
+    network = "perfect"
 
-    # Initialize programs
-    programs, node_names = init_sensing_programs(num_nodes, ntest, send_state=True)
+    datapoints = 32
+    min_eta = 0
+    max_eta = 1
+    eta_list = np.linspace(min_eta, max_eta, datapoints)
+    noise_types = ['Amplitude Damping', 'Phase Damping', 'Depolarising Noise', 'Dephasing Noise']
 
-    # Configure network
-    network_cfg = configure_perfect_network(node_names)
-    """ network_cfg = configure_network(node_names,
-                                    use_high_fidelity=False,
-                                    use_optimistic=False) """
-    
-    # Logging
-    LogManager.set_log_level("WARNING")
-    # Disable logging to terminal
-    logger = LogManager.get_stack_logger()
-    logger.handlers = []
-    # Enable logging to file
-    LogManager.log_to_file(f"logs/info_{state}.log")
+    # Noisy density matrices are kept in a binary store, so the simulation and the
+    # noise channels only run once for a given state, number of nodes, network, run
+    # parameters, noise types and eta grid. Incomplete stores are recomputed.
+    run_parameters = {'network': network, 'ntest': ntest, 'num_iters': num_iters}
+    store_path = f"data/rho_store_{state}_{network}_n{num_nodes}"
+    store = None
+    if DensityMatrixStore.exists(store_path):
+        store = DensityMatrixStore.open(store_path)
+        if (store.metadata != run_parameters or store.noise_types != noise_types
+                or len(store.eta_values) != datapoints or not np.allclose(store.eta_values, eta_list)
+                or not store.complete()):
+            store = None
 
-    ### Run simulation ###
+    if store is None:
+        # Initialize programs
+        programs, node_names = init_sensing_programs(num_nodes, ntest, send_state=True)
 
-    plus_outcomes = 0
-    for k in range(num_iters):
-        results = run(
-            config=network_cfg,
-            programs=programs,
-            num_times=1
-        )
+        # Configure network
+        if network == "perfect":
+            network_cfg = configure_perfect_network(node_names)
+        elif network == "optimhf":
+            network_cfg = configure_network(node_names, use_high_fidelity=True, use_optimistic=True)
+        else:
+            raise ValueError("Network must be 'perfect' or 'optimhf'.")
+        
+        # Logging
+        LogManager.set_log_level("WARNING")
+        # Disable logging to terminal
+        logger = LogManager.get_stack_logger()
+        logger.handlers = []
+        # Enable logging to file
+        LogManager.log_to_file(f"logs/info_{state}.log")
 
-    rho = results[-1][0]['full state']
-    #print(rho)
+        ### Run simulation ###
 
-    ### Apply nosie operators and generate density matrices
+        plus_outcomes = 0
+        for k in range(num_iters):
+            results = run(
+                config=network_cfg,
+                programs=programs,
+                num_times=1
+            )
 
-    datapoints = 32
-    min_eta = 0
-    max_eta = 1
-    eta_list = np.linspace(min_eta, max_eta, datapoints)
+        rho = results[-1][0]['full state']
+        #print(rho)
 
-    amp_dam_mats = []
-    phase_dam_mats = []
-    dep_noise_mats = []
-    deph_noise_mats = []
+        ### Apply noise operators and store the density matrices
 
-    # Amplitude damping
-    for eta in eta_list:
-        K_amp_dam = amplitude_damping_Kraus_operators(num_nodes, eta)
-        #print(len(K_amp_dam))
-        noisy_rho = apply_noise(rho, num_nodes, K_amp_dam)
-        amp_dam_mats.append(np.real(noisy_rho))
+        store = DensityMatrixStore.create(store_path, num_nodes, [state], noise_types, eta_list,
+                                          metadata=run_parameters)
+        for noise in noise_types:
+            # Shape (1, datapoints, 2^d, 2^d): a single alpha value
+            store.write_sweep(state, noise, LocalNoiseChannel(noise).apply(rho, num_nodes, eta_list)[None])
+        store.flush()
 
-    # Phase damping
-    """ for eta in eta_list:
-        K_phase_dam = phase_damping_Kraus_operators(num_nodes, eta)
-        noisy_rho = apply_noise(rho, num_nodes, K_phase_dam)
-        phase_dam_mats.append(np.real(noisy_rho)) """
-    
-    # Depolarising noise
-    """ for eta in eta_list:
-        K_dep_noise = depolarising_Kraus_operators(num_nodes, eta)
-        noisy_rho = apply_noise(rho, num_nodes, K_dep_noise)
-        dep_noise_mats.append(np.real(noisy_rho)) """
-    
-    # Dephasing noise
-    """ for eta in eta_list:
-        K_deph_noise = dephasing_Kraus_operators(num_nodes, eta)
-        noisy_rho = apply_noise(rho, num_nodes, K_deph_noise)
-        deph_noise_mats.append(np.real(noisy_rho)) """
+    # Lazy views of the real parts: frames are only read from disk when plotted
+    amp_dam_mats = store.frames(state, 'Amplitude Damping').real
+    phase_dam_mats = store.frames(state, 'Phase Damping').real
+    dep_noise_mats = store.frames(state, 'Depolarising Noise').real
+    deph_noise_mats = store.frames(state, 'Dephasing Noise').real
 
     ### Generate animation
     
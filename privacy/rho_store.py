@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Binary store for stacks of noisy density matrices.
+
+A store is a directory holding
+    header.json  - metadata: d, states, noise types, eta and alpha values, dtype,
+                   and the parameters of the run that produced the matrices
+    rho.npy      - memory-mapped stack of shape (state, noise, eta, alpha, 2^d, 2^d)
+    written.npy  - memory-mapped mask of the frames that have been written
+The stack is preallocated once, so writes go straight into the open memory map
+without reopening files, and readers slice single frames (or an eta sweep for
+an animation) out of the file lazily.
+"""
+
+import os
+import json
+import numpy as np
+
+
+class DensityMatrixStore:
+    '''
+    Density matrices indexed by (state, noise, eta, alpha).
+    Use DensityMatrixStore.create to allocate a new store and
+    DensityMatrixStore.open to read (or complete) an existing one.
+    '''
+
+    def __init__(self, path:str, header:dict, mode:str='r'):
+        self.path = path
+        self.header = header
+        self.d = header['d']
+        self.states = list(header['states'])
+        self.noise_types = list(header['noise_types'])
+        self.eta_values = np.array(header['eta_values'])
+        self.alpha_values = np.array(header['alpha_values'])
+        self.metadata = header.get('metadata', {})
+        self.rho = np.load(os.path.join(path, 'rho.npy'), mmap_mode=mode)
+        self.written = np.load(os.path.join(path, 'written.npy'), mmap_mode=mode)
+
+    @classmethod
+    def create(cls, path:str, d:int, states:list, noise_types:list, eta_values, alpha_values=(0,),
+               dtype=complex, metadata:dict=None):
+        '''
+        Allocates a new store, overwriting any store at path.
+
+        Parameters
+        ----------
+        path : str
+            Directory of the store.
+        d : int
+            Number of qubits.
+        states, noise_types : list
+            Labels of the first two axes.
+        eta_values, alpha_values : list
+            Values of the last two axes.
+        dtype : numpy dtype
+            Element type of the stack (complex by default, float to keep only Re(rho)).
+        metadata : dict
+            JSON-serialisable parameters of the run that produced the matrices, such as
+            the network, so that readers can tell whether the store matches their run.
+        '''
+        os.makedirs(path, exist_ok=True)
+        header = {'d': int(d),
+                  'states': list(states),
+                  'noise_types': list(noise_types),
+                  'eta_values': [float(eta) for eta in eta_values],
+                  'alpha_values': [float(alpha) for alpha in alpha_values],
+                  'dtype': np.dtype(dtype).str,
+                  'metadata': dict(metadata or {})}
+        shape = (len(states), len(noise_types), len(eta_values), len(alpha_values))
+        rho = np.lib.format.open_memmap(os.path.join(path, 'rho.npy'), mode='w+',
+                                        dtype=dtype, shape=shape + (2**d, 2**d))
+        written = np.lib.format.open_memmap(os.path.join(path, 'written.npy'), mode='w+',
+                                            dtype=bool, shape=shape)
+        del rho, written
+        # The header goes last, so a store with a header always has its arrays
+        with open(os.path.join(path, 'header.json'), 'w') as f:
+            json.dump(header, f, indent=4)
+        return cls(path, header, mode='r+')
+
+    @classmethod
+    def open(cls, path:str, mode:str='r'):
+        '''
+        Opens an existing store read-only (mode='r') or for writing (mode='r+').
+        '''
+        with open(os.path.join(path, 'header.json'), 'r') as f:
+            header = json.load(f)
+        return cls(path, header, mode)
+
+    @staticmethod
+    def exists(path:str):
+        return os.path.exists(os.path.join(path, 'header.json'))
+
+    def _value_index(self, values, value:float, name:str):
+        idx = np.flatnonzero(np.isclose(values, value))
+        if len(idx) == 0:
+            raise KeyError('%s=%s is not in the store.'%(name, value))
+        return int(idx[0])
+
+    def index(self, state:str, noise:str, eta:float=None, alpha:float=None):
+        '''
+        Returns the index tuple of (state, noise[, eta[, alpha]]).
+        '''
+        idx = (self.states.index(state), self.noise_types.index(noise))
+        if eta is not None:
+            idx += (self._value_index(self.eta_values, eta, 'eta'),)
+            if alpha is not None:
+                idx += (self._value_index(self.alpha_values, alpha, 'alpha'),)
+        return idx
+
+    def write(self, state:str, noise:str, eta:float, alpha:float, rho):
+        '''
+        Writes a single density matrix.
+        '''
+        idx = self.index(state, noise, eta, alpha)
+        self.rho[idx] = rho
+        self.written[idx] = True
+
+    def write_sweep(self, state:str, noise:str, rhos):
+        '''
+        Writes the whole alpha x eta grid for one state and noise type, with rhos
+        of shape (n_alpha, n_eta, 2^d, 2^d) as returned by LocalNoiseChannel.apply
+        on a stack of initial states.
+        '''
+        idx = self.index(state, noise)
+        self.rho[idx] = np.swapaxes(np.asarray(rhos), 0, 1)
+        self.written[idx] = True
+
+    def frame(self, state:str, noise:str, eta:float, alpha:float=0):
+        '''
+        Lazy view of a single density matrix.
+        '''
+        idx = self.index(state, noise, eta, alpha)
+        if not self.written[idx]:
+            raise KeyError('Frame %s has not been written.'%(idx,))
+        return self.rho[idx]
+
+    def frames(self, state:str, noise:str, alpha:float=0):
+        '''
+        Lazy view of the eta sweep for one state, noise type and alpha, of shape
+        (n_eta, 2^d, 2^d). Frames are only read from disk when accessed.
+        '''
+        s, n = self.index(state, noise)
+        a = self._value_index(self.alpha_values, alpha, 'alpha')
+        missing = np.flatnonzero(~self.written[s, n, :, a])
+        if len(missing) > 0:
+            raise KeyError('Frames at eta=%s have not been written.'%([float(eta) for eta in self.eta_values[missing]],))
+        return self.rho[s, n, :, a]
+
+    def complete(self):
+        '''
+        True when every frame of the store has been written.
+        '''
+        return bool(np.all(self.written))
+
+    def flush(self):
+        if isinstance(self.rho, np.memmap):
+            self.rho.flush()
+            self.written.flush()
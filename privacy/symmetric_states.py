@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Permutation-invariant representation of d-qubit density matrices.
+
+The states in mixed_states.density_matrix that are symmetric under permutations
+of the qubits (GHZ, plus, minus, W, Dicke and the GHZ/plus mixture) stay
+permutation-invariant under i.i.d. local noise, so they never need the full
+2^d x 2^d matrix. A permutation-invariant operator is fixed by one coefficient
+per type n = (n00, n01, n10, n11), the number of tensor factors equal to
+|0><0|, |0><1|, |1><0| and |1><1|:
+
+    rho = sum_n f_n * (sum of all tensor products of type n)
+
+which gives (d+1)(d+2)(d+3)/6 coefficients instead of 4^d. They are stored as
+the homogeneous polynomial P(y) = sum_n f_n * multinomial(d; n) * y^n in the four
+variables y00, y01, y10, y11, in an array indexed by [n01, n10, n11] (n00 is
+implied by the degree).
+
+A local channel with superoperator S maps P(y) to P(S^T y). Matrix elements in
+the Schur-Weyl (collective spin) basis are read off with the apolar pairing,
+under which a singlet pair |01> - |10> corresponds to the differential operator
+d/dy00 d/dy11 - d/dy01 d/dy10. This gives the spin-j blocks of rho, and of rho
+restricted to two chosen qubits times the remaining d-2, in O(d^4) operations.
+"""
+
+import numpy as np
+from scipy.special import comb, gammaln
+
+import kraus_operators as ko
+
+# Position of |a><b| in the row-major vectorisation of a 2x2 matrix
+Y00, Y01, Y10, Y11 = range(4)
+
+
+def _type_grid(q:int):
+    '''
+    Exponent arrays (n00, n01, n10, n11) for a coefficient array of degree q,
+    and the mask of valid types (n01 + n10 + n11 <= q).
+    '''
+    n01, n10, n11 = np.meshgrid(np.arange(q+1), np.arange(q+1), np.arange(q+1), indexing='ij')
+    n00 = q - n01 - n10 - n11
+    return n00, n01, n10, n11, n00 >= 0
+
+
+def _log_multinomial(q:int, n00, n01, n10, n11):
+    return gammaln(q+1) - gammaln(n00+1) - gammaln(n01+1) - gammaln(n10+1) - gammaln(n11+1)
+
+
+def multiplicity(n:int, p:int):
+    '''
+    Number of copies of the spin j = n/2 - p irrep in n qubits, i.e. the number
+    of ways to pair up p singlets in the Schur-Weyl decomposition.
+    '''
+    return comb(n, p, exact=True) - (comb(n, p-1, exact=True) if p > 0 else 0)
+
+
+def dicke_amplitudes(state:str, d:int, dicke_n_ones:int=0):
+    '''
+    Parameters
+    ----------
+    state : str
+        Permutation-symmetric pure state: 'GHZ', 'plus', 'minus', 'plus_and_minus',
+        'W' or 'Dicke'.
+    d : int
+        Number of qubits.
+    dicke_n_ones : int
+        Number of excitations of the Dicke state.
+
+    Returns
+    -------
+    a : Numpy array
+        Normalised amplitudes on the Dicke states |D_0>, ..., |D_d>, where |D_k>
+        is the uniform superposition of all basis states with k ones.
+    '''
+    k = np.arange(d+1)
+    if state == 'GHZ':
+        a = np.zeros(d+1)
+        a[0] = a[-1] = 1
+    elif state == 'plus':
+        a = np.sqrt(comb(d, k))
+    elif state == 'minus':
+        a = (-1.0)**k * np.sqrt(comb(d, k))
+    elif state == 'plus_and_minus':
+        a = (1 + (-1.0)**k) * np.sqrt(comb(d, k))
+    elif state == 'W':
+        a = np.zeros(d+1)
+        a[1] = 1
+    elif state == 'Dicke':
+        a = np.zeros(d+1)
+        a[dicke_n_ones] = 1
+    else:
+        raise ValueError('State "%s" is not permutation-symmetric or not implemented.'%state)
+    return a / np.linalg.norm(a)
+
+
+def _binomial_power(c0, c1, n:int):
+    # Coefficients of (c0 + c1 t)^n in increasing powers of t
+    u = np.arange(n+1)
+    return comb(n, u) * np.power(complex(c0), n-u) * np.power(complex(c1), u)
+
+
+def _pair_substitution(coeffs, M):
+    '''
+    Substitutes (ya, yb) -> (M[0,0] ya + M[0,1] yb, M[1,0] ya + M[1,1] yb) in the
+    binary form sum_i coeffs[i] ya^(r-i) yb^i.
+    '''
+    r = len(coeffs) - 1
+    T = np.empty((r+1, r+1), dtype=complex)
+    for i in range(r+1):
+        T[:, i] = np.convolve(_binomial_power(M[0][0], M[0][1], r-i),
+                              _binomial_power(M[1][0], M[1][1], i))
+    return T @ coeffs
+
+
+def _partial(A, q:int, a:int):
+    '''
+    Derivative d/dy_a of a degree q coefficient array, returned with degree q-1.
+    '''
+    n00, n01, n10, n11, valid = _type_grid(q-1)
+    if a == Y00:
+        B = (n00 + 1) * A[:q, :q, :q]
+    elif a == Y01:
+        B = (n01 + 1) * A[1:, :q, :q]
+    elif a == Y10:
+        B = (n10 + 1) * A[:q, 1:, :q]
+    else:
+        B = (n11 + 1) * A[:q, :q, 1:]
+    return np.where(valid, B, 0)
+
+
+def _singlet_contraction(A, q:int):
+    '''
+    Contracts one singlet pair out of a degree q coefficient array with the
+    operator (d/dy00 d/dy11 - d/dy01 d/dy10) / (q (q-1)), returning degree q-2.
+    '''
+    n00, n01, n10, n11, valid = _type_grid(q-2)
+    B = (n00 + 1) * (n11 + 1) * A[:q-1, :q-1, 1:q] - (n01 + 1) * (n10 + 1) * A[1:q, 1:q, :q-1]
+    return np.where(valid, B, 0) / (q * (q-1))
+
+
+def _dicke_block(A, q:int):
+    '''
+    Matrix <D_k| . |D_l> on the symmetric subspace of q qubits, for a degree q
+    coefficient array normalised as in _singlet_contraction.
+    '''
+    block = np.zeros((q+1, q+1), dtype=complex)
+    for n11 in range(q+1):
+        k = np.arange(n11, q+1)
+        # n10 = k - n11, n01 = l - n11, n00 = q - k - l + n11 >= 0
+        n10, n01 = np.meshgrid(k - n11, k - n11, indexing='ij')
+        valid = n10 + n01 + n11 <= q
+        block[n11:, n11:] += np.where(valid, A[n01, n10, n11], 0)
+    norm = np.sqrt(comb(q, np.arange(q+1)))
+    return block / np.outer(norm, norm)
+
+
+class SymmetricState:
+    '''
+    Permutation-invariant density matrix of d qubits, stored through its type
+    coefficients (see module docstring). Supports the same local channels as
+    kraus_operators.LocalNoiseChannel, fidelities with symmetric pure states and
+    the trace norm of [H_i - H_j, rho] for sigma_z generators.
+    '''
+
+    def __init__(self, d:int, coeffs):
+        self.d = d
+        self.coeffs = np.asarray(coeffs, dtype=complex)
+
+    @classmethod
+    def from_amplitudes(cls, a):
+        '''
+        Pure state sum_k a_k |D_k> given by its Dicke amplitudes.
+        '''
+        a = np.asarray(a)
+        d = len(a) - 1
+        n00, n01, n10, n11, valid = _type_grid(d)
+        k = np.minimum(n10 + n11, d)
+        l = np.minimum(n01 + n11, d)
+        log_c = _log_multinomial(d, np.maximum(n00, 0), n01, n10, n11) \
+            - 0.5*np.log(comb(d, k)) - 0.5*np.log(comb(d, l))
+        coeffs = np.where(valid, a[k] * np.conj(a[l]) * np.exp(np.where(valid, log_c, 0)), 0)
+        return cls(d, coeffs)
+
+    @classmethod
+    def from_state(cls, state:str, d:int, alpha:float=0, dicke_n_ones:int=0):
+        '''
+        Same states and arguments as mixed_states.density_matrix, restricted to
+        the permutation-symmetric ones.
+        '''
+        if state == 'GHZplus':
+            rho_GHZ = cls.from_state('GHZ', d)
+            rho_plus = cls.from_state('plus', d)
+            return cls(d, (1-alpha) * rho_GHZ.coeffs + alpha * rho_plus.coeffs)
+        return cls.from_amplitudes(dicke_amplitudes(state, d, dicke_n_ones))
+
+    def apply_noise(self, noise:str, eta:float):
+        '''
+        Applies the single-qubit channel (noise, eta) to every qubit.
+
+        Returns
+        -------
+        SymmetricState
+            Noisy state; self is left unchanged.
+        '''
+        S = ko.single_qubit_superoperator(noise, float(eta))
+        if np.any(np.abs(S[np.ix_([Y00, Y11], [Y01, Y10])]) > 1e-14) or \
+           np.any(np.abs(S[np.ix_([Y01, Y10], [Y00, Y11])]) > 1e-14):
+            raise ValueError('Noise type "%s" mixes populations and coherences.'%noise)
+        L = S.T
+        d = self.d
+        A = self.coeffs.copy()
+        for n01 in range(d+1):
+            for n10 in range(d+1-n01):
+                # Binary form in (y00, y11) with exponent n11 along the last axis
+                r = d - n01 - n10
+                A[n01, n10, :r+1] = _pair_substitution(
+                    A[n01, n10, :r+1], [[L[Y00, Y00], L[Y00, Y11]], [L[Y11, Y00], L[Y11, Y11]]])
+        for n11 in range(d+1):
+            for s in range(d+1-n11):
+                # Binary form in (y10, y01) with exponent n01
+                n01 = np.arange(s+1)
+                A[n01, s-n01, n11] = _pair_substitution(
+                    A[n01, s-n01, n11], [[L[Y10, Y10], L[Y10, Y01]], [L[Y01, Y10], L[Y01, Y01]]])
+        return SymmetricState(d, A)
+
+    def spin_blocks(self):
+        '''
+        Schur-Weyl decomposition rho = sum_p rho_p (x) 1_{m_p}, with rho_p acting
+        on the spin j = d/2 - p irrep and m_p = multiplicity(d, p).
+
+        Returns
+        -------
+        blocks : list
+            Matrices rho_p in the |j, m> basis, for p = 0, ..., d//2.
+        '''
+        blocks = []
+        A, q = self.coeffs, self.d
+        while q >= 0:
+            blocks.append(_dicke_block(A, q))
+            if q < 2:
+                break
+            A = _singlet_contraction(A, q)
+            q -= 2
+        return blocks
+
+    def symmetric_block(self):
+        '''
+        Matrix <D_k|rho|D_l> on the symmetric subspace.
+        '''
+        return _dicke_block(self.coeffs, self.d)
+
+    def trace(self):
+        return float(np.real(sum(multiplicity(self.d, p) * np.trace(block)
+                                 for p, block in enumerate(self.spin_blocks()))))
+
+    def fidelity(self, a):
+        '''
+        Fidelity <psi|rho|psi> with the pure symmetric state |psi> = sum_k a_k |D_k>.
+        '''
+        a = np.asarray(a)
+        return float(np.real(np.conj(a) @ self.symmetric_block() @ a))
+
+    def pair_blocks(self):
+        '''
+        Blocks of rho with qubits 0 and 1 kept explicit and the remaining d-2 qubits
+        decomposed into spin irreps: rho = sum_p R_p (x) 1_{m_p}, m_p = multiplicity(d-2, p).
+
+        Returns
+        -------
+        blocks : list
+            Matrices R_p of size 4(q+1), q = d-2-2p, indexed by (x, k) with x the
+            two-qubit basis state (qubit 0 most significant) and k the Dicke index.
+        '''
+        d = self.d
+        if d < 2:
+            raise ValueError('At least two qubits are needed.')
+        q0 = d - 2
+        # Contract qubits 0 and 1: <x|.|x'> picks y_(x0 x0') y_(x1 x1')
+        contracted = {}
+        for a in range(4):
+            for b in range(a, 4):
+                A = _partial(_partial(self.coeffs, d, a), d-1, b) / (d * (d-1))
+                contracted[a, b] = contracted[b, a] = A
+        blocks = []
+        q = q0
+        while q >= 0:
+            R = np.zeros((4, q+1, 4, q+1), dtype=complex)
+            for x in range(4):
+                for xp in range(4):
+                    a = 2*(x >> 1) + (xp >> 1)
+                    b = 2*(x & 1) + (xp & 1)
+                    R[x, :, xp, :] = _dicke_block(contracted[a, b], q)
+            blocks.append(R.reshape(4*(q+1), 4*(q+1)))
+            if q < 2:
+                break
+            contracted = {key: _singlet_contraction(A, q) for key, A in contracted.items()}
+            q -= 2
+        return blocks
+
+    def epsilon(self, operator:str='sigma_z'):
+        '''
+        Trace norm of [H_i - H_j, rho] with H_i = sigma_z/2 on qubit i. All pairs
+        (i, j) give the same value for a permutation-invariant rho, so this equals
+        calc_epsilon_sim.calc_epsilon (the maximum over pairs).
+        '''
+        if operator != 'sigma_z':
+            raise ValueError('Operator "%s" not implemented for symmetric states.'%operator)
+        # diag(H_0 - H_1) on the two explicit qubits: |00>, |01>, |10>, |11>
+        m2 = np.array([0, 1, -1, 0])
+        epsilon = 0
+        for p, R in enumerate(self.pair_blocks()):
+            m = np.repeat(m2, len(R) // 4)
+            C = (m[:, None] - m[None, :]) * R
+            epsilon += multiplicity(self.d - 2, p) * np.sum(np.abs(np.linalg.eigvalsh(1j * C)))
+        return float(epsilon)
+
+    def to_dense(self):
+        '''
+        Full 2^d x 2^d density matrix, only meant for checks at small d.
+        '''
+        d = self.d
+        basis = np.arange(2**d)
+        bits = (basis[:, None] >> np.arange(d-1, -1, -1)) & 1
+        row = bits[:, None, :]
+        col = bits[None, :, :]
+        n01 = np.sum((row == 0) & (col == 1), axis=-1)
+        n10 = np.sum((row == 1) & (col == 0), axis=-1)
+        n11 = np.sum((row == 1) & (col == 1), axis=-1)
+        n00 = d - n01 - n10 - n11
+        return self.coeffs[n01, n10, n11] / np.exp(_log_multinomial(d, n00, n01, n10, n11))
+
+
+if __name__ == '__main__':
+
+    noise_types = ['Amplitude Damping', 'Depolarising Noise', 'Phase Damping', 'Dephasing Noise']
+    eta_values = np.linspace(0, 1, 5)
+
+    for d in [20, 50]:
+        for state in ['GHZ', 'W', 'plus']:
+            a = dicke_amplitudes(state, d)
+            rho_0 = SymmetricState.from_amplitudes(a)
+            for noise in noise_types:
+                for eta in eta_values:
+                    rho = rho_0.apply_noise(noise, eta)
+                    print(f"d={d} {state} {noise} eta={eta:.2f}: "
+                          f"fidelity={rho.fidelity(a):.6f}, epsilon={rho.epsilon():.6f}")
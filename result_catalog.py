@@ -0,0 +1,226 @@
+import os
+import re
+import ast
+import sys
+import json
+import sqlite3
+
+###
+#   Catalog of the simulation results stored in the data/ directories of every sub-directory.
+#
+#   Each result file is indexed by the parameters found in its "# parameters:" header and
+#   in its path (e.g. new_verif/data/t05/400_iters/sim1.txt, *_optim_highfid_(10)_thresh01,
+#   ntest_variation_f950.txt, seeded/100_iteration_sim_t15_7200.txt), in a small SQLite
+#   database at the top of the repository. Rebuilding only reparses files whose size or
+#   modification time changed since the last scan, so checking whether a parameter point
+#   has already been simulated is a single query:
+#
+#       python result_catalog.py network=optimhf ntest=10 threshold=0.1
+###
+CATALOG_FILENAME = ".result_catalog.sqlite"
+KEYS = ["num_nodes", "ntest", "copies", "threshold", "network", "seed", "link_fidelity", "num_iters"]
+RESULT_EXTENSIONS = (".txt", ".npcol")
+
+# Network parameter sets as they appear in file names, and their canonical names
+NETWORK_NAMES = [("current_highfid", "current_highfid"), ("optim_highfid", "optimhf"),
+                 ("optimhf", "optimhf"), ("perfect", "perfect"), ("optim", "optim"),
+                 ("current", "current")]
+
+# Header parameter names that map onto the catalog keys
+HEADER_ALIASES = {"num_nodes": "num_nodes", "ntest": "ntest", "copies": "copies",
+                  "failure_threshold": "threshold", "failure threshold": "threshold",
+                  "threshold": "threshold", "seed": "seed", "link_fidelity": "link_fidelity",
+                  "num_iters": "num_iters"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER,
+    size INTEGER,
+    num_nodes INTEGER,
+    ntest INTEGER,
+    copies INTEGER,
+    threshold REAL,
+    network TEXT,
+    seed INTEGER,
+    link_fidelity REAL,
+    num_iters INTEGER,
+    parameters TEXT
+);
+CREATE INDEX IF NOT EXISTS results_point ON results (num_nodes, ntest, threshold, network, seed);
+"""
+
+###
+#   Function to parse the "# parameters:" comment block of a text result file.
+###
+def read_header_parameters(filename: str):
+    parameters = {}
+    if filename.endswith(".npcol"):
+        with open(filename, 'rb') as f:
+            f.read(6)
+            header_len = int.from_bytes(f.read(4), 'little')
+            return json.loads(f.read(header_len).decode('utf-8')).get("parameters", {})
+    with open(filename, 'r', errors='replace') as f:
+        in_parameters = False
+        for line in f:
+            if not line.startswith('#'):
+                break
+            content = line[1:].strip()
+            if content.lower().startswith('parameters:'):
+                in_parameters = True
+                continue
+            if content.lower().startswith('columns:'):
+                break
+            if not in_parameters:
+                continue
+            for token in re.split(r',\s*(?=[A-Za-z_][\w\s]*=)', content):
+                if '=' not in token:
+                    continue
+                key, value = token.split('=', 1)
+                try:
+                    parameters[key.strip()] = ast.literal_eval(value.strip())
+                except (ValueError, SyntaxError):
+                    parameters[key.strip()] = value.strip()
+    return parameters
+
+###
+#   Function to read catalog keys from a relative path.
+#   Seeds are only read from explicit markers: seed<N>, a s<N>_ prefix, or a trailing _<N>
+#   in a seeded/ directory. Other trailing numbers are usually iteration counts.
+###
+def parameters_from_path(path: str):
+    found = {}
+    parts = path.replace(os.sep, '/').split('/')
+    seeded = "seeded" in parts[:-1]
+    for part in parts:
+        name = os.path.splitext(part)[0]
+        match = re.fullmatch(r"t(\d+)", name) or re.search(r"_t(\d+)(?:_|$)", name)
+        if match:
+            found["threshold"] = float("0." + match.group(1))
+        match = re.search(r"thresh(\d)(\d+)", name)
+        if match:
+            found["threshold"] = float(f"{match.group(1)}.{match.group(2)}")
+        match = re.search(r"(?:^|_)f(\d{3})(?:_|$)", name)
+        if match:
+            found["link_fidelity"] = int(match.group(1)) / 1000
+        match = re.search(r"^(\d+)_iter", name) or re.search(r"_x(\d+)(?:_|$)", name)
+        if match:
+            found["num_iters"] = int(match.group(1))
+        match = re.search(r"_iters_\w+?_\((\d+)\)", name)
+        if match:
+            found["ntest"] = int(match.group(1))
+        match = (re.search(r"(?:^|_)seed_?(\d+)(?:_|$)", name) or re.fullmatch(r"s(\d+)_.*", name)
+                 or (seeded and re.search(r"_(\d+)$", name)))
+        if match:
+            found["seed"] = int(match.group(1))
+        for label, network in NETWORK_NAMES:
+            if re.search(rf"(?:^|_){label}(?:_|$)", name):
+                found["network"] = network
+                break
+    return found
+
+###
+#   Function to combine path and header parameters into one catalog row.
+#   Path values take precedence, e.g. the 400_iters directory of a run over its total_iters.
+###
+def catalog_entry(root: str, path: str):
+    full_path = os.path.join(root, path)
+    header = read_header_parameters(full_path)
+    entry = {}
+    for key, value in header.items():
+        if key in HEADER_ALIASES and isinstance(value, (int, float)):
+            entry[HEADER_ALIASES[key]] = value
+    entry.update(parameters_from_path(path))
+    return entry, header
+
+
+class ResultCatalog:
+    def __init__(self, root: str=None, db_filename: str=None):
+        self.root = root if root is not None else os.path.dirname(os.path.abspath(__file__))
+        if db_filename is None:
+            db_filename = os.path.join(self.root, CATALOG_FILENAME)
+        self.connection = sqlite3.connect(db_filename)
+        self.connection.executescript(_SCHEMA)
+
+    # Relative paths of all result files inside data/ directories
+    def _result_files(self):
+        for directory, dirs, files in os.walk(self.root):
+            dirs[:] = [d for d in dirs if not d.startswith('.') and d != "squidasm"
+                       and not d.endswith(".shards")]
+            relative = os.path.relpath(directory, self.root)
+            if "data" not in relative.split(os.sep):
+                continue
+            for name in files:
+                if name.endswith(RESULT_EXTENSIONS) and not name.startswith('.'):
+                    yield os.path.join(relative, name)
+
+    ###
+    #   Scans the tree and reparses only new or modified files. Entries of deleted files
+    #   are removed. Returns the number of (re)parsed files.
+    ###
+    def update(self):
+        known = {path: (mtime, size) for path, mtime, size in
+                 self.connection.execute("SELECT path, mtime_ns, size FROM results")}
+        seen = set()
+        parsed = 0
+        for path in self._result_files():
+            seen.add(path)
+            stat = os.stat(os.path.join(self.root, path))
+            if known.get(path) == (stat.st_mtime_ns, stat.st_size):
+                continue
+            try:
+                entry, header = catalog_entry(self.root, path)
+            except (OSError, ValueError):
+                entry, header = {}, {}
+            self.connection.execute(
+                f"INSERT OR REPLACE INTO results (path, mtime_ns, size, {', '.join(KEYS)}, parameters) "
+                f"VALUES (?, ?, ?, {', '.join('?'*len(KEYS))}, ?)",
+                [path, stat.st_mtime_ns, stat.st_size] + [entry.get(key) for key in KEYS]
+                + [json.dumps(header, default=str)])
+            parsed += 1
+        for path in set(known) - seen:
+            self.connection.execute("DELETE FROM results WHERE path = ?", (path,))
+        self.connection.commit()
+        return parsed
+
+    ###
+    #   Returns the paths of all results matching the given catalog keys,
+    #   e.g. find(network='optimhf', ntest=10, threshold=0.1).
+    ###
+    def find(self, **params):
+        unknown = set(params) - set(KEYS)
+        if unknown:
+            raise ValueError(f"Unknown catalog keys: {sorted(unknown)}")
+        conditions, values = [], []
+        for key, value in params.items():
+            if isinstance(value, float):
+                conditions.append(f"abs({key} - ?) < 1e-9")
+            else:
+                conditions.append(f"{key} = ?")
+            values.append(value)
+        query = "SELECT path FROM results"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        return [row[0] for row in self.connection.execute(query + " ORDER BY path", values)]
+
+    # "Do we already have this point?"
+    def has(self, **params):
+        return len(self.find(**params)) > 0
+
+    def close(self):
+        self.connection.close()
+
+
+if __name__ == '__main__':
+    catalog = ResultCatalog()
+    print(f"Catalog updated: {catalog.update()} files parsed")
+    query = {}
+    for arg in sys.argv[1:]:
+        key, value = arg.split('=', 1)
+        try:
+            query[key] = ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            query[key] = value
+    for path in catalog.find(**query):
+        print(path)
+    catalog.close()
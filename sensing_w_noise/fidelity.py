@@ -0,0 +1,57 @@
+import numpy as np
+
+###
+#   Fidelity between an ideal reference state and noisy density matrices.
+#
+#   Uses the (squared) Uhlmann fidelity F = (tr sqrt(sqrt(rho) sigma sqrt(rho)))^2,
+#   which for a pure reference rho = |psi><psi| reduces to F = <psi|sigma|psi>.
+#   FidelityReference does the expensive work on the reference once: for a pure
+#   reference it keeps |psi>, otherwise it keeps sqrt(rho) from one eigendecomposition.
+#   Each call then costs one matrix-vector product (pure) or one eigvalsh (mixed).
+###
+
+###
+#   Function to check whether a density matrix is pure, i.e. tr(rho^2) = 1.
+###
+def is_pure(rho: np.ndarray, tol: float=1e-8):
+    purity = np.real(np.einsum('ij,ji->', rho, rho))
+    return abs(purity - 1) < tol
+
+###
+#   Function to compute the square root of a Hermitian positive semi-definite matrix.
+###
+def hermitian_sqrtm(rho: np.ndarray):
+    w, v = np.linalg.eigh(rho)
+    return (v * np.sqrt(np.clip(w, 0, None))) @ v.conj().T
+
+
+class FidelityReference:
+    def __init__(self, ideal_state: np.ndarray):
+        ideal_state = np.asarray(ideal_state)
+        self.pure = is_pure(ideal_state)
+        if self.pure:
+            # The reference is |psi><psi|, with |psi> the eigenvector of eigenvalue 1
+            w, v = np.linalg.eigh(ideal_state)
+            self.psi = v[:, -1]
+        else:
+            self.sqrt_ideal = hermitian_sqrtm(ideal_state)
+
+    # Fidelity with a single noisy density matrix
+    def fidelity(self, noisy_state: np.ndarray):
+        return float(self.batch(noisy_state))
+
+    # Fidelities with a stack of noisy density matrices of shape (..., N, N)
+    def batch(self, noisy_states: np.ndarray):
+        noisy_states = np.asarray(noisy_states)
+        if self.pure:
+            return np.real(np.einsum('i,...ij,j->...', self.psi.conj(), noisy_states, self.psi))
+        product = self.sqrt_ideal @ noisy_states @ self.sqrt_ideal
+        w = np.linalg.eigvalsh(product)
+        return np.sum(np.sqrt(np.clip(w, 0, None)), axis=-1)**2
+
+###
+#   Function to compute the fidelity between two density matrices.
+#   For repeated calls with the same ideal state, build a FidelityReference once instead.
+###
+def calculate_fidelity(ideal_state: np.ndarray, noisy_state: np.ndarray):
+    return FidelityReference(ideal_state).fidelity(noisy_state)
@@ -0,0 +1,97 @@
+from utils import *
+from utilsIO import *
+import numpy as np
+import netsquid as ns
+import sys
+
+from squidasm.run.stack.run import run # type: ignore
+from squidasm.sim.stack.common import LogManager # type: ignore
+
+###
+#   Verification throughput of a metro-hub network.
+#   For each (max_multiplexing, switch_time) the verification protocol is run num_iters times on a
+#   hub network, recording the simulated time per run and the GHZ copies delivered per simulated second.
+#   create_ghz generates entanglement between the num_nodes-1 neighbouring pairs of the chain,
+#   so multiplexing beyond num_nodes-1 cannot speed up distribution.
+#   Usage: python hub_throughput_sim.py [perfect|optimhf]
+###
+if __name__ == "__main__":
+    # Simulation variables
+    num_nodes = 4
+    num_iters = 10
+    ntest = 10   # n_total = 2*num_nodes*n_test
+    network = sys.argv[1] if len(sys.argv) > 1 else "optimhf"
+    multiplexing_list = list(range(1, num_nodes))
+    switch_time_list = [0, 1_000, 10_000, 100_000]   # ns
+
+    # Logging
+    LogManager.set_log_level("WARNING")
+    # Disable logging to terminal
+    logger = LogManager.get_stack_logger()
+    logger.handlers = []
+    # Enable logging to file
+    LogManager.log_to_file(f"logs/hub_throughput.log")
+
+    multiplexings = []
+    switch_times = []
+    avg_sim_times = []
+    throughputs = []
+    for max_multiplexing in multiplexing_list:
+        for switch_time in switch_time_list:
+            # Initialize programs
+            programs, node_names = init_verification_programs(num_nodes, ntest)
+            copies = programs[node_names[0]].ntotal
+
+            # Configure hub network
+            if network == "perfect":
+                network_cfg = configure_perfect_network(node_names, programs, topology="hub",
+                                                        max_multiplexing=max_multiplexing,
+                                                        switch_time=switch_time)
+            elif network == "optimhf":
+                network_cfg = configure_network(node_names, use_high_fidelity=True, use_optimistic=True,
+                                                programs=programs, topology="hub",
+                                                max_multiplexing=max_multiplexing,
+                                                switch_time=switch_time)
+            else:
+                raise ValueError("Network argument must be \'perfect\' or \'optimhf\'")
+
+            # Simulated time of each verification round, in ns
+            sim_times = []
+            for k in range(num_iters):
+                ns.sim_reset()
+                run(
+                    config=network_cfg,
+                    programs=programs,
+                    num_times=1
+                )
+                sim_times.append(ns.sim_time())
+
+            avg_sim_time = np.average(sim_times)
+            throughput = copies / (avg_sim_time * 1e-9)
+            print(f"max_multiplexing={max_multiplexing}, switch_time={switch_time} ns: "
+                  f"{avg_sim_time * 1e-9:.4f} s per round, {throughput:.2f} copies/s")
+
+            multiplexings.append(max_multiplexing)
+            switch_times.append(switch_time)
+            avg_sim_times.append(avg_sim_time)
+            throughputs.append(throughput)
+
+    # Write data to file
+    filename = f"data/hub_throughput_{network}_x{num_iters}.txt"
+
+    # Parameter information and output data identifiers
+    with open(filename, 'w') as f:
+        f.write("# parameters:\n")
+        f.write(f"#  num_nodes={num_nodes}, num_iters={num_iters}, ntest={ntest}, copies={2*num_nodes*ntest}\n")
+        f.write("# columns:\n")
+        f.write("#  max_multiplexing    switch_time_ns    avg_sim_time_ns    copies_per_second\n")
+
+    # Output
+    write_to_file_multiy(
+        x=multiplexings,
+        y1=switch_times,
+        y2=avg_sim_times,
+        y3=throughputs,
+        filename=filename
+    )
+    print(f"Simulation results stored in {filename}")
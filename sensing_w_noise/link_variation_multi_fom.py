@@ -2,13 +2,11 @@ from matplotlib import pyplot as plt
 from utils import *
 from utilsIO import *
 import numpy as np
-import scipy.linalg as sci
+from fidelity import FidelityReference
+from pauli_transform import ghz_stabilizer_failure_probabilities
+from phase_timer import accumulate_timings, format_timings
 
-from squidasm.run.stack.run import run # type: ignore
-
-def calculate_fidelity(ideal_state: np.ndarray, noisy_state: np.ndarray):
-    fidelity = np.trace(np.abs(sci.sqrtm(ideal_state).dot(sci.sqrtm(noisy_state))))
-    return fidelity
+from result_cache import run, default_cache
 
 if __name__ == "__main__":
     # Simulation variables
@@ -18,6 +16,9 @@ if __name__ == "__main__":
     # Parameters for network configuration with noise
     use_highfid = True
     use_optimistic = True
+    # Collect per-phase timings of the verification programs
+    timings = False
+    phase_timings = {}
 
     # Retrieve parameters for the default depolarizing quantum link
     default_link_cfg = configure_link(use_highfid, use_optimistic)
@@ -33,40 +34,39 @@ if __name__ == "__main__":
     # Enable logging to file
     LogManager.log_to_file(f"logs/link_variation.log")
 
-    # Perfect verification simulation
+    # Perfect verification simulation (seeded, so it is served from the result cache on reruns)
     programs, node_names = init_verification_programs(num_nodes, ntest)
     netcfg = configure_perfect_network(node_names)
     results = run(
                 config=netcfg,
                 programs=programs,
-                num_times=1
+                num_times=1,
+                seed=0
             )
     ideal_state = results[-1][0]["full state"]
+    # Prepare the ideal state once for all fidelity calculations
+    ideal_reference = FidelityReference(ideal_state)
             
     # Run simulation varying the link fidelity
     avg_failures = []
     target_fidelities = []
+    stabilizer_failures = []
     for fidelity in fidelity_list:
         if (list(fidelity_list).index(fidelity)+1) % 5 == 0:
             print(f"Fidelity simulation {list(fidelity_list).index(fidelity)+1}.")
 
         # Initialize programs
-        programs, node_names = init_verification_programs(num_nodes, ntest)
+        programs, node_names = init_verification_programs(num_nodes, ntest, timings=timings)
 
         # Load network configuration
-        network_cfg = configure_network(node_names, use_highfid, use_optimistic)
-
-        # If needed, we can modify the configuration to increase num_qubits
-        """ for stack in network_cfg.stacks:
-            stack.qdevice_cfg.num_qubits = 100 """
-
-        # Modify the link configuration
-        for link in network_cfg.links:
-            link.cfg.fidelity = fidelity
+        # with the modified link fidelity
+        network_cfg = configure_network(node_names, use_highfid, use_optimistic,
+                                        overrides={'link.fidelity': fidelity})
 
         # Run the simulation
         failure_rates = []
         target_fids = []
+        stab_fails = []
         for k in range(num_iters):
             #print(f"Iteration {k+1}")
             fid = np.nan
@@ -78,19 +78,23 @@ if __name__ == "__main__":
                     programs=programs,
                     num_times=1
                 )
+                accumulate_timings(phase_timings, results)
                 f = round(results[0][0]["average failure rate"], 5)
                 m = results[-1][0]["full state"]
                 #print(f"Average failure rate for iteration {k+1}: {f}")
-                fid = round(calculate_fidelity(ideal_state, m), 5)
+                fid = round(ideal_reference.fidelity(m), 5)
                 attempt += 1
             #print(f"Verification failure rate: {f} \tTarget copy fidelity: {fid}")
             failure_rates.append(f)
             target_fids.append(fid)
+            # Exact failure probability of a uniformly chosen GHZ stabilizer on the target copy
+            stab_fails.append(np.mean(list(ghz_stabilizer_failure_probabilities(m).values())))
             
             
         # Get average failure rate and target fidelity over all simulation iterations
         avg_failures.append(np.average(failure_rates))
         target_fidelities.append(np.average(target_fids))
+        stabilizer_failures.append(np.average(stab_fails))
         
     # Write data to file
     filename = "data/link_variation_multi_fom_x50_(2).txt"
@@ -100,12 +104,17 @@ if __name__ == "__main__":
         f.write("# parameters:\n")
         f.write(f"#  num_nodes={num_nodes}, num_iters={num_iters}, ntest={ntest}\n")
         f.write("# columns:\n")
-        f.write("#  link_fidelity   avg_failure_rate    avg_target_fidelity\n")
+        f.write("#  link_fidelity   avg_failure_rate    avg_target_fidelity    avg_stabilizer_failure\n")
 
     # Output
     write_to_file_multiy(
         x=fidelity_list,
         y1=avg_failures, 
         y2=target_fidelities,
+        y3=stabilizer_failures,
         filename=filename
-    )
\ No newline at end of file
+    )
+
+    print(default_cache.report())
+    if timings:
+        print(format_timings(phase_timings))
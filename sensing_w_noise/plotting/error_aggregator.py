@@ -0,0 +1,91 @@
+import numpy as np
+from utilsIO import read_from_file_multiy
+
+###
+#   Welford accumulators indexed by iteration, grown on demand.
+#   Each call to add() updates the running mean and sum of squared deviations for
+#   the first len(values) iterations in one vectorised step, so runs of different
+#   lengths can be added without truncating to the shortest one.
+###
+class IterationAccumulator:
+    def __init__(self, size: int=0):
+        self.count = np.zeros(size, dtype=int)
+        self.mean = np.zeros(size)
+        self.m2 = np.zeros(size)
+
+    def _grow(self, size: int):
+        extra = size - len(self.count)
+        if extra > 0:
+            self.count = np.concatenate([self.count, np.zeros(extra, dtype=int)])
+            self.mean = np.concatenate([self.mean, np.zeros(extra)])
+            self.m2 = np.concatenate([self.m2, np.zeros(extra)])
+
+    def add(self, values):
+        values = np.asarray(values, dtype=float)
+        size = len(values)
+        self._grow(size)
+        self.count[:size] += 1
+        delta = values - self.mean[:size]
+        self.mean[:size] += delta / self.count[:size]
+        self.m2[:size] += delta * (values - self.mean[:size])
+
+    # Population variance at each iteration, matching np.var
+    @property
+    def variance(self):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(self.count > 0, self.m2 / np.maximum(self.count, 1), np.nan)
+
+###
+#   This class aggregates running estimation errors over many simulation runs.
+#
+#   For every iteration it keeps Welford accumulators for the absolute bias, the squared
+#   error and the estimate itself. Only one run is held in memory at a time, so hundreds
+#   of simulations of several thousand iterations can be aggregated in a single pass.
+###
+class RunningErrorAggregator:
+    def __init__(self):
+        self.bias = IterationAccumulator()
+        self.sq_error = IterationAccumulator()
+        self.estimate = IterationAccumulator()
+        self.num_runs = 0
+
+    def add_run(self, estimations, phase_average: float):
+        estimations = np.asarray(estimations, dtype=float)
+        error = estimations - phase_average
+        self.bias.add(np.abs(error))
+        self.sq_error.add(error**2)
+        self.estimate.add(estimations)
+        self.num_runs += 1
+
+    # Read one sim{i}.txt file with columns: iteration, frequency, estimation, average phase
+    def add_file(self, filename: str):
+        _, _, estimations, avg_phases, _, _ = read_from_file_multiy(filename, num_y=3)
+        self.add_run(estimations, avg_phases[-1])
+
+    # Number of runs that reached each iteration
+    @property
+    def counts(self):
+        return self.bias.count
+
+    ###
+    #   Returns the per-iteration statistics for all iterations reached by at least
+    #   min_runs simulations, as a dictionary of arrays.
+    ###
+    def results(self, min_runs: int=1):
+        size = int(np.sum(self.counts >= min_runs))
+        return {"iterations": np.arange(1, size+1),
+                "counts": self.counts[:size],
+                "average_bias": self.bias.mean[:size],
+                "bias_variance": self.bias.variance[:size],
+                "mean_sq_error": self.sq_error.mean[:size],
+                "mse_variance": self.sq_error.variance[:size],
+                "estimate_variance": self.estimate.variance[:size]}
+
+###
+#   Function to aggregate a list of simulation files in a single streaming pass.
+###
+def aggregate_sim_files(filenames, min_runs: int=1):
+    aggregator = RunningErrorAggregator()
+    for filename in filenames:
+        aggregator.add_file(filename)
+    return aggregator.results(min_runs)
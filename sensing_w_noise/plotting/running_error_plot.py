@@ -1,4 +1,5 @@
 from utilsIO import *
+from error_aggregator import aggregate_sim_files
 from matplotlib import pyplot as plt
 import numpy as np
 
@@ -7,42 +8,17 @@ num_iters = 1000
 ntest = 10
 num_sims = 10
 
-size = 1000
-sim = 0
-running_errors = []
-for i in range(1, num_sims+1):
-    # Read ith simulation results from file
-    filename = f"data/{num_iters}_iters_optim_highfid_({ntest})/sim{i}.txt"
-    x, _, estimations, avg_phases, _, _ = read_from_file_multiy(filename, num_y=3)
+# Runs stop at different lengths, so only keep iterations reached by at least half of them
+min_runs = num_sims // 2
 
-    # Identify smallest data set size
-    if len(x) < size:
-        size = len(x)
-        sim = i
-    
-    # Get phase average and calculate running bias / mean squared error at each iteration
-    phase_average = avg_phases[-1]
-    bias = [abs(estimations[k]-phase_average) for k in range(size)]
-    mean_sq_error = [(estimations[k]-phase_average)**2 for k in range(size)]
+# Stream each simulation file once into per-iteration error accumulators
+filenames = [f"data/{num_iters}_iters_optim_highfid_({ntest})/sim{i}.txt" for i in range(1, num_sims+1)]
+stats = aggregate_sim_files(filenames, min_runs=min_runs)
 
-    running_errors.append(mean_sq_error)
-
-# Ensure we only keep the smallest dataset size from each simulation run
-for j in range(len(running_errors)):
-    if len(running_errors[j]) > size:
-        running_errors[j] = running_errors[j][:size]
-
-# Transpose error array so the rows correspond to the iteration and columns to the simulation
-running_errors = np.array(running_errors).transpose()
-
-# Calculate error averages and variances for each simulation
-average_errors = []
-variance = []
-for k in range(size):
-    average_errors.append(np.mean(running_errors[k]))
-    variance.append(np.var(running_errors[k]))
-
-iterations = list(range(1, size+1))
+average_errors = list(stats["mean_sq_error"])
+variance = list(stats["mse_variance"])
+iterations = list(stats["iterations"])
+size = len(iterations)
 
 # Find minimum error
 min_err = min(average_errors)
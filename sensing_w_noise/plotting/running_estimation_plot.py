@@ -1,3 +1,4 @@
+import os
 import numpy as np
 import matplotlib.pyplot as plt
 from utilsIO import *
@@ -8,7 +9,13 @@ num_iters = 1000
 sim_number = 1
 
 filename = f"data/{num_iters}_iters_optim_highfid_({ntest})_thresh01/sim{sim_number}.txt"
-x, y1, y2, y3, _, _ = read_from_file_multiy(filename, num_y=3)
+# Use the columnar binary copy of the file if it has been converted
+binary_filename = os.path.splitext(filename)[0] + COLUMN_FILE_EXTENSION
+if os.path.exists(binary_filename):
+    columns, _ = read_columns(binary_filename)
+    x, y1, y2, y3 = list(columns.values())[:4]
+else:
+    x, y1, y2, y3, _, _ = read_from_file_multiy(filename, num_y=3)
 
 # Calculate expected probability of 0 <=> +1 outcome from average phase
 phase_average = y3[-1]
@@ -0,0 +1,212 @@
+import os
+import json
+import pickle
+import random
+import hashlib
+import inspect
+import tempfile
+import numpy as np
+
+import netsquid as ns
+from squidasm.run.stack.run import run as run_simulation # type: ignore
+
+###
+#   Content-addressed cache of simulation results.
+#
+#   A run is identified by the SHA-256 of
+#       - the resolved network configuration (all StackNetworkConfig fields, recursively),
+#       - the class, source file and attributes of every program,
+#       - num_times and the RNG seed.
+#   Results are pickled to <cache_dir>/<hash>.pkl with an atomic rename. Only plain data
+#   is kept: numbers, strings, containers and numpy arrays (so density matrices come back
+#   as arrays). Handles to simulated objects, such as the 'target qubit' entries, are
+#   stored as None. Per-phase timings are not stored, since they describe the original run
+#   and not the lookup.
+#
+#   Runs without a seed are never cached, since their outcome is not reproducible.
+#   run() is a drop-in replacement for squidasm's run with an extra seed argument:
+#
+#       results = run(config=netcfg, programs=programs, num_times=1, seed=0)
+###
+DEFAULT_CACHE_DIR = "result_cache"
+
+###
+#   Function to convert configurations and program attributes to a JSON-serialisable form
+#   that only depends on their values. A reference back to an object that is being converted
+#   (e.g. a program holding its parent) is replaced by a marker with its class name.
+###
+def _canonical(value, _visiting=None):
+    if value is None or isinstance(value, (bool, int, str)):
+        return value
+    if isinstance(value, float):
+        return repr(value)
+    if isinstance(value, np.generic):
+        return _canonical(value.item(), _visiting)
+    if isinstance(value, np.ndarray):
+        return {"__array__": [value.dtype.str, list(value.shape),
+                              hashlib.sha256(np.ascontiguousarray(value).tobytes()).hexdigest()]}
+    cls = type(value)
+    if _visiting is None:
+        _visiting = set()
+    if id(value) in _visiting:
+        return {"__cycle__": f"{cls.__module__}.{cls.__qualname__}"}
+    _visiting.add(id(value))
+    try:
+        return _canonical_container(value, _visiting)
+    finally:
+        _visiting.discard(id(value))
+
+def _canonical_container(value, _visiting: set):
+    if isinstance(value, dict):
+        return {str(key): _canonical(item, _visiting) for key, item in value.items()}
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = [_canonical(item, _visiting) for item in value]
+        return sorted(items, key=json.dumps) if isinstance(value, (set, frozenset)) else items
+    cls = type(value)
+    if hasattr(value, "model_dump"):
+        fields = value.model_dump()
+    elif callable(getattr(value, "dict", None)):
+        fields = value.dict()
+    elif hasattr(value, "__dict__"):
+        fields = {key: item for key, item in vars(value).items() if not key.startswith('_')}
+    else:
+        return repr(value)
+    return {"__class__": f"{cls.__module__}.{cls.__qualname__}", "fields": _canonical(fields, _visiting)}
+
+###
+#   Function to fingerprint a program class by its name and the source of its module,
+#   so that editing a protocol invalidates its cached results.
+###
+def _class_fingerprint(cls):
+    name = f"{cls.__module__}.{cls.__qualname__}"
+    try:
+        with open(inspect.getsourcefile(cls), 'rb') as f:
+            source = hashlib.sha256(f.read()).hexdigest()
+    except (TypeError, OSError):
+        source = None
+    return [name, source]
+
+def run_fingerprint(config, programs: dict, num_times: int, seed: int):
+    description = {
+        "config": _canonical(config),
+        "programs": {name: {"class": _class_fingerprint(type(program)),
+                            "attributes": _canonical({key: item for key, item in vars(program).items()
+                                                      if not key.startswith('_')})}
+                     for name, program in programs.items()},
+        "num_times": int(num_times),
+        "seed": int(seed),
+    }
+    return hashlib.sha256(json.dumps(description, sort_keys=True).encode('utf-8')).hexdigest()
+
+###
+#   Function to strip a result structure down to storable plain data.
+###
+def _storable(value):
+    if isinstance(value, dict):
+        return {key: _storable(item) for key, item in value.items() if key != "timings"}
+    if value is None or isinstance(value, (bool, int, float, complex, str)):
+        return value
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return np.array(value)
+    if isinstance(value, (list, tuple)):
+        return type(value)(_storable(item) for item in value)
+    return None
+
+###
+#   Function to seed every random number generator used in a simulation:
+#   python's random (protocol choices), numpy and NetSquid.
+#   Returns their previous states, to be put back with restore_random_states().
+###
+def seed_simulation(seed: int):
+    states = (random.getstate(), np.random.get_state(), ns.get_random_state().get_state())
+    random.seed(seed)
+    np.random.seed(seed)
+    ns.set_random_state(seed=seed)
+    return states
+
+def restore_random_states(states: tuple):
+    python_state, numpy_state, netsquid_state = states
+    random.setstate(python_state)
+    np.random.set_state(numpy_state)
+    ns.get_random_state().set_state(netsquid_state)
+
+
+class ResultCache:
+    def __init__(self, cache_dir: str=DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        self.uncached = 0
+
+    def _filename(self, key: str):
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+
+    def load(self, key: str):
+        try:
+            with open(self._filename(key), 'rb') as f:
+                return pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+    def store(self, key: str, results):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, tmp_filename = tempfile.mkstemp(dir=self.cache_dir, prefix=".tmp_", suffix=".pkl")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(results, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_filename, self._filename(key))
+        except BaseException:
+            if os.path.exists(tmp_filename):
+                os.remove(tmp_filename)
+            raise
+
+    ###
+    #   Runs the simulation, or returns the stored results of an identical seeded run.
+    ###
+    def run(self, config, programs: dict, num_times: int=1, seed: int=None):
+        if seed is None:
+            self.uncached += 1
+            return run_simulation(config=config, programs=programs, num_times=num_times)
+
+        key = run_fingerprint(config, programs, num_times, seed)
+        results = self.load(key)
+        if results is not None:
+            self.hits += 1
+            return results
+
+        # Seeding must not leak into the unseeded runs that follow, or they would repeat
+        # the same draws on every launch with a cold cache
+        self.misses += 1
+        states = seed_simulation(seed)
+        try:
+            results = _storable(run_simulation(config=config, programs=programs, num_times=num_times))
+        finally:
+            restore_random_states(states)
+        self.store(key, results)
+        return results
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0.0
+
+    def report(self):
+        return (f"Result cache: {self.hits} hits, {self.misses} misses, {self.uncached} unseeded runs "
+                f"(hit rate {100*self.hit_rate:.1f}%)")
+
+    def clear(self):
+        if os.path.isdir(self.cache_dir):
+            for name in os.listdir(self.cache_dir):
+                if name.endswith(".pkl"):
+                    os.remove(os.path.join(self.cache_dir, name))
+
+
+default_cache = ResultCache()
+
+###
+#   Drop-in replacement for squidasm's run that consults the default cache first.
+###
+def run(config, programs: dict, num_times: int=1, seed: int=None):
+    return default_cache.run(config, programs, num_times, seed)
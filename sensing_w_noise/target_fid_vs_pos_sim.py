@@ -2,13 +2,11 @@ from matplotlib import pyplot as plt
 from utils import *
 from utilsIO import *
 import numpy as np
-import scipy.linalg as sci
+from fidelity import FidelityReference
+from pauli_transform import ghz_stabilizer_failure_probabilities
+from phase_timer import accumulate_timings, format_timings
 
-from squidasm.run.stack.run import run # type: ignore
-
-def calculate_fidelity(ideal_state: np.ndarray, noisy_state: np.ndarray):
-    fidelity = np.trace(np.abs(sci.sqrtm(ideal_state).dot(sci.sqrtm(noisy_state))))
-    return round(fidelity, 3)
+from result_cache import run, default_cache
 
 if __name__ == "__main__":
     # Simulation variables
@@ -18,6 +16,9 @@ if __name__ == "__main__":
     # Parameters for network configuration with noise
     use_highfid = True
     use_optimistic = False
+    # Collect per-phase timings of the verification programs
+    timings = False
+    phase_timings = {}
 
     # Logging
     LogManager.set_log_level("WARNING")
@@ -27,36 +28,43 @@ if __name__ == "__main__":
     # Enable logging to file
     LogManager.log_to_file(f"logs/target_fid_vs_pos.log")
 
-    # Perfect verification simulation
+    # Perfect verification simulation (seeded, so it is served from the result cache on reruns)
     programs, node_names = init_verification_programs(num_nodes, ntest)
     netcfg = configure_perfect_network(node_names)
     results = run(
                 config=netcfg,
                 programs=programs,
-                num_times=1
+                num_times=1,
+                seed=0
             )
     ideal_state = results[-1][0]["full state"]
+    # Prepare the ideal state once for all fidelity calculations
+    ideal_reference = FidelityReference(ideal_state)
 
     ### Noisy verification simulation ###
 
     # Initialize programs
-    programs, node_names = init_verification_programs(num_nodes, ntest)
+    programs, node_names = init_verification_programs(num_nodes, ntest, timings=timings)
 
     # Load network configuration
     network_cfg = configure_network(node_names, use_highfid, use_optimistic)
 
     # Run the simulations
     ids_fids = {}
+    ids_stab_fails = {}
     for k in range(num_iters):
         results = run(
                 config=network_cfg,
                 programs=programs,
                 num_times=1
             )
+        accumulate_timings(phase_timings, results)
         idx = results[0][0]["target index"]
         rho = results[-1][0]["full state"]
-        fid = calculate_fidelity(ideal_state, rho)
+        fid = round(ideal_reference.fidelity(rho), 3)
         ids_fids[idx] = fid
+        # Exact failure probability of a uniformly chosen GHZ stabilizer on the target copy
+        ids_stab_fails[idx] = np.mean(list(ghz_stabilizer_failure_probabilities(rho).values()))
 
     # Write data to file
     filename = "data/fid_vs_pos_current_highfid_x100.txt"
@@ -66,16 +74,21 @@ if __name__ == "__main__":
         f.write("# parameters:\n")
         f.write(f"#  num_nodes={num_nodes}, ntest={ntest}, use_optimistic={use_optimistic}, use_highfid={use_highfid}\n")
         f.write("# columns:\n")
-        f.write("#  target_position    target_fidelity\n")
+        f.write("#  target_position    target_fidelity    stabilizer_failure\n")
 
     # Output
     positions = list(ids_fids.keys())
     fidelities = list(ids_fids.values())
-    write_to_file(
+    stab_fails = [ids_stab_fails[idx] for idx in positions]
+    write_to_file_multiy(
         x=positions,
-        y=fidelities,
+        y1=fidelities,
+        y2=stab_fails,
         filename=filename
     )
 
     pprint(ids_fids)
 
+    print(default_cache.report())
+    if timings:
+        print(format_timings(phase_timings))
@@ -9,6 +9,7 @@ from squidasm.sim.stack.common import LogManager # type: ignore
 from squidasm.util.routines import create_ghz # type: ignore
 from netqasm.sdk.qubit import Qubit
 from squidasm.util.util import get_qubit_state # type: ignore
+from phase_timer import phase_timer
 
 ###
 #   Function to output a set of stabilizer generators for the GHZ state, given the number of nodes
@@ -121,13 +122,15 @@ def get_stabilizers(num_nodes: int) -> Dict[str, List[str]]:
 #           the average of the failure rates, and its target qubit.
 ###
 class GHZVerifierNode_v2(Program):
-    def __init__(self, name:str, node_names:List[str], ntest:int):
+    def __init__(self, name:str, node_names:List[str], ntest:int, timings:bool=False):
         self.name = name
         self.node_names = node_names
         self.peer_names = [peer for peer in self.node_names if peer != self.name]
         self.num_nodes = len(self.node_names)
         self.ntest = ntest
         self.ntotal = 2 * self.num_nodes * self.ntest
+        # If True, time spent per protocol phase is returned under the 'timings' key
+        self.timings = timings
 
     @property
     def meta(self) -> ProgramMeta:
@@ -141,6 +144,7 @@ class GHZVerifierNode_v2(Program):
     def run(self, context: ProgramContext):
         connection = context.connection
         logger = LogManager.get_stack_logger(f"{self.name}_Verifier")
+        timer = phase_timer(self.timings)
 
         ### 
         # Preparation phase
@@ -204,6 +208,7 @@ class GHZVerifierNode_v2(Program):
         # We will sequentially generate ntotal GHZ state copies 
         for c in range(self.ntotal):
             ## Distribute GHZ state and get the qubit corresponding to this node ##
+            timer.start("distribution")
             qubit, _ = yield from create_ghz(
                 connection,
                 down_epr_socket,
@@ -241,6 +246,7 @@ class GHZVerifierNode_v2(Program):
                 basis = stab_bases[verifier_id]
                 logger.warning(f"{self.name} will measure in {basis} basis")
 
+                timer.start("measurement")
                 qubit.K() if basis == 'Y' else qubit.H()
                 m = qubit.measure()
                 yield from connection.flush()
@@ -250,6 +256,7 @@ class GHZVerifierNode_v2(Program):
                 results[stab_number][test_number][verifier_id] **= int(m)
 
                 # Send all the other nodes the relevant info to make their measurements
+                timer.start("classical")
                 for node_index in range(1, self.num_nodes):
                     peer_index = node_index - 1
                     csocket = csockets[peer_index]
@@ -269,20 +276,25 @@ class GHZVerifierNode_v2(Program):
                 target_qubit = qubit
                 logger.warning(f"Copy {c} stored as target")
 
+                timer.start("measurement")
                 yield from connection.flush()
                 # Send all the other nodes the action to perform : 'keep'
+                timer.start("classical")
                 for node_index in range(1, self.num_nodes):
                     csockets[node_index - 1].send(qubit_action)
 
             else:   # Qubit will be deleted
+                timer.start("measurement")
                 qubit.free()
                 logger.warning(f"Copy {c} discarded")
                 yield from connection.flush()
 
                 # Send all the other nodes the action to perform : 'discard'
+                timer.start("classical")
                 for node_index in range(1, self.num_nodes):
                     csockets[node_index - 1].send(qubit_action)
 
+        timer.start("evaluation")
         failure_rates = []
         # Calculate failure rate for each stabilizer measurement
         for j in range(self.num_nodes):
@@ -303,11 +315,11 @@ class GHZVerifierNode_v2(Program):
         avg_failure_rate = np.mean(failure_rates)
         logger.warning(f"Average failure rate: {avg_failure_rate}")
 
-        return {"name": self.name, 
-                "failure rates": failure_rates,
-                "average failure rate": avg_failure_rate,
-                "target qubit": target_qubit,
-                "target index": target}
+        return timer.report({"name": self.name, 
+                             "failure rates": failure_rates,
+                             "average failure rate": avg_failure_rate,
+                             "target qubit": target_qubit,
+                             "target index": target})
     
 
 ###
@@ -337,13 +349,15 @@ class GHZVerifierNode_v2(Program):
 #       5.  The node outputs its target qubit.
 ###
 class GHZMemberNode_v2(Program):
-    def __init__(self, name:str, node_names:List[str], ntest:int):
+    def __init__(self, name:str, node_names:List[str], ntest:int, timings:bool=False):
         self.name = name
         self.node_names = node_names
         self.peer_names = [peer for peer in self.node_names if peer != self.name]
         self.num_nodes = len(self.node_names)
         self.ntest = ntest
         self.ntotal = 2 * self.num_nodes * self.ntest
+        # If True, time spent per protocol phase is returned under the 'timings' key
+        self.timings = timings
 
     @property
     def meta(self) -> ProgramMeta:
@@ -357,6 +371,7 @@ class GHZMemberNode_v2(Program):
     def run(self, context: ProgramContext):
         connection = context.connection
         logger = LogManager.get_stack_logger(f"{self.name}_Member")
+        timer = phase_timer(self.timings)
 
         ### 
         # Preparation phase
@@ -392,6 +407,7 @@ class GHZMemberNode_v2(Program):
         # We will sequentially generate ntotal GHZ state copies 
         for c in range(self.ntotal):
             ## Distribute GHZ state and get the qubit corresponding to this node ##
+            timer.start("distribution")
             qubit, _ = yield from create_ghz(
                 connection,
                 down_epr_socket,
@@ -402,6 +418,7 @@ class GHZMemberNode_v2(Program):
             )
             
             ## Get action to be performed by the Verifier ##
+            timer.start("classical")
             qubit_action = yield from csocket.recv()
 
             logger.warning(f"Copy: {c}, Received qubit action: {qubit_action}")
@@ -411,31 +428,36 @@ class GHZMemberNode_v2(Program):
                 basis = yield from csocket.recv()
                 logger.warning(f"{self.name} will measure in {basis} basis")
 
+                timer.start("measurement")
                 qubit.K() if basis == 'Y' else qubit.H()
                 m = qubit.measure()
                 yield from connection.flush()
 
                 # Send the result back to Verifier
+                timer.start("classical")
                 csocket.send(int(m))
                 logger.debug(f"Result {int(m)} sent to Verifier")
             
             elif qubit_action == "keep":
                 target_qubit = qubit
                 logger.warning(f"Copy {c} stored as target")
+                timer.start("measurement")
                 yield from connection.flush()
 
             else:   # Qubit will be deleted
+                timer.start("measurement")
                 qubit.free()
                 logger.warning(f"Copy {c} discarded")
                 yield from connection.flush()
             
         # Last node will output the density matrix of the shared target copy 
         if self.name == self.node_names[-1]:
+            timer.start("evaluation")
             full_state = get_qubit_state(target_qubit, self.name, full_state=True)
             logger.warning(f"Outputting density matrix of shared state")
-            return {"name": self.name, 
-                    "target qubit": target_qubit,
-                    "full state": full_state}
+            return timer.report({"name": self.name, 
+                                 "target qubit": target_qubit,
+                                 "full state": full_state})
         # Others will just return their qubit of the unmeasured target copy
         else:
-            return {"name": self.name, "target qubit": target_qubit}
\ No newline at end of file
+            return timer.report({"name": self.name, "target qubit": target_qubit})
\ No newline at end of file
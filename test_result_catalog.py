@@ -0,0 +1,48 @@
+import os
+from result_catalog import ResultCatalog, parameters_from_path
+
+###
+#   Checks of the result catalog on file names and headers taken from the data/ directories.
+#   Run with: python -m pytest test_result_catalog.py
+###
+FILES = {
+    "new_verif/data/t05/400_iters/sim3_optimhf.txt":
+        "# parameters:\n#  num_nodes=4, total_iters=3418, ntest=20, copies=21\n"
+        "#  phase_average=1.6757493260130005, failure_threshold=0.05\n# columns:\n",
+    "sensing/data/parity_running_estimation_perfect_3000.txt":
+        "# parameters:\n#  num_nodes=4, num_iters=3000, ntest=3, state=ghz\n# columns:\n",
+    "new_verif/data/seeded/100_iteration_sim_t15_7200.txt":
+        "# parameters:\n#  num_nodes=4, total_iters=142, ntest=20, copies=21\n"
+        "#  phase_average=2.1115347763547287, failure_threshold=0.15\n# columns:\n",
+    "dishonest_new/data/running_estimation/s24680_optimhf_dishonest1_action1.txt":
+        "# parameters:\n#  num_nodes=4, ntest=10\n# columns:\n",
+}
+
+def make_catalog(tmp_path):
+    for path, header in FILES.items():
+        os.makedirs(os.path.dirname(tmp_path / path), exist_ok=True)
+        with open(tmp_path / path, 'w') as f:
+            f.write(header + "#  iteration   value\n1 0.5\n")
+    catalog = ResultCatalog(root=str(tmp_path))
+    catalog.update()
+    return catalog
+
+def test_path_iterations_take_precedence(tmp_path):
+    catalog = make_catalog(tmp_path)
+    assert catalog.find(threshold=0.05, num_iters=400, network="optimhf") == \
+        ["new_verif/data/t05/400_iters/sim3_optimhf.txt"]
+    catalog.close()
+
+def test_trailing_number_is_not_a_seed():
+    found = parameters_from_path("sensing/data/parity_running_estimation_perfect_3000.txt")
+    assert "seed" not in found
+    assert found["network"] == "perfect"
+
+def test_explicit_seeds(tmp_path):
+    catalog = make_catalog(tmp_path)
+    assert catalog.find(seed=24680) == \
+        ["dishonest_new/data/running_estimation/s24680_optimhf_dishonest1_action1.txt"]
+    assert catalog.find(seed=7200) == ["new_verif/data/seeded/100_iteration_sim_t15_7200.txt"]
+    assert catalog.find(seed=3000) == []
+    assert parameters_from_path("data/estimation_seed42_perfect.txt")["seed"] == 42
+    catalog.close()